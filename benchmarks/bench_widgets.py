@@ -0,0 +1,300 @@
+"""Benchmarks of the Python side of the widgets, without Streamlit or a browser.
+
+`_component_func` is replaced by a stub that serializes the payload like the
+component would and returns a drag edit, so every widget runs its whole
+pipeline: validation, transform, options, control points and postprocess.
+
+Usage:
+
+    python benchmarks/bench_widgets.py --output results.json
+    python benchmarks/bench_widgets.py --points 100 10000 --traces 1 10 --charts line_chart
+    python benchmarks/compare.py baseline.json results.json
+"""
+import argparse
+import gc
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from functools import wraps
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import draggable_charts  # noqa: E402
+from draggable_charts.utils import component_func, payload_cache  # noqa: E402
+from draggable_charts.widgets import bezierchart, cubicbezierchart, linechart, scatterchart  # noqa: E402
+from streamlit import logger as st_logger  # noqa: E402
+from streamlit import session_state  # noqa: E402
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+POINTS = [10**2, 10**3, 10**4, 10**5, 10**6]
+TRACES = [1, 10, 100, 500]
+# Combinations with more points in total are skipped, unless --max-total is raised.
+MAX_TOTAL = 10**7
+EDITS = 10
+
+# Functions timed per stage, by widget module. They are looked up at call
+# time, so wrapping the module attribute is enough.
+STAGES = {
+    linechart: {
+        "transform": ["transform_data", "transform_frame"],
+        "options": ["compile_options", "with_axes", "style_table"],
+        "postprocess": ["postprocess_data"],
+    },
+    scatterchart: {
+        "transform": ["trace_lists"],
+        "options": ["compile_options", "with_axes", "style_table"],
+        "postprocess": ["edit_traces"],
+    },
+    bezierchart: {
+        "transform": ["trace_lists"],
+        "options": ["compile_options", "with_axes", "style_table"],
+        "control_points": ["add_control_points"],
+        "postprocess": ["edit_traces"],
+    },
+    cubicbezierchart: {
+        "transform": ["trace_lists"],
+        "options": ["compile_options", "with_axes", "style_table"],
+        "control_points": ["add_control_points"],
+        "postprocess": ["edit_traces"],
+    },
+}
+SPECS = {
+    linechart: "LINE_CHART",
+    scatterchart: "SCATTER_CHART",
+    bezierchart: "BEZIER_CHART",
+    cubicbezierchart: "CUBIC_BEZIER_CHART",
+}
+
+
+class StubComponent:
+    """Stand-in for the declared component: measures the payload and returns edits."""
+
+    def __init__(self):
+        self.value = None
+        self.revision = None
+        self.payload_bytes = 0
+        self.seconds = 0.0
+
+    def __call__(self, id, kw, default=None, key=None, on_change=None, **tables):
+        # Serialization is what Streamlit does with the payload, so it's timed apart.
+        start = time.perf_counter()
+        self.revision = kw["revision"]
+        self.payload_bytes = len(json.dumps(kw, default=str).encode())
+        for table in tables.values():
+            self.payload_bytes += _arrow_bytes(table)
+        self.seconds = time.perf_counter() - start
+        return self.value if self.value is not None else default
+
+
+def _arrow_bytes(frame: pd.DataFrame) -> int:
+    if pa is None:
+        return int(frame.memory_usage(index=True).sum())
+    table = pa.Table.from_pandas(frame)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().size
+
+
+class StageTimer:
+    def __init__(self):
+        self.seconds = defaultdict(float)
+        self._patched = []
+
+    def install(self, module):
+        for stage, names in STAGES[module].items():
+            for name in names:
+                self._wrap(module, name, stage)
+        spec_name = SPECS[module]
+        spec = getattr(module, spec_name)
+        self._patched.append((module, spec_name, spec))
+        setattr(module, spec_name, spec._replace(validator=self._timed("validate", spec.validator)))
+
+    def uninstall(self):
+        for module, name, original in reversed(self._patched):
+            setattr(module, name, original)
+        self._patched.clear()
+
+    def reset(self):
+        self.seconds.clear()
+
+    def _wrap(self, module, name, stage):
+        original = getattr(module, name)
+        self._patched.append((module, name, original))
+        setattr(module, name, self._timed(stage, original))
+
+    def _timed(self, stage, func):
+        @wraps(func)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.seconds[stage] += time.perf_counter() - start
+        return timed
+
+
+def make_frame(points: int, traces: int, rng) -> pd.DataFrame:
+    values = np.cumsum(rng.normal(size=(points, traces)), axis=0)
+    return pd.DataFrame(values, columns=[f"trace {i}" for i in range(traces)])
+
+
+def make_traces(points: int, traces: int, rng) -> dict:
+    x = np.arange(points, dtype=float).tolist()
+    return {f"trace {i}": {"x": x, "y": np.cumsum(rng.normal(size=points)).tolist()}
+            for i in range(traces)}
+
+
+def frame_edits(revision: str, points: int) -> dict:
+    rows = np.linspace(0, points - 1, EDITS).astype(int)
+    return {"revision": revision, "patches": [[0, int(row), 1.5] for row in rows]}
+
+
+def trace_edits(revision: str, points: int) -> dict:
+    rows = np.linspace(0, points - 1, EDITS).astype(int)
+    return {"revision": revision, "patches": [["trace 0", int(row), float(row), 1.5] for row in rows]}
+
+
+CHARTS = {
+    "line_chart": (linechart, make_frame, frame_edits),
+    "scatter_chart": (scatterchart, make_traces, trace_edits),
+    "bezier_chart": (bezierchart, make_traces, trace_edits),
+    "cubic_bezier_chart": (cubicbezierchart, make_traces, trace_edits),
+}
+
+
+def run_case(chart: str, points: int, traces: int, repeat: int, seed: int = 0) -> dict:
+    module, make_data, make_edits = CHARTS[chart]
+    widget = getattr(draggable_charts, chart)
+    data = make_data(points, traces, np.random.default_rng(seed))
+    stub = StubComponent()
+    component_func._component_func = stub
+    timer = StageTimer()
+    timer.install(module)
+    try:
+        cold, warm, edit, stages = [], [], [], defaultdict(list)
+        for _ in range(repeat):
+            payload_cache.clear()
+            stub.value = None
+            timer.reset()
+            cold.append(_timed_call(widget, data, stub))
+            stages["serialize"].append(stub.seconds)
+            for stage, seconds in timer.seconds.items():
+                if stage != "postprocess":
+                    stages[stage].append(seconds)
+
+            warm.append(_timed_call(widget, data, stub))
+
+            # The drag of EDITS points, returned by the frontend on the next rerun.
+            stub.value = make_edits(stub.revision, points)
+            timer.reset()
+            edit.append(_timed_call(widget, data, stub))
+            stages["postprocess"].append(timer.seconds.get("postprocess", 0.0))
+            _clear_edit_state()
+        payload_bytes = stub.payload_bytes
+    finally:
+        timer.uninstall()
+
+    peak = measure_peak_memory(widget, data, stub)
+    return {
+        "chart": chart,
+        "points": points,
+        "traces": traces,
+        "cold_seconds": min(cold),
+        "warm_seconds": min(warm),
+        "edit_seconds": min(edit),
+        "stages": {stage: min(values) for stage, values in sorted(stages.items())},
+        "peak_memory_bytes": peak,
+        "payload_bytes": payload_bytes,
+    }
+
+
+def _timed_call(widget, data, stub) -> float:
+    """Time one widget call, without the serialization done by the stub."""
+    start = time.perf_counter()
+    widget(data)
+    return time.perf_counter() - start - stub.seconds
+
+
+def measure_peak_memory(widget, data, stub) -> int:
+    payload_cache.clear()
+    stub.value = None
+    gc.collect()
+    tracemalloc.start()
+    try:
+        widget(data)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def _clear_edit_state():
+    if "_draggable_charts_edits" in session_state:
+        session_state._draggable_charts_edits.clear()
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parents[1]).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "pyarrow": pa.__version__ if pa is not None else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--charts", nargs="+", choices=list(CHARTS), default=list(CHARTS))
+    parser.add_argument("--points", nargs="+", type=int, default=POINTS)
+    parser.add_argument("--traces", nargs="+", type=int, default=TRACES)
+    parser.add_argument("--max-total", type=int, default=MAX_TOTAL,
+                        help="Skip cases with more points in total (points * traces).")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case, the fastest is reported.")
+    parser.add_argument("--output", help="Write the results as JSON to this file instead of stdout.")
+    args = parser.parse_args(argv)
+    # Widgets run without `streamlit run`, which Streamlit warns about on every call.
+    st_logger.set_log_level("error")
+
+    results = []
+    for chart in args.charts:
+        for traces in args.traces:
+            for points in args.points:
+                if points * traces > args.max_total:
+                    continue
+                result = run_case(chart, points, traces, args.repeat)
+                results.append(result)
+                print(f"{chart:<20} points={points:<8} traces={traces:<4} "
+                      f"cold={result['cold_seconds'] * 1e3:9.2f} ms "
+                      f"warm={result['warm_seconds'] * 1e3:7.2f} ms "
+                      f"payload={result['payload_bytes'] / 2**20:8.2f} MB", file=sys.stderr)
+
+    report = json.dumps({"environment": environment(), "results": results}, indent=2)
+    if args.output:
+        Path(args.output).write_text(report)
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Compare two result files of bench_widgets.py, e.g. of two commits.
+
+Usage:
+
+    python benchmarks/compare.py baseline.json results.json --threshold 1.2
+
+Prints the ratio new / baseline of every metric, and exits with status 1 if
+any ratio is above the threshold.
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+METRICS = ["cold_seconds", "warm_seconds", "edit_seconds", "peak_memory_bytes", "payload_bytes"]
+
+
+def load(path: str) -> dict:
+    results = json.loads(Path(path).read_text())["results"]
+    return {(r["chart"], r["points"], r["traces"]): r for r in results}
+
+
+def compare(baseline: dict, new: dict, threshold: float) -> bool:
+    regressed = False
+    print(f"{'case':<48}" + "".join(f"{metric:>20}" for metric in METRICS))
+    for case in sorted(baseline.keys() & new.keys()):
+        ratios = []
+        for metric in METRICS:
+            before, after = baseline[case][metric], new[case][metric]
+            ratio = after / before if before else float("inf") if after else 1.0
+            regressed = regressed or ratio > threshold
+            ratios.append(f"{ratio:>19.2f}{'!' if ratio > threshold else ' '}")
+        chart, points, traces = case
+        print(f"{chart:<20} points={points:<8} traces={traces:<4}" + "".join(ratios))
+    return regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="Ratio new / baseline above which a metric is a regression.")
+    args = parser.parse_args(argv)
+    if compare(load(args.baseline), load(args.new), args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,32 @@
+import importlib
+
 _RELEASE = True
 
-from .widgets import *
+# Widgets and their dependencies (pandas, NumPy, Streamlit) are imported on
+# first use, so importing the package stays cheap.
+_EXPORTS = {
+    "line_chart": ".widgets.linechart",
+    "scatter_chart": ".widgets.scatterchart",
+    "bezier_chart": ".widgets.bezierchart",
+    "cubic_bezier_chart": ".widgets.cubicbezierchart",
+    "chart_grid": ".widgets.chartgrid",
+    "GridChart": ".widgets.chartgrid",
+    "changed_cells": ".utils.edits",
+    "edit_history": ".utils.history",
+    "undo": ".utils.history",
+    "redo": ".utils.history",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
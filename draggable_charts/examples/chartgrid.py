@@ -0,0 +1,20 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from draggable_charts import GridChart, chart_grid
+
+st.subheader("Chart grid")
+x = list(range(10))
+charts = {
+    f"sensor {i}": GridChart("line_chart", pd.DataFrame({"value": np.sin(np.arange(10) + i)}))
+    for i in range(6)
+}
+charts["curve"] = GridChart("cubic_bezier_chart", {"trace 1": {"x": x, "y": [v ** 0.5 for v in x]}})
+charts["points"] = GridChart(
+    "scatter_chart",
+    {"trace 1": {"x": x, "y": [v ** 2 for v in x]}},
+    on_change=lambda: st.toast("Points changed"),
+)
+new_data = chart_grid(charts, columns=4, key="grid")
+new_data["points"]
@@ -0,0 +1,94 @@
+// Checks the production build against the size and parse time budgets.
+// Runs after `npm run build`, or alone with `node scripts/check-bundle.js`.
+//
+// The entry is what every page loads before showing a chart: the scripts of
+// the `entrypoints` of the asset manifest. Lazy chunks are the charts and the
+// libraries they share, loaded on first use. The build must not fetch any
+// script from the network at runtime.
+const fs = require("fs")
+const path = require("path")
+const vm = require("vm")
+const zlib = require("zlib")
+
+const BUDGETS = {
+  // Gzipped bytes.
+  entryBytes: 120 * 1024,
+  chunkBytes: 120 * 1024,
+  totalBytes: 400 * 1024,
+  // Milliseconds to compile the entry, the median of a few runs.
+  entryParseMs: 60,
+}
+const PARSE_RUNS = 5
+
+const buildDir = path.resolve(__dirname, "..", "build")
+
+function gzipSize(source) {
+  return zlib.gzipSync(source, { level: 9 }).length
+}
+
+function parseMs(source) {
+  const times = []
+  for (let i = 0; i < PARSE_RUNS; i++) {
+    const start = process.hrtime.bigint()
+    new vm.Script(source, { filename: `parse-${i}.js` })
+    times.push(Number(process.hrtime.bigint() - start) / 1e6)
+  }
+  times.sort((a, b) => a - b)
+  return times[Math.floor(times.length / 2)]
+}
+
+function kb(bytes) {
+  return `${(bytes / 1024).toFixed(1)} KB`
+}
+
+function main() {
+  const manifestPath = path.join(buildDir, "asset-manifest.json")
+  if (!fs.existsSync(manifestPath)) {
+    console.error(`No build found at ${buildDir}, run \`npm run build\` first.`)
+    process.exit(1)
+  }
+  const manifest = JSON.parse(fs.readFileSync(manifestPath, "utf8"))
+  // Files are "./static/..." in `files` and "static/..." in `entrypoints`.
+  const relative = (file) => file.replace(/^\.?\//, "")
+  const entry = new Set(manifest.entrypoints.filter((file) => file.endsWith(".js")).map(relative))
+  const scripts = Object.values(manifest.files).filter((file) => file.endsWith(".js")).map(relative)
+  const read = (file) => fs.readFileSync(path.join(buildDir, file), "utf8")
+
+  const errors = []
+  let entryBytes = 0
+  let totalBytes = 0
+  let entrySource = ""
+  for (const file of scripts) {
+    const source = read(file)
+    const bytes = gzipSize(source)
+    totalBytes += bytes
+    if (/\bimport\s*\(\s*["']https?:/.test(source) || /from\s*["']https?:/.test(source)) {
+      errors.push(`${file} imports a script from the network`)
+    }
+    if (entry.has(file)) {
+      entryBytes += bytes
+      entrySource += source + "\n;"
+    } else if (bytes > BUDGETS.chunkBytes) {
+      errors.push(`${file} is ${kb(bytes)}, the budget of a lazy chunk is ${kb(BUDGETS.chunkBytes)}`)
+    }
+    console.log(`${entry.has(file) ? "entry" : "lazy "}  ${kb(bytes).padStart(10)}  ${file}`)
+  }
+  const entryParse = parseMs(entrySource)
+  console.log(`entry ${kb(entryBytes)}, total ${kb(totalBytes)}, entry parse ${entryParse.toFixed(1)} ms`)
+
+  if (entryBytes > BUDGETS.entryBytes) {
+    errors.push(`The entry is ${kb(entryBytes)}, the budget is ${kb(BUDGETS.entryBytes)}`)
+  }
+  if (totalBytes > BUDGETS.totalBytes) {
+    errors.push(`The build is ${kb(totalBytes)}, the budget is ${kb(BUDGETS.totalBytes)}`)
+  }
+  if (entryParse > BUDGETS.entryParseMs) {
+    errors.push(`The entry takes ${entryParse.toFixed(1)} ms to parse, the budget is ${BUDGETS.entryParseMs} ms`)
+  }
+  if (errors.length) {
+    errors.forEach((error) => console.error(`Budget exceeded: ${error}`))
+    process.exit(1)
+  }
+}
+
+main()
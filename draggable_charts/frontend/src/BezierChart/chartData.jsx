@@ -1,12 +1,14 @@
-import { Bezier } from "bezier-js"
 import rgba from "color-rgba"
 
-export function createFixedData(data, options) {
+import { createBezierCurve } from "../Utils/bezier"
+
+export function createFixedData(data, options, styles) {
   const datasets = Object.entries(data)
     .filter(([colName]) => options.fixed_lines.includes(colName))
     .map(([colName, colData], index) => {
+      const style = styles.get(colName)
       const data = colData.x.map((x, i) => ({ x, y: colData.y[i] }))
-      const colorRGBA = rgba(colData.color)
+      const colorRGBA = rgba(style.color)
       const backgroundColorRGBA = `rgba(${colorRGBA[0]}, ${colorRGBA[1]}, ${colorRGBA[2]}, 0.5)`
       return {
         data: data,
@@ -17,9 +19,9 @@ export function createFixedData(data, options) {
         spanGaps: false,
         showLine: true,
         backgroundColor: backgroundColorRGBA,
-        borderColor: colData.color,
-        pointRadius: colData.point_radius,
-        borderDash: colData.border_dash,
+        borderColor: style.color,
+        pointRadius: style.point_radius,
+        borderDash: style.border_dash,
       }
     })
 
@@ -28,12 +30,13 @@ export function createFixedData(data, options) {
   }
 }
 
-export function createControlData(data, options) {
+export function createControlData(data, options, styles) {
   const datasets = Object.entries(data)
     .filter(([colName]) => !options.fixed_lines.includes(colName))
     .map(([colName, colData], index) => {
+      const style = styles.get(colName)
       const data = colData.x.map((x, i) => ({ x, y: colData.y[i] }))
-      const colorRGBA = rgba(colData.color)
+      const colorRGBA = rgba(style.color)
       const borderColorRGBA = `rgba(${colorRGBA[0]}, ${colorRGBA[1]}, ${colorRGBA[2]}, 0.7)`
       const backgroundColorRGBA = `rgba(${colorRGBA[0]}, ${colorRGBA[1]}, ${colorRGBA[2]}, 0.5)`
       return {
@@ -57,35 +60,32 @@ export function createControlData(data, options) {
   }
 }
 
-export function createBezierData(data, options) {
+export function createBezierData(data, options, styles) {
   const datasets = Object.entries(data)
     .filter(([trace]) => !options.fixed_lines.includes(trace))
     .map(([trace, traceData], i) => {
+      const style = styles.get(trace)
       const points = traceData.x.map((x, j) => ({
         x: x,
         y: traceData.y[j],
       }))
 
-      const bezierSegments = []
-      for (let i = 0; i < points.length - 2; i += 2) {
-        const bezierPoints = points.slice(i, i + 3)
-        const bezier = new Bezier(bezierPoints)
-        const lut = bezier.getLUT(10)
-        bezierSegments.push(...lut)
-      }
-      const colorRGBA = rgba(traceData.color)
+      const bezierSegments = createBezierCurve(points, 2)
+      const colorRGBA = rgba(style.color)
       const backgroundColorRGBA = `rgba(${colorRGBA[0]}, ${colorRGBA[1]}, ${colorRGBA[2]}, 0.7)`
       const borderColorRGBA = `rgba(${colorRGBA[0]}, ${colorRGBA[1]}, ${colorRGBA[2]}, 0.4)`
       return {
         label: trace + " (bezier)",
         data: bezierSegments,
+        bezierOrder: 2,
+        controlLabel: trace,
         isControlPoint: false,
         showLine: true,
         tension: 0.3,
         pointRadius: 0,
         backgroundColor: backgroundColorRGBA,
         borderColor: borderColorRGBA,
-        borderDash: traceData.border_dash,
+        borderDash: style.border_dash,
       }
     })
 
@@ -0,0 +1,68 @@
+import React, { Suspense } from "react"
+import { Streamlit, StreamlitComponentBase } from "streamlit-component-lib"
+
+import { chartsMap } from "../components"
+
+// Many charts in one component iframe. They share the bundle, the Chart.js
+// registry and one component value: `{chart name: value of the chart}`.
+class ChartGrid extends StreamlitComponentBase {
+  constructor(props) {
+    super(props)
+    this.gridRef = React.createRef()
+    this.values = {}
+    this.handlers = {}
+  }
+
+  componentDidMount() {
+    // Charts size themselves after mounting, so the frame follows the grid.
+    this.resizeObserver = new ResizeObserver(() => Streamlit.setFrameHeight())
+    this.resizeObserver.observe(this.gridRef.current)
+  }
+
+  componentWillUnmount() {
+    this.resizeObserver.disconnect()
+  }
+
+  // One handler per chart, kept across renders.
+  valueHandler(name) {
+    if (this.handlers[name] === undefined) {
+      this.handlers[name] = (value) => {
+        this.values[name] = value
+        Streamlit.setComponentValue({ ...this.values })
+      }
+    }
+    return this.handlers[name]
+  }
+
+  render() {
+    const { charts, columns, dataframes } = this.props.args
+    return (
+      <div
+        ref={this.gridRef}
+        style={{
+          display: "grid",
+          gridTemplateColumns: `repeat(${columns}, minmax(0, 1fr))`,
+          gap: "1rem",
+        }}
+      >
+        {charts.map((cell) => {
+          const Component = chartsMap[cell.id]
+          const table = cell.table ? dataframes[cell.table] : undefined
+          return (
+            <div key={cell.name}>
+              <Suspense fallback={null}>
+                <Component
+                  args={{ ...cell.kw, table }}
+                  theme={this.props.theme}
+                  onValue={this.valueHandler(cell.name)}
+                />
+              </Suspense>
+            </div>
+          )
+        })}
+      </div>
+    )
+  }
+}
+
+export default ChartGrid
@@ -3,8 +3,8 @@ import { getRelativePosition } from "chart.js/helpers"
 import zoomPlugin from "chartjs-plugin-zoom"
 import React from "react"
 
-import { Scatter, getElementAtEvent } from "react-chartjs-2"
-import { Streamlit, StreamlitComponentBase } from "streamlit-component-lib"
+import { Scatter } from "react-chartjs-2"
+import { StreamlitComponentBase } from "streamlit-component-lib"
 import {
   createFixedData,
   createControlData,
@@ -12,55 +12,216 @@ import {
 } from "./chartData"
 import { createOptions } from "../Utils/chartOptions"
 import { calculateNewXValue, calculateNewYValue } from "../Utils/handlers"
+import { constrainX, constrainY, curveRule } from "../Utils/constraints"
+import { EditLog } from "../Utils/edits"
+import { EditHistory, historyShortcut, setShortcutTarget } from "../Utils/history"
+import { ApplyButton, ValueBatch } from "../Utils/batch"
+import { sendValue, setFrameHeight } from "../Utils/host"
+import {
+  getDraggableElementAtEvent,
+  invalidatePoints,
+  pickingPlugin,
+} from "../Utils/picking"
+import { chartPixels, curveSamplingPlugin, setCurveDrag, updateBezierCurve } from "../Utils/bezier"
+import { createStyleTable } from "../Utils/styles"
 
-Chart.register(...registerables, zoomPlugin)
+Chart.register(...registerables, zoomPlugin, pickingPlugin, curveSamplingPlugin)
 
 class CubicBezierChart extends StreamlitComponentBase {
   constructor(props) {
     super(props)
     this.chartRef = React.createRef()
+    this.edits = new EditLog()
+    this.history = new EditHistory(props.args.options.history_bytes)
+    this.batch = new ValueBatch(
+      (value) => sendValue(this.props, value),
+      (count) => this.setState({ batched: count })
+    )
+    this.batch.configure(props.args.options)
+    // Drag state is kept out of React state, so a drag doesn't re-render.
+    this.activePoint = null
+    this.pendingPosition = null
+    this.frame = null
+    this.styles = createStyleTable(props.args.styles)
     this.fixedData = createFixedData(
       this.props.args.data,
-      this.props.args.options
+      this.props.args.options,
+      this.styles
     )
     this.state = {
-      activePoint: null,
+      batched: 0,
       originalData: props.args.data,
       controlData: createControlData(
         this.props.args.data,
-        this.props.args.options
+        this.props.args.options,
+        this.styles
       ),
       bezierData: createBezierData(
         this.props.args.data,
-        this.props.args.options
+        this.props.args.options,
+        this.styles
       ),
       options: createOptions(props.args.options, props.theme),
     }
-    // Return the initial Bezier data:
-    // this.sendBezierData()
+  }
+
+  componentWillUnmount() {
+    cancelAnimationFrame(this.frame)
+    window.removeEventListener("keydown", this.keyHandler)
+    this.batch.commit()
+  }
+
+  componentDidMount() {
+    setFrameHeight(this.props)
+    window.addEventListener("keydown", this.keyHandler)
+    this.runCommands(this.props.args)
   }
 
   componentDidUpdate(prevProps) {
-    Streamlit.setFrameHeight()
+    setFrameHeight(this.props)
     if (this.props.args !== prevProps.args) {
+      if (this.props.args.revision !== prevProps.args.revision) {
+        this.edits.clear()
+        this.history.clear()
+        this.batch.clear()
+      }
+      this.batch.configure(this.props.args.options)
+      this.runCommands(this.props.args)
+      const originalData = this.applyEdits(this.props.args.data)
+      const options = this.props.args.options
+      this.styles = createStyleTable(this.props.args.styles)
       this.setState({
-        originalData: this.props.args.data,
-        controlData: createControlData(
-          this.props.args.data,
-          this.props.args.options
-        ),
-        bezierData: createBezierData(
-          this.props.args.data,
-          this.props.args.options
-        ),
+        originalData: originalData,
+        controlData: createControlData(originalData, options, this.styles),
+        bezierData: createBezierData(originalData, options, this.styles),
         options: createOptions(this.props.args.options, this.props.theme),
       })
     }
   }
 
-  sendBezierData() {
-    const newBezierData = this.convertBezierData(this.state.bezierData.datasets)
-    Streamlit.setComponentValue(newBezierData)
+  // Keep the user's edits when the chart is rebuilt for the same data.
+  applyEdits(data) {
+    this.edits.forEach(([trace, pointIndex, x, y]) => {
+      data[trace]["x"][pointIndex] = x
+      data[trace]["y"][pointIndex] = y
+    })
+    return data
+  }
+
+  // Values of the points of a trace from `fromIndex` to `toIndex`, by index.
+  pointValues(trace, fromIndex, toIndex) {
+    const traceData = this.state.originalData[trace]
+    const values = new Map()
+    const lastIndex = Math.min(toIndex, traceData.x.length - 1)
+    for (let i = Math.max(fromIndex, 0); i <= lastIndex; i++) {
+      values.set(i, [traceData.x[i], traceData.y[i]])
+    }
+    return values
+  }
+
+  recordEdits(trace, fromIndex, toIndex) {
+    const cells = []
+    this.pointValues(trace, fromIndex, toIndex).forEach(([x, y], i) => {
+      this.edits.set(trace, i, x, y)
+      cells.push([trace, i, this.dragStart.get(i), [x, y]])
+    })
+    this.history.record(cells)
+  }
+
+  // Undo and redo commands sent by Python, see `undo` in Python.
+  runCommands(args) {
+    this.history.maxBytes = args.options.history_bytes
+    const actions = this.history.receive(args.history)
+    if (actions.length > 0) {
+      actions.forEach((action) => this.applyCells(this.history[action]()))
+      this.batch.flush(this.bezierValue())
+    }
+  }
+
+  keyHandler = (event) => {
+    const action = historyShortcut(event, this)
+    if (action !== null && this.activePoint === null) {
+      event.preventDefault()
+      const cells = this.history[action]()
+      if (cells !== null) {
+        this.applyCells(cells)
+        this.batch.push(this.bezierValue())
+      }
+    }
+  }
+
+  // Set points to their values before or after an edit, for undo and redo,
+  // and recompute the segments of the curves that use them.
+  applyCells(cells) {
+    if (cells === null) {
+      return
+    }
+    const touched = new Map()
+    cells.forEach(([trace, index, [x, y]]) => {
+      this.edits.set(trace, index, x, y)
+      this.state.originalData[trace].x[index] = x
+      this.state.originalData[trace].y[index] = y
+      const [from, to] = touched.get(trace) || [index, index]
+      touched.set(trace, [Math.min(from, index), Math.max(to, index)])
+    })
+    const chart = this.chartRef.current
+    if (!chart) {
+      return
+    }
+    touched.forEach(([from, to], trace) => {
+      const traceData = this.state.originalData[trace]
+      const dataset = chart.data.datasets.find((d) => d.isControlPoint && d.label === trace)
+      for (let i = from; i <= to; i++) {
+        dataset.data[i].x = traceData.x[i]
+        dataset.data[i].y = traceData.y[i]
+      }
+      const curve = chart.data.datasets.find((d) => d.label === trace + " (bezier)")
+      updateBezierCurve(curve.data, dataset.data, 3, from, to, chartPixels(chart))
+    })
+    chart.update("none")
+    invalidatePoints(chart)
+  }
+
+  bezierValue() {
+    const value = this.edits.toValue(this.props.args.revision)
+    value.history = this.history.toValue()
+    return value
+  }
+
+  // Neighbour control points move together with the dragged one.
+  dragRange(index) {
+    return [index - 2, index + 2]
+  }
+
+  // The point at `index` and the points that move with it, with the sign of
+  // their move: the handles of a data point follow it, and the opposite
+  // handle of a handle mirrors it, so the curve stays smooth.
+  attachedPoints(index, length) {
+    if (index === 0) {
+      return [[0, 1], [1, 1]]
+    } else if (index === length - 1) {
+      return [[index, 1], [index - 1, 1]]
+    } else if (index % 3 === 0) {
+      return [[index, 1], [index - 1, 1], [index + 1, 1]]
+    } else if ((index + 1) % 3 === 0 && index + 1 !== length - 1) {
+      return [[index, 1], [index + 2, -1]]
+    } else if ((index - 1) % 3 === 0 && index - 1 !== 0) {
+      return [[index, 1], [index - 2, -1]]
+    }
+    return [[index, 1]]
+  }
+
+  // The y move of a dragged point of the curve, which keeps it in the range of
+  // its rule between the neighbouring points of the curve. Its control points
+  // move with it. O(1) per move.
+  constrainDelta(data, index, deltaY) {
+    if (this.dragRule === null) {
+      return deltaY
+    }
+    const previous = data[index - 3]
+    const next = data[index + 3]
+    const y = data[index].y
+    return constrainY(this.dragRule, y + deltaY, previous && previous.y, next && next.y) - y
   }
 
   togglePan(enabled) {
@@ -69,147 +230,111 @@ class CubicBezierChart extends StreamlitComponentBase {
   }
 
   downHandler = (event) => {
-    const points = getElementAtEvent(this.chartRef.current, event, {
-      intersect: false,
-    })
-    if (points.length > 0) {
-      const dataset =
-        this.chartRef.current.data.datasets[points[0].datasetIndex]
-      if (dataset.isControlPoint) {
-        this.setState({ activePoint: points[0] })
-        this.togglePan(false)
-      }
+    setShortcutTarget(this)
+    // Only control points are indexed, see picking.jsx.
+    const chart = this.chartRef.current
+    const point = getDraggableElementAtEvent(chart, event)
+    if (point !== null) {
+      const trace = chart.data.datasets[point.datasetIndex].label
+      this.dragStart = this.pointValues(trace, ...this.dragRange(point.index))
+      this.dragRule = curveRule(this.props.args.options, trace, point.index, 3)
+      this.activePoint = point
+      setCurveDrag(chart, true)
+      this.togglePan(false)
     }
   }
 
+  // Pointer moves are coalesced into one chart update per animation frame.
   moveHandler = (event) => {
-    if (this.state.activePoint) {
+    if (this.activePoint) {
+      this.pendingPosition = getRelativePosition(event, this.chartRef.current)
+      if (this.frame === null) {
+        this.frame = requestAnimationFrame(this.applyMove)
+      }
+    }
+  }
+
+  applyMove = () => {
+    this.frame = null
+    const position = this.pendingPosition
+    this.pendingPosition = null
+    if (this.activePoint && position !== null) {
       const chart = this.chartRef.current
-      const activePoint = this.state.activePoint
-      const position = getRelativePosition(event, chart)
+      const activePoint = this.activePoint
       const chartArea = chart.chartArea
-      const newYValue = calculateNewYValue(position, chartArea, chart.scales.y)
-      const newXValue = calculateNewXValue(position, chartArea, chart.scales.x)
-
-      // Update control point position
-      const datasetIndex = activePoint.datasetIndex
-      const dataset = chart.data.datasets[datasetIndex]
+      const dataset = chart.data.datasets[activePoint.datasetIndex]
       const pointIndex = activePoint.index
-      const deltaY = newYValue - dataset.data[pointIndex].y
-      const deltaX = newXValue - dataset.data[pointIndex].x
-
-      dataset.data[pointIndex].x = newXValue
-      dataset.data[pointIndex].y = newYValue
+      const point = dataset.data[pointIndex]
+      const newXValue = constrainX(
+        this.dragRule,
+        calculateNewXValue(position, chartArea, chart.scales.x),
+        point.x
+      )
+      const newYValue = calculateNewYValue(position, chartArea, chart.scales.y)
+      const moves = this.attachedPoints(pointIndex, dataset.data.length)
+      const deltaX = newXValue - point.x
+      const deltaY = this.constrainDelta(dataset.data, pointIndex, newYValue - point.y)
 
-      // Set new values in originalData
+      // Move the point and the points attached to it, in the chart and in originalData
       const datasetLabel = dataset.label
-      const originalDataset = this.state.originalData[datasetLabel] 
-      const xValue = dataset.data[pointIndex].x
-      const yValue = dataset.data[pointIndex].y
-      originalDataset["x"][pointIndex] = xValue
-      originalDataset["y"][pointIndex] = yValue
-
-      // If activePoint index is 3, move points 2 and 4 as well
-      // If activePoint index is 3, update originalData for points 2 and 4 as well
-      const dataLen = dataset.data.length
-      if (pointIndex === 0) {
-        dataset.data[pointIndex + 1].x += deltaX
-        dataset.data[pointIndex + 1].y += deltaY
-
-        originalDataset["x"][pointIndex + 1] += deltaX
-        originalDataset["y"][pointIndex + 1] += deltaY
-      } else if (pointIndex === dataLen - 1) {
-        dataset.data[pointIndex - 1].x += deltaX
-        dataset.data[pointIndex - 1].y += deltaY
-
-        originalDataset["x"][pointIndex - 1] += deltaX
-        originalDataset["y"][pointIndex - 1] += deltaY
-      } else if (
-        pointIndex % 3 === 0 &&
-        pointIndex !== 0 &&
-        pointIndex !== dataLen - 1
-      ) {
-        dataset.data[pointIndex - 1].x += deltaX
-        dataset.data[pointIndex - 1].y += deltaY
-
-        dataset.data[pointIndex + 1].x += deltaX
-        dataset.data[pointIndex + 1].y += deltaY
-
-        originalDataset["x"][pointIndex - 1] += deltaX
-        originalDataset["y"][pointIndex - 1] += deltaY
-
-        originalDataset["x"][pointIndex + 1] += deltaX
-        originalDataset["y"][pointIndex + 1] += deltaY
-      } else if ((pointIndex + 1) % 3 === 0 && pointIndex + 1 !== dataLen - 1) {
-        dataset.data[pointIndex + 2].x -= deltaX
-        dataset.data[pointIndex + 2].y -= deltaY
-
-        originalDataset["x"][pointIndex + 2] -= deltaX
-        originalDataset["y"][pointIndex + 2] -= deltaY
-      } else if ((pointIndex - 1) % 3 === 0 && pointIndex - 1 !== 0) {
-        dataset.data[pointIndex - 2].x -= deltaX
-        dataset.data[pointIndex - 2].y -= deltaY
-        originalDataset["x"][pointIndex - 2] -= deltaX
-        originalDataset["y"][pointIndex - 2] -= deltaY
-      }
+      const originalDataset = this.state.originalData[datasetLabel]
+      moves.forEach(([index, sign]) => {
+        dataset.data[index].x += sign * deltaX
+        dataset.data[index].y += sign * deltaY
+        originalDataset["x"][index] = dataset.data[index].x
+        originalDataset["y"][index] = dataset.data[index].y
+      })
 
-      // Recalculate Bezier data
-      const bezierData = createBezierData(
-        this.state.originalData,
-        this.props.args.options
+      // Recompute only the segments that use the moved control points
+      const curve = chart.data.datasets.find(
+        (bezierDataset) => bezierDataset.label === datasetLabel + " (bezier)"
       )
-      // Update state
-      this.setState({ bezierData })
+      updateBezierCurve(curve.data, dataset.data, 3, pointIndex - 2, pointIndex + 2, chartPixels(chart))
       chart.update("none")
     }
   }
 
   upHandler = (event) => {
-    if (this.state.activePoint) {
-      this.sendBezierData()
-      this.setState({ activePoint: null })
+    if (this.activePoint) {
+      if (this.frame !== null) {
+        cancelAnimationFrame(this.frame)
+        this.applyMove()
+      }
+      const activePoint = this.activePoint
+      const dataset = this.chartRef.current.data.datasets[activePoint.datasetIndex]
+      this.recordEdits(dataset.label, ...this.dragRange(activePoint.index))
+      this.batch.push(this.bezierValue())
+      this.activePoint = null
+      invalidatePoints(this.chartRef.current)
+      // The update of `togglePan` samples the curves for the scales after the drag.
+      setCurveDrag(this.chartRef.current, false)
       this.togglePan(true)
     }
   }
 
-  convertBezierData(bezierData) {
-    const result = {}
-    bezierData.forEach((dataset) => {
-      const trace = dataset.label.replace(" (bezier)", "")
-      result[trace] = {
-        x: [],
-        y: [],
-      }
-      dataset.data.forEach((point) => {
-        const { x, y } = point
-        const index = result[trace].x.findIndex(
-          (val, i) => val === x && result[trace].y[i] === y
-        )
-        if (index === -1) {
-          result[trace].x.push(x)
-          result[trace].y.push(y)
-        }
-      })
-    })
-    return result
-  }
-
   render() {
     return (
-      <Scatter
-        ref={this.chartRef}
-        data={{
-          datasets: [
-            ...this.state.controlData.datasets,
-            ...this.state.bezierData.datasets,
-            ...this.fixedData.datasets,
-          ],
-        }}
-        options={this.state.options}
-        onPointerDown={this.downHandler}
-        onPointerUp={this.upHandler}
-        onPointerMove={this.moveHandler}
-      />
+      <div style={{ position: "relative" }}>
+        <Scatter
+          ref={this.chartRef}
+          data={{
+            datasets: [
+              ...this.state.controlData.datasets,
+              ...this.state.bezierData.datasets,
+              ...this.fixedData.datasets,
+            ],
+          }}
+          options={this.state.options}
+          onPointerDown={this.downHandler}
+          onPointerUp={this.upHandler}
+          onPointerMove={this.moveHandler}
+        />
+        <ApplyButton
+          count={this.state.batched}
+          onClick={this.batch.commit}
+          theme={this.props.theme}
+        />
+      </div>
     )
   }
 }
@@ -1,12 +1,14 @@
-import { Bezier } from "bezier-js"
 import rgba from "color-rgba"
 
-export function createFixedData(data, options) {
+import { createBezierCurve } from "../Utils/bezier"
+
+export function createFixedData(data, options, styles) {
   const datasets = Object.entries(data)
     .filter(([colName]) => options.fixed_lines.includes(colName))
     .map(([colName, colData], index) => {
+      const style = styles.get(colName)
       const data = colData.x.map((x, i) => ({ x, y: colData.y[i] }))
-      const colorRGBA = rgba(colData.color)
+      const colorRGBA = rgba(style.color)
       const backgroundColorRGBA = `rgba(${colorRGBA[0]}, ${colorRGBA[1]}, ${colorRGBA[2]}, 0.7)`
       return {
         data: data,
@@ -17,9 +19,9 @@ export function createFixedData(data, options) {
         showLine: true,
         backgroundColor: backgroundColorRGBA,
         spanGaps: options.fill_gaps,
-        borderColor: colData.color,
-        pointRadius: colData.point_radius,
-        borderDash: colData.border_dash,
+        borderColor: style.color,
+        pointRadius: style.point_radius,
+        borderDash: style.border_dash,
       }
     })
 
@@ -28,7 +30,7 @@ export function createFixedData(data, options) {
   }
 }
 
-export function createControlData(data, options) {
+export function createControlData(data, options, styles) {
   const lineControl = (ctx, value, length) => {
     const index = ctx.p1DataIndex
     if (
@@ -44,8 +46,9 @@ export function createControlData(data, options) {
   const datasets = Object.entries(data)
     .filter(([colName]) => !options.fixed_lines.includes(colName))
     .map(([colName, colData], index) => {
+      const style = styles.get(colName)
       const data = colData.x.map((x, i) => ({ x, y: colData.y[i] }))
-      const colorRGBA = rgba(colData.color)
+      const colorRGBA = rgba(style.color)
       const borderColorRGBA = `rgba(${colorRGBA[0]}, ${colorRGBA[1]}, ${colorRGBA[2]}, 1)`
       const backgroundColorRGBA = `rgba(${colorRGBA[0]}, ${colorRGBA[1]}, ${colorRGBA[2]}, 0.8)`
       return {
@@ -60,7 +63,7 @@ export function createControlData(data, options) {
           borderColor: (ctx) => lineControl(ctx, borderColorRGBA, data.length),
         },
         backgroundColor: backgroundColorRGBA,
-        pointRadius: colData.point_radius,
+        pointRadius: style.point_radius,
       }
     })
 
@@ -69,35 +72,32 @@ export function createControlData(data, options) {
   }
 }
 
-export function createBezierData(data, options) {
+export function createBezierData(data, options, styles) {
   const datasets = Object.entries(data)
     .filter(([trace]) => !options.fixed_lines.includes(trace))
     .map(([trace, traceData], i) => {
+      const style = styles.get(trace)
       const points = traceData.x.map((x, j) => ({
         x: x,
         y: traceData.y[j],
       }))
 
-      const bezierSegments = []
-      for (let i = 0; i < points.length - 3; i += 3) {
-        const bezierPoints = points.slice(i, i + 4)
-        const bezier = new Bezier(bezierPoints)
-        const lut = bezier.getLUT(10)
-        bezierSegments.push(...lut)
-      }
-      const colorRGBA = rgba(traceData.color)
+      const bezierSegments = createBezierCurve(points, 3)
+      const colorRGBA = rgba(style.color)
       const backgroundColorRGBA = `rgba(${colorRGBA[0]}, ${colorRGBA[1]}, ${colorRGBA[2]}, 0.7)`
       const borderColorRGBA = `rgba(${colorRGBA[0]}, ${colorRGBA[1]}, ${colorRGBA[2]}, 0.6)`
       return {
         label: trace + " (bezier)",
         data: bezierSegments,
+        bezierOrder: 3,
+        controlLabel: trace,
         isControlPoint: false,
         showLine: true,
         tension: 0.3,
         backgroundColor: backgroundColorRGBA,
         borderColor: borderColorRGBA,
         pointRadius: 0,
-        borderDash: traceData.border_dash,
+        borderDash: style.border_dash,
       }
     })
 
@@ -2,60 +2,280 @@ import { Chart, registerables } from "chart.js"
 import { getRelativePosition } from "chart.js/helpers"
 import zoomPlugin from "chartjs-plugin-zoom"
 import React from "react"
-import { Line, getElementAtEvent } from "react-chartjs-2"
-import { Streamlit, StreamlitComponentBase } from "streamlit-component-lib"
-import { createChartData } from "./chartData"
+import { Line } from "react-chartjs-2"
+import { StreamlitComponentBase } from "streamlit-component-lib"
+import { createArrowChartData, createChartData } from "./chartData"
 import { createOptions } from "../Utils/chartOptions"
 import { calculateNewYValue } from "../Utils/handlers"
+import { constrainY, traceRule } from "../Utils/constraints"
+import { EditLog } from "../Utils/edits"
+import { EditHistory, historyShortcut, setShortcutTarget } from "../Utils/history"
+import { ApplyButton, ValueBatch } from "../Utils/batch"
+import { TraceLegend } from "../Utils/legend"
+import { sendValue, setFrameHeight } from "../Utils/host"
+import {
+  getDraggableElementAtEvent,
+  invalidatePoints,
+  pickingPlugin,
+} from "../Utils/picking"
+import { createStyleTable } from "../Utils/styles"
 
-Chart.register(...registerables, zoomPlugin)
+Chart.register(...registerables, zoomPlugin, pickingPlugin)
 
 class LineChart extends StreamlitComponentBase {
   constructor(props) {
     super(props)
     this.chartRef = React.createRef()
+    this.edits = new EditLog()
+    this.history = new EditHistory(props.args.options.history_bytes)
+    this.batch = new ValueBatch(
+      (value) => sendValue(this.props, value),
+      (count) => this.setState({ batched: count })
+    )
+    this.batch.configure(props.args.options)
+    // Positions of the rows of a streamed chart, see `appendRows`.
+    this.stream = null
+    // Traces turned on in the legend of a wide frame, see `toggleTrace`.
+    this.visible = props.args.wide ? new Set(props.args.wide.visible) : null
     this.state = {
+      batched: 0,
       activePoint: null,
-      originalData: props.args.data,
-      chartData: createChartData(props.args.data, props.args.options.colors),
-      options: createOptions(props.args.options, props.theme),
+      visible: this.visible,
+      chartData: this.createData(props.args),
+      options: this.createChartOptions(props.args),
+    }
+  }
+
+  createData(args) {
+    this.styles = createStyleTable(args.styles)
+    const chartData = args.table
+      ? createArrowChartData(args.table, args.data, args.options, this.styles)
+      : createChartData(args.data, args.options, this.styles)
+    if (this.visible !== null) {
+      // Traces turned off since Python sent them are only hidden.
+      chartData.datasets.forEach((dataset) => {
+        dataset.hidden = !this.visible.has(dataset.label)
+      })
+    }
+    if (args.stream) {
+      const start = args.stream.start
+      this.stream = { first: start, end: start + chartData.labels.length }
+      this.resyncPending = !args.stream.reset
+    } else {
+      this.stream = null
+    }
+    // Keep the user's edits when the chart is rebuilt for the same data.
+    const first = this.firstPosition()
+    const datasets = new Map(chartData.datasets.map((d) => [d.column, d]))
+    this.edits.forEach(([column, position, value]) => {
+      const dataset = datasets.get(column)
+      if (dataset && position >= first && position - first < chartData.labels.length) {
+        dataset.data[position - first] = value
+      }
+    })
+    return chartData
+  }
+
+  // A wide frame has its own legend instead of the one of Chart.js.
+  createChartOptions(args) {
+    const options = args.wide ? { ...args.options, legend: false } : args.options
+    return createOptions(options, this.props.theme)
+  }
+
+  // Position of the first point, which is not 0 in a stream that dropped rows.
+  firstPosition() {
+    return this.stream ? this.stream.first : 0
+  }
+
+  componentDidMount() {
+    setFrameHeight(this.props)
+    window.addEventListener("keydown", this.keyHandler)
+    this.runCommands(this.props.args)
+    const stream = this.props.args.stream
+    // A chart mounted in the middle of a stream only has the latest rows.
+    if (stream && !stream.reset) {
+      this.requestResync()
     }
   }
 
+  componentWillUnmount() {
+    window.removeEventListener("keydown", this.keyHandler)
+    this.batch.commit()
+  }
+
   componentDidUpdate(prevProps) {
-    Streamlit.setFrameHeight()
+    setFrameHeight(this.props)
     if (this.props.args !== prevProps.args) {
+      if (this.props.args.revision !== prevProps.args.revision) {
+        this.edits.clear()
+        this.history.clear()
+        this.batch.clear()
+        this.visible = this.props.args.wide ? new Set(this.props.args.wide.visible) : null
+      }
+      this.batch.configure(this.props.args.options)
+      this.runCommands(this.props.args)
+      const stream = this.props.args.stream
+      if (stream && !stream.reset) {
+        this.appendRows(this.props.args)
+        return
+      }
       this.setState({
-        originalData: this.props.args.data,
-        chartData: createChartData(
-          this.props.args.data,
-          this.props.args.options
-        ),
-        options: createOptions(this.props.args.options, this.props.theme),
+        visible: this.visible,
+        chartData: this.createData(this.props.args),
+        options: this.createChartOptions(this.props.args),
       })
     }
   }
 
+  // Rows appended to a stream are added to the chart in place, so the zoom and
+  // an ongoing drag are kept. Rows before the window are dropped.
+  appendRows(args) {
+    if (this.resyncPending) {
+      return
+    }
+    if (this.stream === null) {
+      this.requestResync()
+      return
+    }
+    const { start, window } = args.stream
+    const tail = args.table
+      ? createArrowChartData(args.table, args.data, args.options, createStyleTable(args.styles))
+      : createChartData(args.data, args.options, createStyleTable(args.styles))
+    const count = tail.labels.length
+    // With a window, new rows can replace all the rows of the chart.
+    const replacesAll = window && start > this.stream.end && count >= window
+    if (start !== this.stream.end && !replacesAll) {
+      // Rows are missing, e.g. if the frontend skipped a rerun.
+      this.requestResync()
+      return
+    }
+    const chart = this.chartRef.current
+    const data = chart.data
+    const byColumn = new Map(tail.datasets.map((d) => [d.column, d.data]))
+    data.labels.push(...tail.labels)
+    data.datasets.forEach((dataset) => dataset.data.push(...byColumn.get(dataset.column)))
+    this.stream.end = start + count
+    const drop = window ? Math.max(0, data.labels.length - window) : 0
+    if (drop > 0) {
+      data.labels.splice(0, drop)
+      data.datasets.forEach((dataset) => dataset.data.splice(0, drop))
+      this.stream.first = this.stream.end - data.labels.length
+      this.shiftActivePoint(drop)
+    }
+    chart.update("none")
+    invalidatePoints(chart)
+  }
+
+  shiftActivePoint(drop) {
+    const point = this.state.activePoint
+    if (point === null) {
+      return
+    }
+    if (point.index < drop) {
+      // The dragged point left the window.
+      this.setState({ activePoint: null })
+      this.togglePan(true)
+    } else {
+      this.setState({ activePoint: { ...point, index: point.index - drop } })
+    }
+  }
+
+  requestResync() {
+    // A new value on every request, so Python can tell them apart.
+    this.resync = `${Date.now()}-${Math.random()}`
+    this.resyncPending = true
+    this.batch.flush({ ...this.editValue(), resync: this.resync })
+  }
+
+  editValue() {
+    const value = {
+      ...this.edits.toValue(this.props.args.revision),
+      history: this.history.toValue(),
+    }
+    if (this.visible !== null) {
+      value.visible = Array.from(this.visible)
+    }
+    return value
+  }
+
+  // Traces of a wide frame that Python sent are hidden and shown in place.
+  // Other ones are asked for in the value, and Python sends them in a rerun.
+  toggleTrace = (trace) => {
+    const visible = new Set(this.visible)
+    if (visible.has(trace)) {
+      visible.delete(trace)
+    } else {
+      visible.add(trace)
+    }
+    this.visible = visible
+    this.setState({ visible: visible })
+    const chart = this.chartRef.current
+    const dataset = chart.data.datasets.find((d) => d.label === trace)
+    if (dataset) {
+      dataset.hidden = !visible.has(trace)
+      chart.update("none")
+    } else {
+      this.batch.flush(this.editValue())
+    }
+  }
+
+  // Undo and redo commands sent by Python, see `undo` in Python.
+  runCommands(args) {
+    this.history.maxBytes = args.options.history_bytes
+    const actions = this.history.receive(args.history)
+    if (actions.length > 0) {
+      actions.forEach((action) => this.applyCells(this.history[action]()))
+      this.batch.flush(this.editValue())
+    }
+  }
+
+  keyHandler = (event) => {
+    const action = historyShortcut(event, this)
+    if (action !== null && this.state.activePoint === null) {
+      event.preventDefault()
+      const cells = this.history[action]()
+      if (cells !== null) {
+        this.applyCells(cells)
+        this.batch.push(this.editValue())
+      }
+    }
+  }
+
+  // Set points to their values before or after an edit, for undo and redo.
+  applyCells(cells) {
+    if (cells === null) {
+      return
+    }
+    const chart = this.chartRef.current
+    const first = this.firstPosition()
+    cells.forEach(([column, position, [value]]) => {
+      this.edits.set(column, position, value)
+      const dataset = chart && chart.data.datasets.find((d) => d.column === column)
+      if (dataset && position >= first && position - first < dataset.data.length) {
+        dataset.data[position - first] = value
+      }
+    })
+    if (chart) {
+      chart.update("none")
+      invalidatePoints(chart)
+    }
+  }
+
   togglePan(enabled) {
     this.chartRef.current.options.plugins.zoom.pan.enabled = enabled
     this.chartRef.current.update("none")
   }
 
   downHandler = (event) => {
-    const points = getElementAtEvent(this.chartRef.current, event, {
-      intersect: false,
-    })
-    if (points.length > 0) {
-      const datasetLabel =
-        this.chartRef.current.data.datasets[points[0].datasetIndex].label
-      if (
-        this.props.args.options.fixed_lines &&
-        this.props.args.options.fixed_lines.includes(datasetLabel)
-      ) {
-        // This line is fixed, so don't allow it to be moved
-        return
-      }
-      this.setState({ activePoint: points[0] })
+    setShortcutTarget(this)
+    // Fixed lines are not indexed, so they can't be moved.
+    const chart = this.chartRef.current
+    const point = getDraggableElementAtEvent(chart, event)
+    if (point !== null) {
+      const dataset = chart.data.datasets[point.datasetIndex]
+      this.dragStart = dataset.data[point.index]
+      this.dragRule = traceRule(this.props.args.options, dataset.label)
+      this.setState({ activePoint: point })
       this.togglePan(false)
     }
   }
@@ -66,13 +286,14 @@ class LineChart extends StreamlitComponentBase {
       const position = getRelativePosition(event, this.chartRef.current)
       const chartArea = chart.chartArea
       const yAxis = chart.scales.y
-      const yValue = calculateNewYValue(position, chartArea, yAxis)
       const pointIndex = this.state.activePoint.index
-      const xLabel = this.state.chartData.labels[pointIndex]
-
-      chart.data.datasets[this.state.activePoint.datasetIndex].data[
-        xLabel
-      ] = yValue
+      const data = chart.data.datasets[this.state.activePoint.datasetIndex].data
+      data[pointIndex] = constrainY(
+        this.dragRule,
+        calculateNewYValue(position, chartArea, yAxis),
+        data[pointIndex - 1],
+        data[pointIndex + 1]
+      )
       chart.update("none")
     }
   }
@@ -80,29 +301,47 @@ class LineChart extends StreamlitComponentBase {
   upHandler = (event) => {
     if (this.state.activePoint) {
       const chart = this.chartRef.current
-      const datasetIndex = this.state.activePoint.datasetIndex
+      const dataset = chart.data.datasets[this.state.activePoint.datasetIndex]
       const pointIndex = this.state.activePoint.index
-      const datasetLabel = chart.data.datasets[datasetIndex].label
-      const xLabel = this.state.chartData.labels[pointIndex]
-      const yValue = chart.data.datasets[datasetIndex].data[xLabel]
+      const yValue = dataset.data[pointIndex]
 
-      this.state.originalData[datasetLabel]["data"][xLabel] = yValue
+      const position = this.firstPosition() + pointIndex
+      this.edits.set(dataset.column, position, yValue)
+      this.history.record([[dataset.column, position, [this.dragStart], [yValue]]])
       this.setState({ activePoint: null })
+      invalidatePoints(this.chartRef.current)
       this.togglePan(true)
-      Streamlit.setComponentValue(this.state.originalData)
+      this.batch.push(this.editValue())
     }
   }
 
   render() {
     return (
-      <Line
-        ref={this.chartRef}
-        data={this.state.chartData}
-        options={this.state.options}
-        onPointerDown={this.downHandler}
-        onPointerUp={this.upHandler}
-        onPointerMove={this.moveHandler}
-      />
+      <div style={{ position: "relative" }}>
+        {this.props.args.wide && this.props.args.options.legend !== false && (
+          <TraceLegend
+            traces={this.props.args.wide.traces}
+            visible={this.state.visible}
+            styles={this.styles}
+            labels={this.props.args.options.labels}
+            onToggle={this.toggleTrace}
+            theme={this.props.theme}
+          />
+        )}
+        <Line
+          ref={this.chartRef}
+          data={this.state.chartData}
+          options={this.state.options}
+          onPointerDown={this.downHandler}
+          onPointerUp={this.upHandler}
+          onPointerMove={this.moveHandler}
+        />
+        <ApplyButton
+          count={this.state.batched}
+          onClick={this.batch.commit}
+          theme={this.props.theme}
+        />
+      </div>
     )
   }
 }
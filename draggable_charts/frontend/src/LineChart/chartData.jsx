@@ -1,23 +1,10 @@
-export function createChartData(data, options) {
-  const xLabels = Object.keys(data[Object.keys(data)[0]].data)
-  const datasets = Object.entries(data).map(([colName, colData], index) => {
-    return {
-      showLine: options.show_line,
-      data: colData.data,
-      label: colName,
-      lineTension: options.tension,
-      cubicInterpolationMode: "default",
-      spanGaps: options.fill_gaps,
-      backgroundColor: colData.color,
-      borderColor: colData.color,
-      pointRadius: colData.point_radius,
-      borderDash: colData.border_dash,
-      fill: {
-        target: colData.fill,
-        above: 'rgb(128, 128, 128, 0.2)',
-        below: 'rgb(128, 128, 128, 0.2)',
-      },
-    }
+export function createChartData(data, options, styles) {
+  // Charts of wide frames can start without traces, see `visible_traces`.
+  const first = Object.values(data)[0]
+  const xLabels = first ? Object.keys(first.data) : []
+  const datasets = Object.entries(data).map(([colName, colData]) => {
+    const values = xLabels.map((xLabel) => colData.data[xLabel])
+    return createDataset(colName, values, colData, styles.get(colName), options)
   })
 
   return {
@@ -25,3 +12,43 @@ export function createChartData(data, options) {
     datasets: datasets,
   }
 }
+
+export function createArrowChartData(table, data, options, styles) {
+  const xLabels = Array.from(table.index.getChildAt(0), toPlainValue)
+  const datasets = Object.entries(data).map(([colName, colData]) => {
+    const column = table.table.getChildAt(colData.field)
+    const values = Array.from(column, toPlainValue)
+    return createDataset(colName, values, colData, styles.get(colName), options)
+  })
+
+  return {
+    labels: xLabels,
+    datasets: datasets,
+  }
+}
+
+function createDataset(colName, values, colData, style, options) {
+  return {
+    showLine: options.show_line,
+    data: values,
+    label: colName,
+    column: colData.column,
+    lineTension: options.tension,
+    cubicInterpolationMode: "default",
+    spanGaps: options.fill_gaps,
+    backgroundColor: style.color,
+    borderColor: style.color,
+    pointRadius: style.point_radius,
+    borderDash: style.border_dash,
+    fill: {
+      target: style.fill,
+      above: 'rgb(128, 128, 128, 0.2)',
+      below: 'rgb(128, 128, 128, 0.2)',
+    },
+  }
+}
+
+function toPlainValue(value) {
+  // Arrow returns int64 columns as BigInt, which Chart.js cannot scale.
+  return typeof value === "bigint" ? Number(value) : value
+}
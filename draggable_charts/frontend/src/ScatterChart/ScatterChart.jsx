@@ -3,60 +3,150 @@ import { getRelativePosition } from "chart.js/helpers"
 import zoomPlugin from "chartjs-plugin-zoom"
 import React from "react"
 
-import { Scatter, getElementAtEvent } from "react-chartjs-2"
-import { Streamlit, StreamlitComponentBase } from "streamlit-component-lib"
+import { Scatter } from "react-chartjs-2"
+import { StreamlitComponentBase } from "streamlit-component-lib"
 import { createChartData } from "./chartData"
 import { createOptions } from "../Utils/chartOptions"
 import { calculateNewXValue, calculateNewYValue } from "../Utils/handlers"
+import { constrainX, constrainY, traceRule } from "../Utils/constraints"
+import { EditLog } from "../Utils/edits"
+import { EditHistory, historyShortcut, setShortcutTarget } from "../Utils/history"
+import { ApplyButton, ValueBatch } from "../Utils/batch"
+import { sendValue, setFrameHeight } from "../Utils/host"
+import {
+  getDraggableElementAtEvent,
+  invalidatePoints,
+  pickingPlugin,
+} from "../Utils/picking"
+import { createStyleTable } from "../Utils/styles"
 
-Chart.register(...registerables, zoomPlugin)
+Chart.register(...registerables, zoomPlugin, pickingPlugin)
 
 class ScatterChart extends StreamlitComponentBase {
   constructor(props) {
     super(props)
     this.chartRef = React.createRef()
+    this.edits = new EditLog()
+    this.history = new EditHistory(props.args.options.history_bytes)
+    this.batch = new ValueBatch(
+      (value) => sendValue(this.props, value),
+      (count) => this.setState({ batched: count })
+    )
+    this.batch.configure(props.args.options)
     this.state = {
+      batched: 0,
       activePoint: null,
-      originalData: props.args.data,
-      chartData: createChartData(props.args.data, props.args.options.colors),
+      chartData: this.createData(props.args),
       options: createOptions(props.args.options, props.theme),
     }
   }
 
+  createData(args) {
+    const chartData = createChartData(
+      args.data,
+      args.options,
+      createStyleTable(args.styles)
+    )
+    // Keep the user's edits when the chart is rebuilt for the same data.
+    const datasets = new Map(chartData.datasets.map((d) => [d.label, d]))
+    this.edits.forEach(([trace, pointIndex, x, y]) => {
+      datasets.get(trace).data[pointIndex] = { x, y }
+    })
+    return chartData
+  }
+
+  componentDidMount() {
+    setFrameHeight(this.props)
+    window.addEventListener("keydown", this.keyHandler)
+    this.runCommands(this.props.args)
+  }
+
+  componentWillUnmount() {
+    window.removeEventListener("keydown", this.keyHandler)
+    this.batch.commit()
+  }
+
   componentDidUpdate(prevProps) {
-    Streamlit.setFrameHeight()
+    setFrameHeight(this.props)
     if (this.props.args !== prevProps.args) {
+      if (this.props.args.revision !== prevProps.args.revision) {
+        this.edits.clear()
+        this.history.clear()
+        this.batch.clear()
+      }
+      this.batch.configure(this.props.args.options)
+      this.runCommands(this.props.args)
       this.setState({
-        originalData: this.props.args.data,
-        chartData: createChartData(
-          this.props.args.data,
-          this.props.args.options
-        ),
+        chartData: this.createData(this.props.args),
         options: createOptions(this.props.args.options, this.props.theme),
       })
     }
   }
 
+  editValue() {
+    return {
+      ...this.edits.toValue(this.props.args.revision),
+      history: this.history.toValue(),
+    }
+  }
+
+  // Undo and redo commands sent by Python, see `undo` in Python.
+  runCommands(args) {
+    this.history.maxBytes = args.options.history_bytes
+    const actions = this.history.receive(args.history)
+    if (actions.length > 0) {
+      actions.forEach((action) => this.applyCells(this.history[action]()))
+      this.batch.flush(this.editValue())
+    }
+  }
+
+  keyHandler = (event) => {
+    const action = historyShortcut(event, this)
+    if (action !== null && this.state.activePoint === null) {
+      event.preventDefault()
+      const cells = this.history[action]()
+      if (cells !== null) {
+        this.applyCells(cells)
+        this.batch.push(this.editValue())
+      }
+    }
+  }
+
+  // Set points to their values before or after an edit, for undo and redo.
+  applyCells(cells) {
+    if (cells === null) {
+      return
+    }
+    const chart = this.chartRef.current
+    cells.forEach(([trace, index, [x, y]]) => {
+      this.edits.set(trace, index, x, y)
+      const dataset = chart && chart.data.datasets.find((d) => d.label === trace)
+      if (dataset) {
+        dataset.data[index] = { x, y }
+      }
+    })
+    if (chart) {
+      chart.update("none")
+      invalidatePoints(chart)
+    }
+  }
+
   togglePan(enabled) {
     this.chartRef.current.options.plugins.zoom.pan.enabled = enabled
     this.chartRef.current.update("none")
   }
 
   downHandler = (event) => {
-    const points = getElementAtEvent(this.chartRef.current, event, {
-      intersect: false,
-    })
-    if (points.length > 0) {
-      const datasetLabel =
-        this.chartRef.current.data.datasets[points[0].datasetIndex].label
-      if (
-        this.props.args.options.fixed_lines &&
-        this.props.args.options.fixed_lines.includes(datasetLabel)
-      ) {
-        // This line is fixed, so don't allow it to be moved
-        return
-      }
-      this.setState({ activePoint: points[0] })
+    setShortcutTarget(this)
+    // Fixed lines are not indexed, so they can't be moved.
+    const chart = this.chartRef.current
+    const point = getDraggableElementAtEvent(chart, event)
+    if (point !== null) {
+      const dataset = chart.data.datasets[point.datasetIndex]
+      const { x, y } = dataset.data[point.index]
+      this.dragStart = [x, y]
+      this.dragRule = traceRule(this.props.args.options, dataset.label)
+      this.setState({ activePoint: point })
       this.togglePan(false)
     }
   }
@@ -80,13 +170,12 @@ class ScatterChart extends StreamlitComponentBase {
         chart.scales.x,
         this.props.args.options.x_type
       )
-      chart.data.datasets[this.state.activePoint.datasetIndex].data[
-        this.state.activePoint.index
-      ].y = newYValue
-
-      chart.data.datasets[this.state.activePoint.datasetIndex].data[
-        this.state.activePoint.index
-      ].x = newXValue
+      const data = chart.data.datasets[this.state.activePoint.datasetIndex].data
+      const index = this.state.activePoint.index
+      const previous = data[index - 1]
+      const next = data[index + 1]
+      data[index].y = constrainY(this.dragRule, newYValue, previous && previous.y, next && next.y)
+      data[index].x = constrainX(this.dragRule, newXValue, data[index].x)
 
       chart.update("none")
     }
@@ -94,31 +183,37 @@ class ScatterChart extends StreamlitComponentBase {
   upHandler = (event) => {
     if (this.state.activePoint) {
       const chart = this.chartRef.current
-      const datasetIndex = this.state.activePoint.datasetIndex
+      const dataset = chart.data.datasets[this.state.activePoint.datasetIndex]
       const pointIndex = this.state.activePoint.index
-      const datasetLabel = chart.data.datasets[datasetIndex].label
-      const xValue = chart.data.datasets[datasetIndex].data[pointIndex].x
-      const yValue = chart.data.datasets[datasetIndex].data[pointIndex].y
+      const { x, y } = dataset.data[pointIndex]
 
-      this.state.originalData[datasetLabel]["x"][pointIndex] = xValue
-      this.state.originalData[datasetLabel]["y"][pointIndex] = yValue
-      Streamlit.setComponentValue(this.state.originalData)
+      this.edits.set(dataset.label, pointIndex, x, y)
+      this.history.record([[dataset.label, pointIndex, this.dragStart, [x, y]]])
+      this.batch.push(this.editValue())
 
       this.setState({ activePoint: null })
+      invalidatePoints(this.chartRef.current)
       this.togglePan(true)
     }
   }
 
   render() {
     return (
-      <Scatter
-        ref={this.chartRef}
-        data={this.state.chartData}
-        options={this.state.options}
-        onPointerDown={this.downHandler}
-        onPointerUp={this.upHandler}
-        onPointerMove={this.moveHandler}
-      />
+      <div style={{ position: "relative" }}>
+        <Scatter
+          ref={this.chartRef}
+          data={this.state.chartData}
+          options={this.state.options}
+          onPointerDown={this.downHandler}
+          onPointerUp={this.upHandler}
+          onPointerMove={this.moveHandler}
+        />
+        <ApplyButton
+          count={this.state.batched}
+          onClick={this.batch.commit}
+          theme={this.props.theme}
+        />
+      </div>
     )
   }
 }
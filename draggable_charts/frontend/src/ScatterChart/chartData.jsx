@@ -1,6 +1,7 @@
-export function createChartData(data, options) {
+export function createChartData(data, options, styles) {
   const xLabels = options && options.x_labels ? options.x_labels : []
   const datasets = Object.entries(data).map(([colName, colData], index) => {
+    const style = styles.get(colName)
     const data = colData.x.map((x, i) => ({ x, y: colData.y[i] }))
     return {
       showLine: options.show_line,
@@ -9,10 +10,10 @@ export function createChartData(data, options) {
       lineTension: options.tension,
       cubicInterpolationMode: "default",
       spanGaps: options.fill_gaps,
-      backgroundColor: colData.color,
-      borderColor: colData.color,
-      pointRadius: colData.point_radius,
-      borderDash: colData.border_dash,
+      backgroundColor: style.color,
+      borderColor: style.color,
+      pointRadius: style.point_radius,
+      borderDash: style.border_dash,
     }
   })
 
@@ -0,0 +1,89 @@
+import React from "react"
+
+// Buffers the values of a chart with the `batch` option, so a series of
+// drags triggers one rerun instead of one per drag. The last value holds
+// every edit, so only it is sent: with the Apply button, after `batch_delay`
+// seconds without edits, or once `batch_size` edits are buffered.
+export class ValueBatch {
+  constructor(send, onCountChange) {
+    this.send = send
+    this.onCountChange = onCountChange
+    this.options = {}
+    this.value = null
+    this.count = 0
+    this.timer = null
+  }
+
+  configure(options) {
+    this.options = options
+  }
+
+  // A value after an edit of the user, sent now or buffered.
+  push(value) {
+    if (!this.options.batch) {
+      this.send(value)
+      return
+    }
+    this.value = value
+    this.count += 1
+    clearTimeout(this.timer)
+    if (this.options.batch_size && this.count >= this.options.batch_size) {
+      this.commit()
+      return
+    }
+    if (this.options.batch_delay !== null && this.options.batch_delay !== undefined) {
+      this.timer = setTimeout(this.commit, this.options.batch_delay * 1000)
+    }
+    this.onCountChange(this.count)
+  }
+
+  // Send a value now. It holds every edit, so the batch is committed too.
+  flush(value) {
+    this.clear()
+    this.send(value)
+  }
+
+  commit = () => {
+    if (this.value !== null) {
+      const value = this.value
+      this.clear()
+      this.send(value)
+    }
+  }
+
+  // Forget the buffered edits, e.g. when the chart gets new data.
+  clear() {
+    clearTimeout(this.timer)
+    this.timer = null
+    this.value = null
+    if (this.count > 0) {
+      this.count = 0
+      this.onCountChange(0)
+    }
+  }
+}
+
+// Commits the buffered edits of a chart. Hidden when there are none.
+export function ApplyButton({ count, onClick, theme }) {
+  if (count === 0) {
+    return null
+  }
+  const color = theme ? theme.primaryColor : "#ff4b4b"
+  return (
+    <button
+      type="button"
+      className="btn btn-sm"
+      onClick={onClick}
+      style={{
+        position: "absolute",
+        top: 0,
+        right: 0,
+        color: "white",
+        backgroundColor: color,
+        borderColor: color,
+      }}
+    >
+      Apply {count} {count === 1 ? "edit" : "edits"}
+    </button>
+  )
+}
@@ -0,0 +1,162 @@
+import { Bezier } from "bezier-js"
+
+// Maximum distance in pixels between the drawn curve and the true one. Each
+// segment is split in halves until its control points are this close to their
+// chord, like `sample_curve` in Python does for the returned curve.
+const PIXEL_TOLERANCE = 0.5
+// Deepest split, so a segment has at most 2 ** MAX_DEPTH + 1 points.
+const MAX_DEPTH = 8
+// Steps of each segment before the chart is laid out, when pixels are unknown.
+const LUT_STEPS = 10
+
+// Number of points of each segment of a curve, as segments have different sizes.
+const segmentSizes = new WeakMap()
+
+// Distance from the inner control points to the chord of a segment, which
+// bounds the distance from the curve to the chord.
+function flatness(points) {
+  const first = points[0]
+  const last = points[points.length - 1]
+  const dx = last.x - first.x
+  const dy = last.y - first.y
+  const chord = Math.hypot(dx, dy)
+  let distance = 0
+  for (let i = 1; i < points.length - 1; i++) {
+    const px = points[i].x - first.x
+    const py = points[i].y - first.y
+    const d = chord === 0 ? Math.hypot(px, py) : Math.abs(dx * py - dy * px) / chord
+    distance = Math.max(distance, d)
+  }
+  return distance
+}
+
+// Control points of both halves of a segment, with de Casteljau's algorithm.
+function halves(points) {
+  const left = [points[0]]
+  const right = [points[points.length - 1]]
+  let level = points
+  while (level.length > 1) {
+    level = level.slice(1).map((p, i) => ({ x: (level[i].x + p.x) / 2, y: (level[i].y + p.y) / 2 }))
+    left.push(level[0])
+    right.unshift(level[level.length - 1])
+  }
+  return [left, right]
+}
+
+// Parameters of the start of every flat piece of a segment, in order.
+function splitTimes(points, start, size, depth, times) {
+  if (depth === MAX_DEPTH || flatness(points) <= PIXEL_TOLERANCE) {
+    times.push(start)
+    return
+  }
+  const [left, right] = halves(points)
+  splitTimes(left, start, size / 2, depth + 1, times)
+  splitTimes(right, start + size / 2, size / 2, depth + 1, times)
+}
+
+function segmentPoints(points, start, order, pixels) {
+  const controls = points.slice(start, start + order + 1)
+  const bezier = new Bezier(controls)
+  if (!pixels) {
+    return bezier.getLUT(LUT_STEPS)
+  }
+  const times = []
+  splitTimes(controls.map(pixels), 0, 1, 0, times)
+  times.push(1)
+  return times.map((t) => bezier.get(t))
+}
+
+// Converts points of the data to pixels of `chart`, or null if it has no
+// scales yet.
+export function chartPixels(chart) {
+  const scales = chart && chart.scales
+  if (!scales || !scales.x || !scales.y || !chart.chartArea) {
+    return null
+  }
+  return (point) => ({
+    x: scales.x.getPixelForValue(point.x),
+    y: scales.y.getPixelForValue(point.y),
+  })
+}
+
+// Points of a curve of Bezier segments of `order` (2: quadratic, 3: cubic),
+// where each segment shares its first and last control point with its neighbours.
+// With `pixels`, segments are sampled until they are within PIXEL_TOLERANCE of
+// the true curve, otherwise with LUT_STEPS steps.
+export function createBezierCurve(points, order, pixels = null) {
+  return fillCurve([], points, order, pixels)
+}
+
+function fillCurve(curve, points, order, pixels) {
+  const sizes = []
+  curve.length = 0
+  for (let i = 0; i < points.length - order; i += order) {
+    const segment = segmentPoints(points, i, order, pixels)
+    curve.push(...segment)
+    sizes.push(segment.length)
+  }
+  segmentSizes.set(curve, sizes)
+  return curve
+}
+
+// Recompute in place only the segments of `curve` that use the control points
+// from `fromIndex` to `toIndex`, so the chart can be updated without rebuilding
+// its datasets while a point is dragged.
+export function updateBezierCurve(curve, points, order, fromIndex, toIndex, pixels = null) {
+  const sizes = segmentSizes.get(curve)
+  const first = Math.max(Math.ceil((fromIndex - order) / order), 0)
+  const last = Math.min(Math.floor(toIndex / order), sizes.length - 1)
+  let offset = sizes.slice(0, first).reduce((sum, size) => sum + size, 0)
+  for (let segment = first; segment <= last; segment++) {
+    const sampled = segmentPoints(points, segment * order, order, pixels)
+    curve.splice(offset, sizes[segment], ...sampled)
+    sizes[segment] = sampled.length
+    offset += sampled.length
+  }
+}
+
+// Scales each curve was last sampled for, see `curveSamplingPlugin`.
+const sampledScales = new WeakMap()
+// Charts with a point being dragged, see `setCurveDrag`.
+const draggedCharts = new WeakSet()
+
+// While a point of `chart` is dragged, only the segments it moves are sampled
+// again, by `updateBezierCurve`, even if the scales change on every frame.
+// Every curve is sampled once for the new scales on the first update after it.
+export function setCurveDrag(chart, dragging) {
+  if (dragging) {
+    draggedCharts.add(chart)
+  } else {
+    draggedCharts.delete(chart)
+  }
+}
+
+// Samples the curves of a chart again in place when its scales change, or when
+// they were built before the chart was laid out, so they stay within
+// PIXEL_TOLERANCE at any zoom or size. Curves are the datasets with a
+// `bezierOrder`, and their control points the dataset labeled `controlLabel`.
+export const curveSamplingPlugin = {
+  id: "curveSampling",
+  afterUpdate(chart) {
+    const pixels = chartPixels(chart)
+    if (pixels === null || draggedCharts.has(chart)) {
+      return
+    }
+    const { x, y } = chart.scales
+    const scaleKey = [x.min, x.max, y.min, y.max, x.width, y.height].join()
+    let sampled = false
+    chart.data.datasets.forEach((dataset) => {
+      if (dataset.bezierOrder && sampledScales.get(dataset.data) !== scaleKey) {
+        const control = chart.data.datasets.find(
+          (d) => d.isControlPoint && d.label === dataset.controlLabel
+        )
+        fillCurve(dataset.data, control.data, dataset.bezierOrder, pixels)
+        sampledScales.set(dataset.data, scaleKey)
+        sampled = true
+      }
+    })
+    if (sampled) {
+      chart.update("none")
+    }
+  },
+}
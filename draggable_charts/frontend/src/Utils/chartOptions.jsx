@@ -1,5 +1,5 @@
 import { Chart } from "chart.js"
-import { format as d3Format } from "https://cdn.skypack.dev/d3-format@3"
+import { format as d3Format } from "d3-format"
 
 export function createOptions(options, theme) {
   return {
@@ -8,9 +8,17 @@ export function createOptions(options, theme) {
     animation: {
       duration: 0,
     },
-    onHover: createHoverOptions(options),
+    // Hovered elements are looked up in the point index, see picking.jsx.
+    hover: {
+      mode: "draggable",
+      intersect: true,
+    },
+    onHover: createHoverOptions(),
     plugins: {
       zoom: createZoomOptions(),
+      picking: {
+        fixed_lines: options.fixed_lines,
+      },
       title: createTitleOptions(options),
       legend: createLegendOptions(options),
       tooltip: createTooltipOptions(options, theme),
@@ -19,25 +27,14 @@ export function createOptions(options, theme) {
   }
 }
 
-function createHoverOptions(options) {
+function createHoverOptions() {
   return (event, chartElement) => {
-    let cursorStyle = "default"
-    if (chartElement.length > 0) {
-      const datasets = event.chart.data.datasets
-      const label = datasets[chartElement[0].datasetIndex].label
-      cursorStyle = determineCursorStyle(label, options)
-    }
+    // Only draggable points are hovered.
+    const cursorStyle = chartElement.length > 0 ? "crosshair" : "default"
     event.native.target.style.cursor = cursorStyle
   }
 }
 
-function determineCursorStyle(label, options) {
-  if (options.fixed_lines.includes(label)) {
-    return "default"
-  }
-  return "crosshair"
-}
-
 function createZoomOptions() {
   return {
     zoom: {
@@ -0,0 +1,66 @@
+// Drag constraints of the `constraints` option. Python enforces the same
+// rules on the returned data, see constraints.py.
+
+// Rule of `trace`, or null. It's looked up once per drag, not per move.
+export function traceRule(options, trace) {
+  const constraints = options.constraints || {}
+  return constraints[trace] || null
+}
+
+// Rule of the dragged point of a Bezier curve of `order`, or null. Rules only
+// apply to the points of the curve, every `order` points, and not to the
+// control points between them.
+export function curveRule(options, trace, index, order) {
+  return index % order === 0 ? traceRule(options, trace) : null
+}
+
+function known(value) {
+  return typeof value === "number" && !Number.isNaN(value)
+}
+
+// Range [low, high] of the y value of a point, from the bounds of `rule` and,
+// for monotone traces, the values of its neighbours. Neighbours that move with
+// the point are passed as undefined.
+export function yRange(rule, previous, next) {
+  let low = known(rule.min) ? rule.min : -Infinity
+  let high = known(rule.max) ? rule.max : Infinity
+  const [before, after] = rule.monotone === "decreasing" ? [next, previous] : [previous, next]
+  if (rule.monotone === "increasing" || rule.monotone === "decreasing") {
+    low = known(before) ? Math.max(low, before) : low
+    high = known(after) ? Math.min(high, after) : high
+  }
+  return [low, high]
+}
+
+export function snapY(rule, value) {
+  if (!rule.step) {
+    return value
+  }
+  const base = rule.min || 0
+  return base + Math.round((value - base) / rule.step) * rule.step
+}
+
+// The y value a dragged point takes: snapped to the step of `rule`, then kept
+// in its range. O(1) per move.
+export function constrainY(rule, value, previous, next) {
+  if (rule === null || !known(value)) {
+    return value
+  }
+  let [low, high] = yRange(rule, previous, next)
+  if (rule.step) {
+    // The range is narrowed to its steps, if it has any.
+    const base = rule.min || 0
+    const first = Number.isFinite(low) ? base + Math.ceil((low - base) / rule.step) * rule.step : low
+    const last = Number.isFinite(high) ? base + Math.floor((high - base) / rule.step) * rule.step : high
+    if (first <= last) {
+      low = first
+      high = last
+    }
+  }
+  return Math.min(Math.max(snapY(rule, value), low), high)
+}
+
+// The x value a dragged point takes, its current one if x is locked.
+export function constrainX(rule, value, current) {
+  return rule !== null && rule.lock_x ? current : value
+}
@@ -0,0 +1,23 @@
+// Latest value of every point edited since the chart received its data.
+// Only these patches are sent back to Python, never the whole dataset.
+export class EditLog {
+  constructor() {
+    this.cells = new Map()
+  }
+
+  set(trace, index, ...values) {
+    this.cells.set(`${trace}\u0000${index}`, [trace, index, ...values])
+  }
+
+  forEach(callback) {
+    this.cells.forEach((patch) => callback(patch))
+  }
+
+  clear() {
+    this.cells.clear()
+  }
+
+  toValue(revision) {
+    return { revision: revision, patches: Array.from(this.cells.values()) }
+  }
+}
@@ -0,0 +1,120 @@
+// Estimated memory of one moved point in a delta, for the cap. Python uses
+// the same estimate, so both sides drop the same actions.
+const CELL_BYTES = 64
+
+// Bounded undo/redo history of the edits of a chart. Each action stores only
+// its delta, `[trace, index, old values, new values]` per moved point, and the
+// oldest actions are dropped first when the history exceeds `maxBytes`.
+//
+// Python keeps a copy, built from the actions sent in the component value
+// until Python acknowledges them, and can ask for an undo or redo with
+// commands, so neither side resends the data.
+export class EditHistory {
+  constructor(maxBytes) {
+    this.maxBytes = maxBytes
+    this.entries = []
+    this.cursor = 0
+    this.bytes = 0
+    this.nextId = 1
+    this.pending = []
+    this.lastCommand = 0
+    this.mirrored = false
+  }
+
+  // Record the delta of a drag. Points that didn't move are left out.
+  record(cells) {
+    const moved = cells.filter(([, , before, after]) =>
+      before.some((value, i) => value !== after[i])
+    )
+    if (!this.maxBytes || moved.length === 0) {
+      return
+    }
+    // A new action discards the actions that were undone.
+    this.entries.splice(this.cursor).forEach((entry) => (this.bytes -= entry.bytes))
+    const entry = { cells: moved, bytes: moved.length * CELL_BYTES }
+    this.entries.push(entry)
+    this.bytes += entry.bytes
+    this.cursor += 1
+    while (this.bytes > this.maxBytes) {
+      this.bytes -= this.entries.shift().bytes
+      this.cursor -= 1
+    }
+    this.log({ action: "edit", cells: moved })
+  }
+
+  // Cells `[trace, index, values]` that undo the last action, or null.
+  undo() {
+    if (this.cursor === 0) {
+      return null
+    }
+    this.cursor -= 1
+    this.log({ action: "undo" })
+    return this.entries[this.cursor].cells.map(([trace, index, before]) => [trace, index, before])
+  }
+
+  // Cells `[trace, index, values]` that redo the last undone action, or null.
+  redo() {
+    if (this.cursor === this.entries.length) {
+      return null
+    }
+    const entry = this.entries[this.cursor]
+    this.cursor += 1
+    this.log({ action: "redo" })
+    return entry.cells.map(([trace, index, , after]) => [trace, index, after])
+  }
+
+  log(action) {
+    if (this.mirrored) {
+      this.pending.push({ id: this.nextId, ...action })
+    }
+    this.nextId += 1
+  }
+
+  clear() {
+    this.entries = []
+    this.cursor = 0
+    this.bytes = 0
+    this.pending = []
+  }
+
+  // Read the `history` argument sent by Python, and return the undo and redo
+  // commands that haven't run yet.
+  receive(history) {
+    this.mirrored = Boolean(history)
+    if (!history) {
+      return []
+    }
+    // Ids continue after the ones Python has, also if the chart was mounted again.
+    this.nextId = Math.max(this.nextId, history.ack + 1)
+    this.pending = this.pending.filter((action) => action.id > history.ack)
+    const commands = history.commands.filter(([id]) => id > this.lastCommand)
+    if (commands.length > 0) {
+      this.lastCommand = commands[commands.length - 1][0]
+    }
+    return commands.map(([, action]) => action)
+  }
+
+  toValue() {
+    return { actions: this.pending, command: this.lastCommand }
+  }
+}
+
+// Chart that gets the keyboard shortcuts: the last one clicked, as a grid
+// shows many charts in one frame.
+let shortcutTarget = null
+
+export function setShortcutTarget(chart) {
+  shortcutTarget = chart
+}
+
+// "undo" or "redo" for the usual keyboard shortcuts in `chart`, or null.
+export function historyShortcut(event, chart) {
+  if (shortcutTarget !== chart || !(event.ctrlKey || event.metaKey)) {
+    return null
+  }
+  const key = event.key.toLowerCase()
+  if (key === "z") {
+    return event.shiftKey ? "redo" : "undo"
+  }
+  return key === "y" ? "redo" : null
+}
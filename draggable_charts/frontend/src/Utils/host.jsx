@@ -0,0 +1,17 @@
+import { Streamlit } from "streamlit-component-lib"
+
+// Charts shown alone talk to Streamlit directly. Charts of a grid get an
+// `onValue` prop instead, and the grid sends one value and frame height for all.
+export function sendValue(props, value) {
+  if (props.onValue) {
+    props.onValue(value)
+  } else {
+    Streamlit.setComponentValue(value)
+  }
+}
+
+export function setFrameHeight(props) {
+  if (!props.onValue) {
+    Streamlit.setFrameHeight()
+  }
+}
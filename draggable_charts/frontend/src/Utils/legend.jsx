@@ -0,0 +1,83 @@
+import React, { useState } from "react"
+
+// Height of a row of the legend, in pixels.
+const ROW_HEIGHT = 22
+// Rows shown at once. Only these and one more are rendered while scrolling.
+const VISIBLE_ROWS = 8
+
+// Legend of the charts of wide frames, see `visible_traces` in Python. It
+// lists every trace, filtered by a search box, and only renders the rows in
+// view, so it stays fast with hundreds of traces. Clicking a trace toggles it.
+export function TraceLegend({ traces, visible, styles, labels, onToggle, theme }) {
+  const [search, setSearch] = useState("")
+  const [scrollTop, setScrollTop] = useState(0)
+  const query = search.trim().toLowerCase()
+  const matches = query
+    ? traces.filter((trace) => traceLabel(trace, labels).toLowerCase().includes(query))
+    : traces
+  const first = Math.min(Math.floor(scrollTop / ROW_HEIGHT), Math.max(matches.length - VISIBLE_ROWS, 0))
+  const rows = matches.slice(first, first + VISIBLE_ROWS + 1)
+  const textColor = theme ? theme.textColor : "inherit"
+
+  return (
+    <div style={{ fontSize: 12, color: textColor, marginBottom: 4 }}>
+      <div style={{ display: "flex", gap: 8, alignItems: "center" }}>
+        <input
+          type="search"
+          className="form-control form-control-sm"
+          placeholder="Search traces"
+          value={search}
+          onChange={(event) => {
+            setSearch(event.target.value)
+            setScrollTop(0)
+          }}
+          style={{ flex: 1 }}
+        />
+        <span style={{ whiteSpace: "nowrap" }}>
+          {visible.size} of {traces.length} shown
+        </span>
+      </div>
+      <div
+        key={query}
+        onScroll={(event) => setScrollTop(event.target.scrollTop)}
+        style={{
+          height: Math.min(matches.length, VISIBLE_ROWS) * ROW_HEIGHT,
+          overflowY: "auto",
+          position: "relative",
+        }}
+      >
+        <div style={{ height: matches.length * ROW_HEIGHT, position: "relative" }}>
+          {rows.map((trace, i) => (
+            <label
+              key={trace}
+              style={{
+                position: "absolute",
+                top: (first + i) * ROW_HEIGHT,
+                height: ROW_HEIGHT,
+                display: "flex",
+                alignItems: "center",
+                gap: 6,
+                margin: 0,
+                cursor: "pointer",
+              }}
+            >
+              <input type="checkbox" checked={visible.has(trace)} onChange={() => onToggle(trace)} />
+              <span
+                style={{
+                  width: 16,
+                  height: 8,
+                  backgroundColor: styles.has(trace) ? styles.get(trace).color : "gray",
+                }}
+              />
+              {traceLabel(trace, labels)}
+            </label>
+          ))}
+        </div>
+      </div>
+    </div>
+  )
+}
+
+function traceLabel(trace, labels) {
+  return labels.hasOwnProperty(trace) ? `${labels[trace]}` : trace
+}
@@ -0,0 +1,168 @@
+import { Interaction } from "chart.js"
+import { getRelativePosition } from "chart.js/helpers"
+
+// Side of the grid cells, in pixels.
+const CELL_SIZE = 24
+
+const pointIndexes = new WeakMap()
+
+// Uniform grid of the draggable points of a chart in pixel space, to find the
+// point under the pointer without scanning every element. Fixed traces and
+// Bezier curves are never indexed. The grid is rebuilt lazily on the first
+// query after a zoom, pan, resize, legend toggle or data change.
+export class PointIndex {
+  constructor(chart, fixedLines = []) {
+    this.chart = chart
+    this.invalidate(fixedLines)
+    pointIndexes.set(chart, this)
+  }
+
+  // Call when the data of the chart changes.
+  invalidate(fixedLines = null) {
+    if (fixedLines !== null) {
+      this.fixed = new Set(fixedLines)
+    }
+    this.signature = null
+  }
+
+  isDraggable(dataset) {
+    return dataset.isControlPoint !== false && !this.fixed.has(dataset.label)
+  }
+
+  currentSignature() {
+    const chart = this.chart
+    const visible = chart.data.datasets.map((_, i) => (chart.isDatasetVisible(i) ? 1 : 0))
+    const { x, y } = chart.scales
+    return [x.min, x.max, y.min, y.max, chart.width, chart.height, visible.join("")].join(",")
+  }
+
+  build() {
+    const chart = this.chart
+    this.columns = Math.ceil(chart.width / CELL_SIZE) + 1
+    this.rows = Math.ceil(chart.height / CELL_SIZE) + 1
+    this.cells = new Map()
+    chart.data.datasets.forEach((dataset, datasetIndex) => {
+      if (!chart.isDatasetVisible(datasetIndex) || !this.isDraggable(dataset)) {
+        return
+      }
+      chart.getDatasetMeta(datasetIndex).data.forEach((element, index) => {
+        const { x, y } = element
+        // Points outside of the canvas can't be picked.
+        if (element.skip || !(x >= 0 && x <= chart.width && y >= 0 && y <= chart.height)) {
+          return
+        }
+        const key = this.cellKey(Math.floor(x / CELL_SIZE), Math.floor(y / CELL_SIZE))
+        const cell = this.cells.get(key)
+        if (cell) {
+          cell.push(datasetIndex, index)
+        } else {
+          this.cells.set(key, [datasetIndex, index])
+        }
+      })
+    })
+  }
+
+  cellKey(column, row) {
+    return row * this.columns + column
+  }
+
+  update() {
+    const signature = this.currentSignature()
+    if (signature !== this.signature) {
+      this.build()
+      this.signature = signature
+    }
+  }
+
+  // Nearest draggable point to a position in pixels, searching the rings of
+  // cells around it up to `maxDistance`, or null if there is none.
+  nearest(position, maxDistance = Infinity) {
+    this.update()
+    const column = Math.floor(position.x / CELL_SIZE)
+    const row = Math.floor(position.y / CELL_SIZE)
+    const maxRing = Math.min(
+      Math.ceil(maxDistance / CELL_SIZE),
+      Math.max(this.columns, this.rows)
+    )
+    let best = null
+    let bestDistance = maxDistance * maxDistance
+    for (let ring = 0; ring <= maxRing; ring++) {
+      // Points in further rings are at least `ring` cells away.
+      if (best !== null && bestDistance <= (ring - 1) ** 2 * CELL_SIZE ** 2) {
+        break
+      }
+      this.forEachCellInRing(column, row, ring, (cell) => {
+        for (let i = 0; i < cell.length; i += 2) {
+          const element = this.chart.getDatasetMeta(cell[i]).data[cell[i + 1]]
+          const distance = (element.x - position.x) ** 2 + (element.y - position.y) ** 2
+          if (distance <= bestDistance) {
+            bestDistance = distance
+            best = { datasetIndex: cell[i], index: cell[i + 1], element: element }
+          }
+        }
+      })
+    }
+    return best
+  }
+
+  forEachCellInRing(column, row, ring, callback) {
+    for (let c = column - ring; c <= column + ring; c++) {
+      for (let r = row - ring; r <= row + ring; r++) {
+        const onRing = Math.abs(c - column) === ring || Math.abs(r - row) === ring
+        if (onRing && c >= 0 && r >= 0 && c < this.columns && r < this.rows) {
+          const cell = this.cells.get(this.cellKey(c, r))
+          if (cell) {
+            callback(cell)
+          }
+        }
+      }
+    }
+  }
+}
+
+// Elements under the pointer for the "draggable" interaction mode. With
+// `intersect`, the nearest draggable point must be under the pointer.
+Interaction.modes.draggable = function (chart, event, options) {
+  const points = pointIndexes.get(chart)
+  if (!points) {
+    return []
+  }
+  const position = getRelativePosition(event, chart)
+  const nearest = points.nearest(position, options.intersect ? CELL_SIZE : Infinity)
+  if (nearest === null || (options.intersect && !nearest.element.inRange(position.x, position.y))) {
+    return []
+  }
+  return [nearest]
+}
+
+// The draggable point nearest to a pointer event, like `getElementAtEvent`
+// with `intersect: false`, or null if the chart has no draggable points.
+export function getDraggableElementAtEvent(chart, event) {
+  const points = pointIndexes.get(chart)
+  return points ? points.nearest(getRelativePosition(event, chart)) : null
+}
+
+// Call when a drag ends, as drags update the chart with mode "none".
+export function invalidatePoints(chart) {
+  const points = pointIndexes.get(chart)
+  if (points) {
+    points.invalidate()
+  }
+}
+
+// Keeps a `PointIndex` per chart, with the `fixed_lines` of the plugin options.
+export const pickingPlugin = {
+  id: "picking",
+  defaults: {
+    fixed_lines: [],
+  },
+  afterInit(chart, args, options) {
+    new PointIndex(chart, options.fixed_lines)
+  },
+  afterUpdate(chart, args, options) {
+    // Zoom and pan are detected from the scales, only data changes invalidate.
+    if (args.mode !== "none") {
+      pointIndexes.get(chart).invalidate(options.fixed_lines)
+    }
+  },
+}
@@ -0,0 +1,13 @@
+// Per-trace styles are sent as one table of columns aligned with `traces`.
+export function createStyleTable(styles) {
+  const table = new Map()
+  styles.traces.forEach((trace, i) => {
+    table.set(trace, {
+      color: styles.color[i],
+      border_dash: styles.border_dash[i],
+      point_radius: styles.point_radius[i],
+      fill: styles.fill[i],
+    })
+  })
+  return table
+}
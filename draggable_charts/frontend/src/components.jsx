@@ -1,13 +1,18 @@
-import LineChart from "./LineChart/LineChart";
-import ScatterChart from "./ScatterChart/ScatterChart";
-import BezierChart from "./BezierChart/BezierChart";
-import CubicBezierChart from "./CubicBezierChart/CubicBezierChart";
+import { lazy } from "react"
+
+// Every chart is a separate chunk, loaded on first use, so a page only
+// downloads the code of the charts it shows. Chart.js and the shared
+// utilities end up in a common chunk.
+export const chartsMap = {
+  line_chart: lazy(() => import("./LineChart/LineChart")),
+  scatter_chart: lazy(() => import("./ScatterChart/ScatterChart")),
+  bezier_chart: lazy(() => import("./BezierChart/BezierChart")),
+  cubic_bezier_chart: lazy(() => import("./CubicBezierChart/CubicBezierChart")),
+}
 
 const componentsMap = {
-  line_chart: LineChart,
-  scatter_chart: ScatterChart,
-  bezier_chart: BezierChart,
-  cubic_bezier_chart: CubicBezierChart,
+  ...chartsMap,
+  chart_grid: lazy(() => import("./ChartGrid/ChartGrid")),
 }
 
 export default componentsMap
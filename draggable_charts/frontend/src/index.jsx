@@ -1,17 +1,26 @@
 import { withStreamlitConnection } from "streamlit-component-lib"
 
-import React from "react"
+import React, { Suspense } from "react"
 import ReactDOM from "react-dom"
 import componentsMap from "./components"
 
 const SelectComponent = (props) => {
-  const id = props.args["id"]
-  const kw = props.args["kw"]
+  // DataFrames are sent as separate arguments: "table" for a chart, one per
+  // line chart for a grid.
+  const { id, kw, ...dataframes } = props.args
   const Component = componentsMap[id]
   if (Component === undefined) {
     throw new Error(`Component with id ${id} is not defined in componentsMap.`)
   } else {
-    return <Component args={{ ...kw }} theme={props.theme} />
+    return (
+      // Nothing is shown while the chunk of the chart loads.
+      <Suspense fallback={null}>
+        <Component
+          args={{ ...kw, table: dataframes.table, dataframes }}
+          theme={props.theme}
+        />
+      </Suspense>
+    )
   }
 }
 
@@ -1,8 +1,37 @@
-import inspect
+import importlib
 
-from .component_func import component
-from .callback import register
+# Names are imported from their module on first use, see the package `__init__`.
+_EXPORTS = {
+    "component": ".component_func",
+    "register": ".callback",
+    "ChartSpec": ".registry",
+    "get_chart": ".registry",
+    "register_chart": ".registry",
+    "PayloadCache": ".cache",
+    "payload_cache": ".cache",
+    "ChartOptions": ".options",
+    "compile_options": ".options",
+    "StageStats": ".instrumentation",
+    "WidgetEvent": ".instrumentation",
+    "add_hook": ".instrumentation",
+    "instrument": ".instrumentation",
+    "remove_hook": ".instrumentation",
+    "ComponentRecorder": ".recorder",
+    "drag": ".recorder",
+    "recording": ".recorder",
+    "replay": ".recorder",
+}
 
+__all__ = list(_EXPORTS)
 
-def get_func_name():
-    return inspect.stack()[1][3]
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
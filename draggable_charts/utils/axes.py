@@ -0,0 +1,64 @@
+from typing import Dict, Literal, NamedTuple, Union
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import infer_dtype, is_numeric_dtype
+
+ScaleType = Literal['linear', 'category']
+
+_NUMERIC_INFERRED_TYPES = {
+    'integer', 'floating', 'mixed-integer-float', 'decimal', 'boolean', 'empty'}
+
+
+class AxisInfo(NamedTuple):
+    """Scale type of one chart axis, computed once per widget call."""
+    scale_type: ScaleType
+
+    @property
+    def numeric(self) -> bool:
+        return self.scale_type == 'linear'
+
+
+def infer_axes(data: Union[dict, pd.DataFrame, pd.Series]) -> Dict[str, AxisInfo]:
+    """Return the `AxisInfo` of the x and y axes of the chart data.
+
+    The validators of the charts return them too, from the same scan, see
+    `ChartSpec.validator`. Pandas objects are resolved from the index and column dtypes, in
+    O(columns). Dictionaries of traces are converted once with NumPy, and only
+    object arrays fall back to pandas' C-level type inference.
+    """
+    if isinstance(data, (pd.DataFrame, pd.Series)):
+        return _infer_frame_axes(data)
+    return axes_from(*(_numeric_traces(data, axis) for axis in ('x', 'y')))
+
+
+def axes_from(numeric_x: bool, numeric_y: bool) -> Dict[str, AxisInfo]:
+    """Return the `AxisInfo` of axes whose values are known to be numeric or not."""
+    return {'x': AxisInfo(_scale_type(numeric_x)), 'y': AxisInfo(_scale_type(numeric_y))}
+
+
+def _infer_frame_axes(data: Union[pd.DataFrame, pd.Series]) -> Dict[str, AxisInfo]:
+    x_numeric = _is_numeric(data.index, skipna=True)
+
+    if isinstance(data, pd.Series):
+        columns = [data]
+    else:
+        columns = [column for _, column in data.items()]
+    y_numeric = all(_is_numeric(column, skipna=True) for column in columns)
+    return axes_from(x_numeric, y_numeric)
+
+
+def _numeric_traces(data: dict, axis: Literal['x', 'y']) -> bool:
+    return all(_is_numeric(np.asarray(trace_data[axis]), skipna=False) for trace_data in data.values())
+
+
+def _is_numeric(values, skipna: bool) -> bool:
+    if is_numeric_dtype(values.dtype):
+        return True
+    if values.dtype == object:
+        return infer_dtype(values, skipna=skipna) in _NUMERIC_INFERRED_TYPES
+    return False
+
+
+def _scale_type(numeric: bool) -> ScaleType:
+    return 'linear' if numeric else 'category'
@@ -0,0 +1,286 @@
+"""Vectorized Bezier control points and curves for `bezier_chart` and `cubic_bezier_chart`.
+
+Traces are padded into one 2D array, so every trace is computed in the same
+NumPy pass. Results match `bezier_interpolation.quadratic_interpolation` and
+`cubic_interpolation`, which solve the same equations point by point.
+"""
+import math
+from typing import List, Sequence, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+Trace = Tuple[npt.ArrayLike, npt.ArrayLike]
+
+
+def quadratic_control_points(
+    traces: Sequence[Trace],
+    t: float = 0.5,
+    dtype: npt.DTypeLike = np.float64
+) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """Add one control point between every pair of points of each trace.
+
+    The first control point is placed at tension `t`, and each next one is on the
+    line through the previous control point and the shared data point, so the
+    curve is smooth. Returns `(x, y)` arrays with `2n - 1` points per trace.
+    """
+    x, y, lengths = _pad(traces)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_c = x[:, :-1] + (x[:, 1:] - x[:, :-1]) / 2
+        # y_c[j] = (1 + r[j]) * y[j] - r[j] * y_c[j - 1], solved in closed form:
+        # the products of -r telescope to (-1)^j * d[j] / d[0].
+        d = x_c - x[:, :-1]
+        r = d[:, 1:] / (x[:, 1:-1] - x_c[:, :-1])
+        signs = np.where(np.arange(d.shape[1]) % 2 == 0, 1.0, -1.0)
+        products = signs * d / d[:, :1]
+        y_c0 = y[:, 0] + t * (y[:, 1] - y[:, 0])
+        terms = (1 + r) * y[:, 1:-1] / products[:, 1:]
+        y_c = products * np.concatenate(
+            [y_c0[:, None], y_c0[:, None] + np.cumsum(terms, axis=1)], axis=1)
+
+    results = []
+    for i, n in enumerate(lengths):
+        if n < 2:
+            results.append((x[i, :n].astype(dtype), y[i, :n].astype(dtype)))
+            continue
+        results.append((
+            _interleave(x[i, :n], x_c[i, :n - 1]).astype(dtype),
+            _interleave(y[i, :n], y_c[i, :n - 1]).astype(dtype),
+        ))
+    return results
+
+
+def cubic_control_points(
+    traces: Sequence[Trace],
+    dtype: npt.DTypeLike = np.float64
+) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """Add two control points between every pair of points of each trace.
+
+    The control points make the curve continuous in its first and second
+    derivatives. See https://www.particleincell.com/2012/bezier-splines/.
+    Returns `(x, y)` arrays with `3n - 2` points per trace.
+    """
+    x, y, lengths = _pad(traces)
+    knots = np.stack([x, y], axis=-1)
+    n_traces, width = x.shape
+    segments = lengths - 1
+    # Unknowns are the first control point of every segment: P1[0 .. n - 1].
+    unknowns = width - 1
+    column = np.arange(unknowns)
+    last = (segments - 1)[:, None]
+    active = column < segments[:, None]
+
+    a = np.where(column == last, 2.0, 1.0)
+    b = np.where(column == 0, 2.0, np.where(column == last, 7.0, 4.0))
+    c = np.ones((n_traces, unknowns))
+    a[:, 0] = 0.0
+    c[column[None, :] >= last] = 0.0
+
+    k, k_next = knots[:, :-1], knots[:, 1:]
+    rhs = np.where(
+        (column == 0)[None, :, None], k + 2 * k_next,
+        np.where((column == last)[:, :, None], 8 * k + k_next, 4 * k + 2 * k_next))
+    # Padding rows become identity rows, so they don't couple with the trace.
+    a, c = np.where(active, a, 0.0), np.where(active, c, 0.0)
+    b, rhs = np.where(active, b, 1.0), np.where(active[:, :, None], rhs, 0.0)
+
+    p1 = _solve_tridiagonal(a, b, c, rhs)
+    p2 = np.empty_like(p1)
+    p2[:, :-1] = 2 * k_next[:, :-1] - p1[:, 1:]
+    rows, ends = np.arange(n_traces), np.maximum(segments, 1)
+    p2[rows, ends - 1] = (knots[rows, ends] + p1[rows, ends - 1]) / 2
+
+    results = []
+    for i, n in enumerate(lengths):
+        if n < 2:
+            results.append((x[i, :n].astype(dtype), y[i, :n].astype(dtype)))
+            continue
+        if n == 2:
+            # A single segment: place the control points at thirds of the line.
+            first, last_knot = knots[i, 0], knots[i, 1]
+            trace_p1 = (first + (last_knot - first) / 3)[None]
+            trace_p2 = (first + 2 * (last_knot - first) / 3)[None]
+        else:
+            trace_p1, trace_p2 = p1[i, :n - 1], p2[i, :n - 1]
+        points = np.empty((3 * (n - 1) + 1, 2))
+        points[0:-1:3] = knots[i, :n - 1]
+        points[1::3] = trace_p1
+        points[2::3] = trace_p2
+        points[-1] = knots[i, n - 1]
+        results.append((points[:, 0].astype(dtype), points[:, 1].astype(dtype)))
+    return results
+
+
+def _solve_tridiagonal(a: np.ndarray, b: np.ndarray, c: np.ndarray, d: np.ndarray) -> np.ndarray:
+    """Solve a batch of tridiagonal systems with parallel cyclic reduction.
+
+    `a`, `b` and `c` are the sub, main and super diagonals with shape
+    `(batch, n)`, and `d` the right-hand sides with shape `(batch, n, k)`. Each
+    step couples every row with rows twice as far away, so `log2(n)` vectorized
+    steps decouple the system. Stable for diagonally dominant systems.
+    """
+    n = b.shape[1]
+    stride = 1
+    while stride < n:
+        a_prev, b_prev, c_prev, d_prev = (_shift(v, stride, fill) for v, fill in ((a, 0), (b, 1), (c, 0), (d, 0)))
+        a_next, b_next, c_next, d_next = (_shift(v, -stride, fill) for v, fill in ((a, 0), (b, 1), (c, 0), (d, 0)))
+        alpha = -a / b_prev
+        gamma = -c / b_next
+        a, c = alpha * a_prev, gamma * c_next
+        b = b + alpha * c_prev + gamma * a_next
+        d = d + alpha[..., None] * d_prev + gamma[..., None] * d_next
+        stride *= 2
+    return d / b[..., None]
+
+
+def _shift(values: np.ndarray, offset: int, fill: float) -> np.ndarray:
+    """Return `values[:, i - offset]` along the rows, with `fill` outside the range."""
+    shifted = np.full_like(values, fill)
+    if offset > 0:
+        shifted[:, offset:] = values[:, :-offset]
+    else:
+        shifted[:, :offset] = values[:, -offset:]
+    return shifted
+
+
+def _pad(traces: Sequence[Trace]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    lengths = np.array([len(x) for x, _ in traces], dtype=int)
+    width = max(int(lengths.max(initial=0)), 2)
+    x = np.zeros((len(traces), width))
+    y = np.zeros((len(traces), width))
+    for i, (trace_x, trace_y) in enumerate(traces):
+        x[i, :lengths[i]] = trace_x
+        y[i, :lengths[i]] = trace_y
+    return x, y, lengths
+
+
+def _interleave(points: np.ndarray, controls: np.ndarray) -> np.ndarray:
+    result = np.empty(len(points) + len(controls))
+    result[0::2] = points
+    result[1::2] = controls
+    return result
+
+
+# Deepest split of `sample_curve`, like in the frontend: a segment has at most
+# 2 ** MAX_DEPTH + 1 points.
+MAX_DEPTH = 8
+
+
+def sample_curve(
+    traces: Sequence[Trace],
+    order: int,
+    steps: int = 10,
+    tolerance: float = None,
+    scale: Tuple[float, float] = (1.0, 1.0),
+    dtype: npt.DTypeLike = np.float64
+) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """Evaluate the curves of Bezier segments of `order` (2: quadratic, 3: cubic).
+
+    Each trace has the control points of its segments, which share their first
+    and last point, as returned by `quadratic_control_points` and
+    `cubic_control_points`. Segments of every trace are evaluated in one NumPy
+    pass, with `steps` evenly spaced steps, or with `tolerance` like the
+    frontend: each segment is split in halves until its control points are within
+    `tolerance` of their chord, measured after dividing x and y by `scale`.
+    Returns `(x, y)` arrays with the points of each curve, without repeating the
+    points shared by two segments.
+    """
+    x, y, lengths = _pad(traces)
+    segments = np.maximum((lengths - 1) // order, 0)
+    trace_of = np.repeat(np.arange(len(traces)), segments)
+    # Position of each segment in its trace, times the points per segment.
+    first = (np.arange(len(trace_of)) - np.repeat(np.cumsum(segments) - segments, segments)) * order
+    points = first[:, None] + np.arange(order + 1)
+    controls = np.stack([x[trace_of[:, None], points], y[trace_of[:, None], points]], axis=-1)
+
+    if tolerance is None:
+        segment_of = np.repeat(np.arange(len(trace_of)), steps)
+        times = np.tile(np.arange(steps) / steps, len(trace_of))
+    else:
+        segment_of, times = _split_times(controls / np.asarray(scale, dtype=float), tolerance)
+    curve = _evaluate(controls[segment_of], times)
+
+    results = []
+    starts = np.searchsorted(trace_of[segment_of], np.arange(len(traces)))
+    ends = np.searchsorted(trace_of[segment_of], np.arange(len(traces)), side="right")
+    last_segment = np.cumsum(segments) - 1
+    for i, n in enumerate(lengths):
+        if segments[i] == 0:
+            results.append((x[i, :n].astype(dtype), y[i, :n].astype(dtype)))
+            continue
+        # The last point of the curve ends its last segment.
+        end = controls[last_segment[i], -1][None]
+        trace_curve = np.concatenate([curve[starts[i]:ends[i]], end])
+        results.append((trace_curve[:, 0].astype(dtype), trace_curve[:, 1].astype(dtype)))
+    return results
+
+
+def _split_times(controls: np.ndarray, tolerance: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the segment and the parameter of the start of every flat piece of
+    the segments in `controls`, sorted. All pieces of one depth are split at once."""
+    pieces, segment_of = controls, np.arange(len(controls))
+    start, size = np.zeros(len(controls)), 1.0
+    found_segments, found_starts = [], []
+    for depth in range(MAX_DEPTH + 1):
+        flat = _flatness(pieces) <= tolerance if depth < MAX_DEPTH else np.ones(len(pieces), bool)
+        found_segments.append(segment_of[flat])
+        found_starts.append(start[flat])
+        pieces, segment_of, start = pieces[~flat], segment_of[~flat], start[~flat]
+        if not len(pieces):
+            break
+        left, right = _halves(pieces)
+        size /= 2
+        pieces = np.concatenate([left, right])
+        segment_of = np.concatenate([segment_of, segment_of])
+        start = np.concatenate([start, start + size])
+    segment_of, start = np.concatenate(found_segments), np.concatenate(found_starts)
+    order = np.lexsort((start, segment_of))
+    return segment_of[order], start[order]
+
+
+def _flatness(pieces: np.ndarray) -> np.ndarray:
+    """Distance from the inner control points of each piece to its chord."""
+    chord = pieces[:, -1] - pieces[:, 0]
+    offsets = pieces[:, 1:-1] - pieces[:, None, 0]
+    length = np.hypot(chord[:, 0], chord[:, 1])[:, None]
+    cross = np.abs(chord[:, None, 0] * offsets[..., 1] - chord[:, None, 1] * offsets[..., 0])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        distance = np.where(length > 0, cross / length, np.hypot(offsets[..., 0], offsets[..., 1]))
+    return distance.max(axis=1)
+
+
+def _halves(pieces: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Control points of both halves of each piece, with de Casteljau's algorithm."""
+    left, right = [pieces[:, 0]], [pieces[:, -1]]
+    level = pieces
+    while level.shape[1] > 1:
+        level = (level[:, :-1] + level[:, 1:]) / 2
+        left.append(level[:, 0])
+        right.insert(0, level[:, -1])
+    return np.stack(left, axis=1), np.stack(right, axis=1)
+
+
+def _evaluate(controls: np.ndarray, times: np.ndarray) -> np.ndarray:
+    """Points at `times` of the segments with `controls`, in Bernstein form."""
+    order = controls.shape[1] - 1
+    k = np.arange(order + 1)
+    binomial = np.array([math.comb(order, i) for i in k], dtype=float)
+    t = times[:, None]
+    basis = binomial * t ** k * (1 - t) ** (order - k)
+    return np.einsum("nk,nkd->nd", basis, controls)
+
+
+def curve_traces(data: dict, order: int, steps: int = 10, tolerance: float = None) -> dict:
+    """Return the curves of a dictionary of control point traces, in the same format.
+
+    See `sample_curve`. `tolerance` is a fraction of the size of the control
+    points on each axis, so it doesn't depend on the units of x and y.
+    """
+    traces = [(trace["x"], trace["y"]) for trace in data.values()]
+    scale = (1.0, 1.0)
+    if tolerance is not None and traces:
+        x = np.concatenate([np.asarray(trace_x, dtype=float) for trace_x, _ in traces])
+        y = np.concatenate([np.asarray(trace_y, dtype=float) for _, trace_y in traces])
+        scale = tuple(float(np.ptp(values)) or 1.0 if len(values) else 1.0 for values in (x, y))
+    curves = sample_curve(traces, order, steps, tolerance, scale)
+    return {name: {"x": x.tolist(), "y": y.tolist()} for name, (x, y) in zip(data, curves)}
@@ -0,0 +1,107 @@
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_MAX_BYTES = 128 * 2**20
+
+# Containers larger than this are sized from their first element.
+_SAMPLE_SIZE = 64
+
+
+class PayloadCache:
+    """Process-wide LRU cache of ready-to-send widget payloads.
+
+    Entries are keyed by content fingerprints and bounded by their estimated
+    size in memory. It is shared by every session, so payloads must be treated
+    as read-only. All methods are thread-safe.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        # Build outside the lock, so other sessions aren't blocked meanwhile.
+        payload = build()
+        self.put(key, payload)
+        return payload
+
+    def put(self, key: Hashable, payload: Any) -> None:
+        size = estimate_size(payload)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (payload, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+payload_cache = PayloadCache()
+
+
+def cached_payload(spec, revision: str, options: Hashable, build: Callable[[], dict], *params: Hashable) -> dict:
+    """Return the payload of a widget call from `payload_cache`, building it on a miss.
+
+    `revision` is the fingerprint of the input data. The compiled `options` and
+    any extra `params` that change the payload are part of the key as well.
+    """
+    key = (spec.id, revision, options, *params)
+    return payload_cache.get_or_build(key, build)
+
+
+def estimate_size(obj: Any) -> int:
+    """Estimate the memory held by a payload, in bytes."""
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        return int(np.sum(obj.memory_usage(index=True, deep=False)))
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + _estimate_items(obj.values(), len(obj))
+    if isinstance(obj, (list, tuple)):
+        return sys.getsizeof(obj) + _estimate_items(obj, len(obj))
+    return sys.getsizeof(obj)
+
+
+def _estimate_items(items, count: int) -> int:
+    if count > _SAMPLE_SIZE:
+        return estimate_size(next(iter(items))) * count
+    return sum(estimate_size(item) for item in items)
@@ -1,45 +1,132 @@
+import weakref
+from functools import partial
+from inspect import ismethod
+from typing import Any, Callable, Hashable, NamedTuple, Optional
+
 from streamlit import session_state as _state
-from streamlit.components.v1 import components as _components
+
+# Session-state stores of the charts by widget key, where charts of a
+# `chart_grid` have the key `(grid key, chart name)` and charts without key
+# `(chart id, revision)`, see `track`.
+_CHART_STORES = (
+    "_draggable_charts_edits",
+    "_draggable_charts_history",
+    "_draggable_charts_streams",
+    "_draggable_charts_grid_values",
+)
+
+
+class Callback(NamedTuple):
+    """The `on_change` of a chart with its arguments.
+
+    Bound methods are held by a `weakref.WeakMethod`, so the registry doesn't
+    keep their object alive. The callback is skipped once it's collected.
+    """
+    callback: Any
+    args: tuple
+    kwargs: dict
+
+    def resolve(self) -> Optional[Callable]:
+        if isinstance(self.callback, weakref.WeakMethod):
+            return self.callback()
+        return self.callback
 
 
-def _patch_register_widget(register_widget):
-    def wrapper_register_widget(*args, **kwargs):
-        user_key = kwargs.get("user_key", None)
-        callbacks = _state.get("_components_callbacks", None)
+class CallbackRegistry:
+    """The charts of a session rendered in the last runs, with their `on_change`.
 
-        # Check if a callback was registered for that user_key.
-        if user_key and callbacks and user_key in callbacks:
-            callback = callbacks[user_key]
+    entries : `Callback`, or None without callback, by the key of every keyed
+        chart rendered in the previous or the current run, and of every other
+        chart state passed to `track`.
+    rendered : Keys of the charts and chart states used in the current run.
+    run : Marker of the current run, see `_current_run`.
+    """
+    __slots__ = ("entries", "rendered", "run")
 
-            # Add callback-specific args for the real register_widget function.
-            kwargs["on_change_handler"] = callback[0]
-            kwargs["args"] = callback[1]
-            kwargs["kwargs"] = callback[2]
+    def __init__(self):
+        self.entries: dict = {}
+        self.rendered: set = set()
+        self.run = None
 
-        # Call the original function with updated kwargs.
-        return register_widget(*args, **kwargs)
+    def start_run(self, run: Any, fragment: bool) -> None:
+        """Evict the charts not rendered in the previous run, with their edits,
+        history and stream, when `run` is a new full run."""
+        if run is None or run is self.run or fragment:
+            return
+        if self.run is not None:
+            stale = set(self.entries) - self.rendered
+            for key in stale:
+                del self.entries[key]
+            if stale:
+                _evict_chart_state(stale)
+        self.run = run
+        self.rendered = set()
 
-    return wrapper_register_widget
 
+def _registry() -> CallbackRegistry:
+    if "_draggable_charts_callbacks" not in _state:
+        _state._draggable_charts_callbacks = CallbackRegistry()
+    return _state._draggable_charts_callbacks
 
-# Patch function only once.
-if not hasattr(_components.register_widget, "__callbacks_patched__"):
-    setattr(_components.register_widget, "__callbacks_patched__", True)
-    _components.register_widget = _patch_register_widget(_components.register_widget)
 
+def _current_run() -> tuple:
+    """Return a marker of the current script run and whether it's a fragment run."""
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
 
-def register_callback(element_key, callback, *callback_args, **callback_kwargs):
-    # Initialize callbacks store.
-    if "_components_callbacks" not in _state:
-        _state._components_callbacks = {}
+    ctx = get_script_run_ctx(suppress_warning=True)
+    if ctx is None:
+        return None, False
+    # Streamlit replaces `cursors` with a new dictionary at the start of each run.
+    # It's private, so without it nothing is evicted.
+    return getattr(ctx, "cursors", None), bool(getattr(ctx, "fragment_ids_this_run", None))
 
-    # Register a callback for a given element_key.
-    _state._components_callbacks[element_key] = (callback, callback_args, callback_kwargs)
 
+def register(key: Hashable, callback: Callable, args: tuple, kwargs: dict) -> Optional[Callable]:
+    """Register the `on_change` of the chart with `key` for this run.
 
-def register(key, callback, args, kwargs):
+    Returns the handler to pass to the component, or None without callback.
+    Keyed charts are tracked, see `track`: the first chart rendered in a run
+    evicts the ones not rendered in the previous run with their edits, history
+    and stream, so the registry holds the charts on screen and nothing else.
+    """
+    if key is None:
+        assert callback is None, 'Please set a key in component !'
+        return None
+    registry = track(key)
+    if callback is None:
+        registry.entries[key] = None
+        return None
+    if ismethod(callback):
+        callback = weakref.WeakMethod(callback)
+    registry.entries[key] = Callback(callback, tuple(args or ()), dict(kwargs or {}))
+    # Streamlit keeps the handler with the widget, so it only holds the key.
+    return partial(_dispatch, key)
+
+
+def track(key: Hashable) -> CallbackRegistry:
+    """Keep the edits, history and stream stored under `key` while it's used in
+    each run, e.g. by a chart of a grid or a chart without key. They are evicted
+    like the charts of `register`."""
+    registry = _registry()
+    registry.start_run(*_current_run())
+    registry.rendered.add(key)
+    registry.entries.setdefault(key, None)
+    return registry
+
+
+def _dispatch(key: Hashable) -> None:
+    entry = _registry().entries.get(key)
+    if entry is None:
+        return
+    callback = entry.resolve()
     if callback is not None:
-        assert key is not None, 'Please set a key in component !'
-        args = args if args is not None else []
-        kwargs = kwargs if kwargs is not None else {}
-        register_callback(key, callback, *args, **kwargs)
+        callback(*entry.args, **entry.kwargs)
+
+
+def _evict_chart_state(keys: set) -> None:
+    for name in _CHART_STORES:
+        store = _state.get(name)
+        if not store:
+            continue
+        for key in [key for key in store if key in keys]:
+            del store[key]
@@ -1,20 +1,32 @@
 import os
 
-import streamlit as st
-import streamlit.components.v1 as components
+# Declared on the first widget call, see `declare_component`. It can be
+# replaced before, e.g. by a `ComponentRecorder`.
+_component_func = None
 
-from draggable_charts import _RELEASE
 
-if not _RELEASE:
-    _component_func = components.declare_component(
-        "draggable-chart",
-        url="http://localhost:3001",
-    )
-else:
+def declare_component():
+    """Declare the Streamlit component.
+
+    It's deferred to the first widget call, so importing the package doesn't
+    import Streamlit's component machinery.
+    """
+    from draggable_charts import _RELEASE
+
+    if os.environ.get("DRAGGABLE_CHARTS_RECORD"):
+        # Headless mode: calls are recorded in-process and return scripted values, see `recorder`.
+        from .recorder import ComponentRecorder
+        return ComponentRecorder()
+
+    import streamlit.components.v1 as components
+    if not _RELEASE:
+        return components.declare_component(
+            "draggable-chart",
+            url="http://localhost:3001",
+        )
     parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     build_dir = os.path.join(parent_dir, "frontend/build")
-    _component_func = components.declare_component(
-        "draggable-chart", path=build_dir)
+    return components.declare_component("draggable-chart", path=build_dir)
 
 
 def convert_session_value(id, value, kv: dict, return_index: bool):
@@ -33,5 +45,10 @@ def convert_session_value(id, value, kv: dict, return_index: bool):
             return value
 
 
-def component(id, kw, default=None, key=None):
-    return _component_func(id=id, kw=kw, default=default, key=key)
+def component(spec, kw, default=None, key=None, on_change=None, **tables):
+    global _component_func
+    if _component_func is None:
+        _component_func = declare_component()
+    # DataFrames passed as keyword arguments are serialized by Streamlit
+    # as Arrow tables instead of JSON.
+    return _component_func(id=spec.id, kw=kw, default=default, key=key, on_change=on_change, **tables)
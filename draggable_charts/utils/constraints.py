@@ -0,0 +1,174 @@
+"""Drag constraints of the `constraints` option, by trace.
+
+The frontend constrains every move of a point, see `Utils/constraints.jsx`.
+Python enforces the same rules on the edited points, so the returned data
+follows them even if the frontend sends values that don't.
+"""
+import math
+from typing import Any, Dict, Iterable, Mapping, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+RULES = ("min", "max", "monotone", "step", "lock_x")
+MONOTONE = ("increasing", "decreasing")
+
+
+def trace_rules(options: Mapping) -> Dict[str, Mapping]:
+    """Return the rules of the `constraints` option by trace name, as sent to the frontend."""
+    return {str(trace): rule for trace, rule in (options.get("constraints") or {}).items()}
+
+
+def validate_constraints(options: Mapping, traces: Mapping[str, Any]) -> None:
+    """Check the `constraints` option and that the y values of `traces`, by name, follow it."""
+    constraints = options.get("constraints") or {}
+    if not isinstance(constraints, Mapping):
+        raise ValueError(f"Option constraints must be a dictionary of rules by trace. Got: {type(constraints).__name__}.")
+    for trace, rule in trace_rules(options).items():
+        if not isinstance(rule, Mapping):
+            raise ValueError(f"Constraints of trace {trace!r} must be a dictionary. Got: {type(rule).__name__}.")
+        unknown = [name for name in rule if name not in RULES]
+        if unknown:
+            raise ValueError(f"Unknown constraints {unknown} for trace {trace!r}. Expected some of: {list(RULES)}.")
+        for name in ("min", "max", "step"):
+            if rule.get(name) is not None and not _is_number(rule[name]):
+                raise ValueError(f"Constraint '{name}' of trace {trace!r} must be a number. Got: {rule[name]!r}.")
+        if rule.get("step") is not None and rule["step"] <= 0:
+            raise ValueError(f"Constraint 'step' of trace {trace!r} must be positive. Got: {rule['step']!r}.")
+        if rule.get("min") is not None and rule.get("max") is not None and rule["min"] > rule["max"]:
+            raise ValueError(f"Constraint 'min' of trace {trace!r} is greater than its 'max'.")
+        if rule.get("monotone") not in (None,) + MONOTONE:
+            raise ValueError(
+                f"Unknown monotone constraint {rule['monotone']!r} for trace {trace!r}. Expected one of: {list(MONOTONE)}.")
+        if trace not in traces:
+            raise ValueError(f"Constraints for unknown trace {trace!r}. Expected one of: {list(traces)}.")
+
+        try:
+            values = np.asarray(traces[trace], dtype=float)
+        except (TypeError, ValueError):
+            raise ValueError(f"Constraints of trace {trace!r} need numeric y values.") from None
+        values = values[~np.isnan(values)]
+        if rule.get("min") is not None and (values < rule["min"]).any():
+            raise ValueError(f"Trace {trace!r} has values below its 'min' constraint {rule['min']}.")
+        if rule.get("max") is not None and (values > rule["max"]).any():
+            raise ValueError(f"Trace {trace!r} has values above its 'max' constraint {rule['max']}.")
+        steps = np.diff(values)
+        if rule.get("monotone") == "increasing" and (steps < 0).any():
+            raise ValueError(f"Trace {trace!r} must be increasing. It decreases after position {int(np.argmax(steps < 0))}.")
+        if rule.get("monotone") == "decreasing" and (steps > 0).any():
+            raise ValueError(f"Trace {trace!r} must be decreasing. It increases after position {int(np.argmax(steps > 0))}.")
+
+
+def constrain(value: float, previous: Optional[float], following: Optional[float], rule: Mapping) -> float:
+    """Return `value` snapped to the `step` of `rule`, within its bounds and, for
+    monotone traces, between the values of the neighbouring points. Like
+    `constrainY` in the frontend."""
+    step = rule.get("step")
+    base = rule.get("min") or 0
+    if step:
+        # Rounds halves up, like Math.round.
+        value = base + math.floor((value - base) / step + 0.5) * step
+    low, high = rule.get("min"), rule.get("max")
+    if rule.get("monotone") == "increasing":
+        low, high = _max(low, previous), _min(high, following)
+    elif rule.get("monotone") == "decreasing":
+        low, high = _max(low, following), _min(high, previous)
+    if step:
+        # The range is narrowed to its steps, if it has any.
+        first = low if low is None else base + math.ceil((low - base) / step) * step
+        last = high if high is None else base + math.floor((high - base) / step) * step
+        if first is None or last is None or first <= last:
+            low, high = first, last
+    if low is not None:
+        value = max(value, low)
+    if high is not None:
+        value = min(value, high)
+    return value
+
+
+def constrain_values(values: np.ndarray, rows: Iterable[int], rule: Mapping) -> np.ndarray:
+    """Constrain the edited `rows` of `values` in place, in order, so each one is
+    compared with the final value of the previous point."""
+    for row in sorted(set(rows)):
+        previous = values[row - 1] if row > 0 else None
+        following = values[row + 1] if row + 1 < len(values) else None
+        values[row] = constrain(values[row], previous, following, rule)
+    return values
+
+
+def frame_corrections(data: Union[pd.DataFrame, pd.Series], patches: list, options: Mapping) -> list:
+    """Return `[column position, row position, value]` patches that make the edited
+    cells of `data` follow the constraints, to apply like the frontend patches."""
+    rules = trace_rules(options)
+    if not rules:
+        return []
+    by_column = {}
+    for column, row, _ in patches:
+        by_column.setdefault(int(column), []).append(int(row))
+    corrections = []
+    for column, rows in by_column.items():
+        if isinstance(data, pd.Series):
+            name, series = data.name or "data", data
+        else:
+            name, series = data.columns[column], data.iloc[:, column]
+        rule = rules.get(str(name))
+        if rule is None:
+            continue
+        values = series.to_numpy(dtype=float, na_value=np.nan)
+        constrained = constrain_values(values.copy(), rows, rule)
+        corrections.extend([column, row, constrained[row]] for row in sorted(set(rows))
+                           if constrained[row] != values[row])
+    return corrections
+
+
+def constrain_traces(data: dict, original: dict, patches: list, options: Mapping, order: int = 1) -> None:
+    """Make the points of `data` edited by `[trace, index, x, y]` patches follow the
+    constraints, in place. Locked x values are restored from `original`.
+
+    For Bezier curves of `order` 2 or 3, the rules apply to the points of the
+    curve, every `order` points, and not to the control points between them.
+    Cubic control points move with their point of the curve, like in the chart.
+    """
+    rules = trace_rules(options)
+    if not rules:
+        return
+    by_trace = {}
+    for trace, index, _, _ in patches:
+        by_trace.setdefault(trace, set()).add(int(index))
+    for trace, rows in by_trace.items():
+        rule = rules.get(str(trace))
+        if rule is None:
+            continue
+        x, y = data[trace]["x"], data[trace]["y"]
+        # In order, so each point is compared with the final value of the previous one.
+        for row in sorted(row for row in rows if row % order == 0):
+            previous = y[row - order] if row >= order else None
+            following = y[row + order] if row + order < len(y) else None
+            value = constrain(y[row], previous, following, rule)
+            dy, dx = value - y[row], 0
+            y[row] = float(value)
+            if rule.get("lock_x"):
+                if order == 3:
+                    dx = original[trace]["x"][row] - x[row]
+                x[row] = original[trace]["x"][row]
+            if order == 3:
+                for index in (row - 1, row + 1):
+                    if 0 <= index < len(y):
+                        x[index] += dx
+                        y[index] = float(y[index] + dy)
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, bool)
+
+
+def _max(bound: Optional[float], value: Optional[float]) -> Optional[float]:
+    if value is None or np.isnan(value):
+        return bound
+    return value if bound is None else max(bound, value)
+
+
+def _min(bound: Optional[float], value: Optional[float]) -> Optional[float]:
+    if value is None or np.isnan(value):
+        return bound
+    return value if bound is None else min(bound, value)
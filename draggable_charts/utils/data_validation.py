@@ -1,53 +1,207 @@
+import reprlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, NamedTuple, Union
+
+import numpy as np
 import pandas as pd
 
+from .axes import AxisInfo, _is_numeric, axes_from
+from .constraints import validate_constraints
 
-def validate_scatter_data(data: dict, options: dict) -> None:
-    # Check if data is a dictionary
-    if not isinstance(data, dict):
-        raise ValueError("Data must be a dictionary.")
+ARRAY_TYPES = (list, tuple, np.ndarray, pd.Series, pd.Index)
+
+# Fingerprints of the data that passed validation, see `options['revalidate']`.
+_MAX_CHECKED = 1024
+_checked = OrderedDict()
+_checked_lock = threading.Lock()
+
+_repr = reprlib.Repr()
+_repr.maxlist = _repr.maxtuple = _repr.maxdict = _repr.maxset = 5
+_repr.maxstring = _repr.maxother = 40
+
+
+class TraceCheck(NamedTuple):
+    """Facts about a dictionary of traces found while validating it."""
+    numeric_x: bool
+    numeric_y: bool
+    has_nan: bool
+
+    @property
+    def axes(self) -> Dict[str, AxisInfo]:
+        return axes_from(self.numeric_x, self.numeric_y)
+
+
+def validate_scatter_data(data: dict, options: dict, revision: str = None) -> Dict[str, AxisInfo]:
+    check = check_traces(data, _skip_key('traces', options, revision))
+    validate_constraints(options, {str(name): trace['y'] for name, trace in data.items()})
 
     # If x is categorical, check if labels are specified
-    if options.get('x_type') == 'category' and not options.get('x_labels'):
+    if not check.numeric_x and not options.get('x_labels'):
         raise ValueError("For categorical data in X, you must specify the labels in the options.")
 
     # If y is categorical, check if labels are specified
-    if options.get('y_type') == 'category' and not options.get('y_labels'):
+    if not check.numeric_y and not options.get('y_labels'):
         raise ValueError("For categorical data in Y, you must specify the labels in the options.")
+    return check.axes
+
+
+def validate_bezier_data(data: dict, options: dict, revision: str = None) -> Dict[str, AxisInfo]:
+    if options.get('return_points', 'curve') not in ('curve', 'control'):
+        raise ValueError(
+            f"Unknown return_points option {_describe(options['return_points'])}. Expected 'curve' or 'control'.")
+    steps = options.get('curve_steps', 10)
+    if isinstance(steps, bool) or not isinstance(steps, (int, np.integer)) or steps < 1:
+        raise ValueError(f"Option curve_steps must be a positive integer. Got: {_describe(steps)}.")
+    tolerance = options.get('curve_tolerance')
+    if tolerance is not None and (isinstance(tolerance, bool) or not isinstance(tolerance, (int, float)) or tolerance <= 0):
+        raise ValueError(f"Option curve_tolerance must be a positive number or None. Got: {_describe(tolerance)}.")
+    check = check_traces(data, _skip_key('traces', options, revision))
+    if not check.numeric_x or not check.numeric_y:
+        raise ValueError("Bezier charts do not support categorical data.")
+    if check.has_nan:
+        raise ValueError("Bezier charts do not support missing values.")
+    validate_constraints(options, {str(name): trace['y'] for name, trace in data.items()})
+    return check.axes
+
+
+def validate_line_data(
+    data: Union[pd.DataFrame, pd.Series],
+    options: dict = None,
+    revision: str = None
+) -> Dict[str, AxisInfo]:
+    if not isinstance(data, (pd.Series, pd.DataFrame)):
+        raise ValueError(
+            f"Invalid data type: {type(data).__name__}. "
+            "Expected a pandas Series or DataFrame."
+        )
+    if options and options.get('constraints'):
+        columns = data.items() if isinstance(data, pd.DataFrame) else [(data.name or "data", data)]
+        validate_constraints(options, {str(name): column for name, column in columns})
+    key = _skip_key('frame', options, revision)
+    cached = _was_checked(key)
+    if cached:
+        return cached
+
+    x_numeric = _is_numeric(data.index, skipna=True)
+    if isinstance(data, pd.DataFrame):
+        non_numeric_columns = data.select_dtypes(exclude='number').columns
+        if len(non_numeric_columns) > 0:
+            raise ValueError(
+                f"The DataFrame contains {len(non_numeric_columns)} non-numeric columns: "
+                f"{_describe(list(non_numeric_columns))}. Expected a DataFrame with only numeric columns."
+            )
+    elif not _is_numeric(data, skipna=True):
+        axes = axes_from(x_numeric, False)
+        _set_checked(key, axes)
+        return axes
 
-    # Check if each trace is a dictionary with 'x' and 'y' keys
+    values = data.to_numpy(dtype=float, na_value=np.nan)
+    if np.isinf(values).any():
+        row = np.flatnonzero(np.isinf(values).reshape(len(data), -1).any(axis=1))[0]
+        raise ValueError(f"The data contains infinite values. First one at index {_describe(data.index[row])}.")
+    axes = axes_from(x_numeric, True)
+    _set_checked(key, axes)
+    return axes
+
+
+def check_traces(data: dict, skip_key: Hashable = None) -> TraceCheck:
+    """Check a dictionary of traces with one vectorized pass per trace.
+
+    Each trace must be a dictionary with 'x' and 'y' lists, tuples, NumPy arrays
+    or pandas objects of the same length, and numeric values must be finite.
+    Error messages only include a short summary of the values.
+    """
+    if not isinstance(data, dict):
+        raise ValueError(f"Data must be a dictionary. Got: {type(data).__name__}.")
+    cached = _was_checked(skip_key)
+    if cached:
+        return cached
+
+    numeric = {'x': True, 'y': True}
+    has_nan = False
     for trace_name, trace_data in data.items():
         if not isinstance(trace_data, dict) or 'x' not in trace_data or 'y' not in trace_data:
             raise ValueError(
-                f"Each trace must be a dictionary with 'x' and 'y' keys. Got: {trace_data}")
+                f"Each trace must be a dictionary with 'x' and 'y' keys. Got in trace {trace_name!r}: "
+                f"{_describe(trace_data)}")
 
-        if not isinstance(trace_data['x'], list) or not isinstance(trace_data['y'], list):
-            raise ValueError(
-                f"Both 'x' and 'y' must be lists. Got: x: {type(trace_data['x'])} y: {type(trace_data['y'])}")
+        lengths = {}
+        for axis in ('x', 'y'):
+            values = trace_data[axis]
+            if not isinstance(values, ARRAY_TYPES):
+                raise ValueError(
+                    f"'{axis}' of trace {trace_name!r} must be a list, tuple, NumPy array or pandas Series. "
+                    f"Got: {type(values).__name__}.")
+            array = np.asarray(values)
+            if array.ndim != 1:
+                raise ValueError(f"'{axis}' of trace {trace_name!r} must be one-dimensional. Got shape: {array.shape}.")
+            lengths[axis] = len(array)
 
-        if len(trace_data['x']) != len(trace_data['y']):
+            if not _is_numeric(array, skipna=False):
+                numeric[axis] = False
+                continue
+            array = array.astype(float, copy=False)
+            infinite = np.isinf(array)
+            if infinite.any():
+                raise ValueError(
+                    f"'{axis}' of trace {trace_name!r} contains infinite values. "
+                    f"First one at position {int(np.argmax(infinite))}.")
+            has_nan = has_nan or bool(np.isnan(array).any())
+
+        if lengths['x'] != lengths['y']:
             raise ValueError(
-                f"'x' and 'y' must be lists of the same length. Got: x={trace_data['x']}, y={trace_data['y']}")
+                f"'x' and 'y' of trace {trace_name!r} must have the same length. "
+                f"Got: x of length {lengths['x']}, y of length {lengths['y']}.")
 
+    check = TraceCheck(numeric['x'], numeric['y'], has_nan)
+    _set_checked(skip_key, check)
+    return check
 
-def validate_bezier_data(data: dict, options: dict) -> None:
-    if options.get('x_type') == 'category' or options.get('y_type') == 'category':
-        raise ValueError("Bezier charts do not support categorical data.")
 
-    validate_scatter_data(data, options)
+def trace_lists(data: dict) -> dict:
+    """Return the traces with 'x' and 'y' as lists, so they can be sent as JSON.
+
+    NaN in NumPy or pandas inputs becomes None, which the charts draw as gaps.
+    """
+    converted = {}
+    for name, trace_data in data.items():
+        converted[name] = dict(trace_data)
+        for axis in ('x', 'y'):
+            values = trace_data[axis]
+            if isinstance(values, list):
+                continue
+            array = np.asarray(values)
+            if array.dtype.kind == 'f' and np.isnan(array).any():
+                array = np.where(np.isnan(array), None, array)
+            converted[name][axis] = array.tolist()
+    return converted
+
+
+def _skip_key(kind: str, options: dict, revision: str) -> Union[Hashable, None]:
+    if revision is None or not options or options.get('revalidate', True):
+        return None
+    return kind, revision
+
 
+def _was_checked(key: Hashable):
+    if key is None:
+        return None
+    with _checked_lock:
+        result = _checked.get(key)
+        if result is not None:
+            _checked.move_to_end(key)
+        return result
 
-def validate_line_data(data: dict) -> None:
-    if isinstance(data, pd.Series):
+
+def _set_checked(key: Hashable, result) -> None:
+    if key is None:
         return
-    elif isinstance(data, pd.DataFrame):
-        non_numeric_columns = data.select_dtypes(exclude='number').columns
-        if len(non_numeric_columns) > 0:
-            raise ValueError(
-                f"The DataFrame contains non-numeric columns: {list(non_numeric_columns)}. "
-                "Expected a DataFrame with only numeric columns."
-            )
-    else:
-        raise ValueError(
-            f"Invalid data type: {type(data).__name__}. "
-            "Expected a pandas Series or DataFrame."
-        )
+    with _checked_lock:
+        _checked[key] = result
+        while len(_checked) > _MAX_CHECKED:
+            _checked.popitem(last=False)
+
+
+def _describe(value) -> str:
+    return _repr.repr(value)
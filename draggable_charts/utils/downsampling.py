@@ -0,0 +1,184 @@
+from typing import Dict, Hashable, List, Literal, Union
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_datetime64_any_dtype, is_numeric_dtype
+
+Method = Literal['lttb', 'min_max']
+Neighbourhood = Union[int, Literal['bucket']]
+
+
+def downsampling_key(options: dict) -> Union[tuple, None]:
+    """Return the options that change which points are sent, or None without `max_points`.
+
+    It is part of the chart revision, so edits of one sampling are never
+    applied to the rows of another one.
+    """
+    if not options or not options.get('max_points'):
+        return None
+    return options['max_points'], options.get('downsample', 'lttb'), options.get('edit_neighbourhood', 0)
+
+
+def downsample(x: np.ndarray, y: np.ndarray, max_points: int, method: Method = 'lttb') -> np.ndarray:
+    """Return the sorted positions of the points that represent a trace.
+
+    The first and last points are always kept, and every kept point is a real
+    point of the trace, so it can still be dragged. `x` is only used by LTTB.
+    """
+    y = np.asarray(y, dtype=float)
+    if len(y) <= max_points:
+        return np.arange(len(y))
+    if method == 'lttb':
+        return lttb(_numeric_x(x, len(y)), y, max_points)
+    if method == 'min_max':
+        return min_max(y, max_points)
+    raise ValueError(f"Unknown downsampling method '{method}'. Expected 'lttb' or 'min_max'.")
+
+
+def lttb(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: keep the point of each bucket that forms the
+    largest triangle with the previously kept point and the next bucket's average."""
+    n = len(y)
+    if max_points < 3:
+        return np.array([0, n - 1])[:max(max_points, 1)]
+    # Buckets of the points between the first and the last, as in the reference algorithm.
+    every = (n - 2) / (max_points - 2)
+    edges = np.floor(np.arange(max_points - 1) * every).astype(np.intp) + 1
+    # The last point is left out of the average of the last bucket.
+    finite = np.isfinite(y[:-1])
+    counts = np.maximum(np.add.reduceat(finite, edges[:-1]), 1)
+    avg_x = np.add.reduceat(np.where(finite, x[:-1], 0), edges[:-1]) / counts
+    avg_y = np.add.reduceat(np.where(finite, y[:-1], 0), edges[:-1]) / counts
+    avg_x, avg_y = np.append(avg_x[1:], x[-1]), np.append(avg_y[1:], y[-1])
+
+    selected = np.empty(max_points, dtype=np.intp)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for i in range(max_points - 2):
+        start, end = edges[i], edges[i + 1]
+        areas = np.abs(
+            (x[previous] - avg_x[i]) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (avg_y[i] - y[previous])
+        )
+        previous = start + int(np.argmax(np.where(np.isnan(areas), -1, areas)))
+        selected[i + 1] = previous
+    return selected
+
+
+def min_max(y: np.ndarray, max_points: int) -> np.ndarray:
+    """Keep the minimum and maximum of each bucket, so peaks are never lost."""
+    n = len(y)
+    buckets = (max_points - 2) // 2
+    if buckets < 1:
+        return np.array([0, n - 1])[:max(max_points, 1)]
+    middle = y[1:-1]
+    size = -(-len(middle) // buckets)
+    padded = np.full(buckets * size, np.nan)
+    padded[:len(middle)] = middle
+    padded = padded.reshape(buckets, size)
+    offsets = np.arange(buckets) * size + 1
+    lows = offsets + np.argmin(np.where(np.isnan(padded), np.inf, padded), axis=1)
+    highs = offsets + np.argmax(np.where(np.isnan(padded), -np.inf, padded), axis=1)
+    selected = np.concatenate([[0], lows, highs, [n - 1]])
+    return np.unique(selected[selected < n])
+
+
+def downsample_frame(data: pd.DataFrame, max_points: int, method: Method = 'lttb') -> np.ndarray:
+    """Return the union of the rows picked for each column of `data`."""
+    x = data.index.to_numpy()
+    rows = [downsample(x, data.iloc[:, i].to_numpy(dtype=float, na_value=np.nan), max_points, method)
+            for i in range(data.shape[1])]
+    return np.unique(np.concatenate(rows)) if rows else np.arange(len(data))
+
+
+def neighbourhood(rows: np.ndarray, position: int, size: int, extent: Neighbourhood = 0) -> np.ndarray:
+    """Return the full-resolution rows edited by a drag on the downsampled point `position`.
+
+    `extent` is the number of rows to each side of the dragged row, or 'bucket'
+    for every row the point represents, up to halfway to its neighbours.
+    """
+    row = int(rows[position])
+    if extent == 'bucket':
+        start = 0 if position == 0 else (int(rows[position - 1]) + row) // 2 + 1
+        end = size if position == len(rows) - 1 else (row + int(rows[position + 1])) // 2 + 1
+        return np.arange(start, end)
+    return np.arange(max(row - int(extent), 0), min(row + int(extent) + 1, size))
+
+
+def expand_frame_patches(
+    data: Union[pd.DataFrame, pd.Series],
+    patches: list,
+    rows: np.ndarray,
+    extent: Neighbourhood = 0
+) -> list:
+    """Map `[column, position, value]` patches of a downsampled frame to full-resolution rows.
+
+    The neighbours of the dragged row are shifted by the same offset, so the
+    shape of the data around it is kept.
+    """
+    frame = data.to_frame() if isinstance(data, pd.Series) else data
+    expanded = []
+    for column, position, value in patches:
+        original = frame.iloc[:, int(column)].to_numpy(dtype=float, na_value=np.nan)
+        row = int(rows[int(position)])
+        targets = neighbourhood(rows, int(position), len(frame), extent)
+        values = original[targets] + (value - original[row])
+        values[targets == row] = value
+        expanded.extend([int(column), int(target), float(v)] for target, v in zip(targets, values))
+    return expanded
+
+
+def downsample_traces(data: dict, max_points: int, method: Method = 'lttb') -> Dict[Hashable, np.ndarray]:
+    """Return the positions of the points kept for each trace of a dictionary of traces."""
+    return {name: downsample(np.asarray(trace_data['x']), trace_data['y'], max_points, method)
+            for name, trace_data in data.items()}
+
+
+def select_traces(data: dict, rows: Dict[Hashable, np.ndarray]) -> dict:
+    selected = {}
+    for name, trace_data in data.items():
+        selected[name] = {
+            **trace_data,
+            'x': np.asarray(trace_data['x'])[rows[name]].tolist(),
+            'y': np.asarray(trace_data['y'])[rows[name]].tolist(),
+        }
+    return selected
+
+
+def expand_trace_patches(
+    data: dict,
+    patches: list,
+    rows: Dict[Hashable, np.ndarray],
+    extent: Neighbourhood = 0
+) -> List[list]:
+    """Map `[trace, position, x, y]` patches of downsampled traces to the full traces.
+
+    Neighbours are shifted by the same offset as the dragged point, in x only
+    when x is numeric.
+    """
+    expanded = []
+    for trace, position, x, y in patches:
+        trace_x = np.asarray(data[trace]['x'])
+        trace_y = np.asarray(data[trace]['y'], dtype=float)
+        row = int(rows[trace][int(position)])
+        targets = neighbourhood(rows[trace], int(position), len(trace_y), extent)
+        new_y = trace_y[targets] + (y - trace_y[row])
+        if is_numeric_dtype(trace_x.dtype) and isinstance(x, (int, float)):
+            new_x = (trace_x[targets] + (x - trace_x[row])).tolist()
+        else:
+            new_x = trace_x[targets].tolist()
+        for target, target_x, target_y in zip(targets, new_x, new_y):
+            if target == row:
+                target_x, target_y = x, y
+            expanded.append([trace, int(target), target_x, float(target_y)])
+    return expanded
+
+
+def _numeric_x(x: np.ndarray, size: int) -> np.ndarray:
+    x = np.asarray(x)
+    if is_datetime64_any_dtype(x.dtype):
+        return x.astype('datetime64[ns]').astype(np.int64).astype(float)
+    if is_numeric_dtype(x.dtype) and len(x) == size:
+        return x.astype(float)
+    # Categories are spread evenly.
+    return np.arange(size, dtype=float)
@@ -0,0 +1,160 @@
+from typing import Any, Callable, Hashable, List, Mapping, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_bool_dtype, is_integer_dtype
+from streamlit import session_state as _state
+
+from .callback import track
+from .constraints import constrain_traces
+
+Cell = Tuple[Hashable, Hashable]
+
+
+class EditState:
+    """Edited copy of a widget's input, kept across reruns for one data revision."""
+    __slots__ = ("revision", "data", "changed")
+
+    def __init__(self, revision: str, data: Any):
+        self.revision = revision
+        self.data = data
+        self.changed: List[Cell] = []
+
+
+def get_patches(value: Any, revision: str) -> list:
+    """Return the patches of a component value if they belong to `revision`.
+
+    The frontend sends `{"revision": ..., "patches": [...]}` with the latest
+    value of every edited point since the chart received `revision`, so
+    applying them is idempotent.
+    """
+    if isinstance(value, dict) and value.get("revision") == revision:
+        return value.get("patches") or []
+    return []
+
+
+def chart_value(key: Hashable) -> Any:
+    """Return the value of the chart with `key` from the session state, which
+    Streamlit sets before the chart is rendered in the run."""
+    if isinstance(key, tuple):
+        # A chart of a `chart_grid`, whose value is `{chart name: value}`.
+        grid, name = key
+        return (_state.get(grid) or {}).get(str(name))
+    return _state.get(key)
+
+
+def get_edit_state(store_key: Hashable, revision: str, copy: Callable[[], Any]) -> EditState:
+    # The state is evicted once the chart isn't rendered, see `track`.
+    track(store_key)
+    if "_draggable_charts_edits" not in _state:
+        _state._draggable_charts_edits = {}
+    store = _state._draggable_charts_edits
+
+    state = store.get(store_key)
+    if state is None or state.revision != revision:
+        state = EditState(revision, copy())
+        store[store_key] = state
+    return state
+
+
+def changed_cells(key: Hashable) -> List[Cell]:
+    """Return the `(trace, index)` cells edited by the user in the chart with `key`.
+
+    Charts of a `chart_grid` have the key `(grid key, chart name)`.
+    """
+    store = _state.get("_draggable_charts_edits", {})
+    state = store.get(key)
+    return list(state.changed) if state is not None else []
+
+
+def apply_frame_patches(
+    data: Union[pd.DataFrame, pd.Series],
+    patches: list
+) -> Tuple[Union[pd.DataFrame, pd.Series], List[Cell]]:
+    """Apply `[column position, row position, value]` patches to `data` in place.
+
+    Dtypes are kept, except for integer or boolean columns receiving values they
+    can't hold, which are upcast to float. Returns the patched object and the
+    `(column, index)` labels of the changed cells.
+    """
+    by_column = {}
+    for column, row, value in patches:
+        rows, values = by_column.setdefault(int(column), ([], []))
+        rows.append(int(row))
+        values.append(value)
+
+    changed = []
+    for column, (rows, values) in by_column.items():
+        values = np.asarray(values, dtype=float)
+        if isinstance(data, pd.Series):
+            dtype, label = data.dtype, data.name
+        else:
+            dtype, label = data.dtypes.iloc[column], data.columns[column]
+
+        if is_integer_dtype(dtype) or is_bool_dtype(dtype):
+            if _can_hold(values, dtype):
+                values = values.astype(dtype)
+            elif isinstance(data, pd.Series):
+                data = data.astype(float)
+            else:
+                data.isetitem(column, data.iloc[:, column].astype(float))
+
+        if isinstance(data, pd.Series):
+            data.iloc[rows] = values
+        else:
+            data.iloc[rows, column] = values
+        changed.extend((label, data.index[row]) for row in rows)
+    return data, changed
+
+
+def trace_patches(data: dict, patches: list) -> list:
+    """Return `[trace, index, x, y]` patches with the trace names of `data`.
+
+    The frontend sends names back as JSON strings, e.g. "1" for the trace `1`.
+    Patches of unknown traces are skipped.
+    """
+    names = {str(name): name for name in data}
+    return [[names[str(trace)], *rest] for trace, *rest in patches if str(trace) in names]
+
+
+def apply_trace_patches(data: dict, patches: list) -> List[Cell]:
+    """Apply `[trace, index, x, y]` patches to a dictionary of traces in place."""
+    changed = []
+    for trace, index, x, y in patches:
+        data[trace]["x"][index] = x
+        data[trace]["y"][index] = y
+        changed.append((trace, index))
+    return changed
+
+
+def edit_traces(
+    data: dict,
+    patches: list,
+    revision: str,
+    store_key: Hashable,
+    options: Mapping = None,
+    order: int = 1
+) -> Union[dict, None]:
+    """Return the edited copy of a dictionary of traces, or None if there are no patches.
+
+    Edited points follow the `constraints` option, if any. For Bezier charts,
+    `order` is the order of the curve, see `constrain_traces`.
+    """
+    if not patches:
+        return None
+    state = get_edit_state(store_key, revision, lambda: copy_traces(data))
+    state.changed = apply_trace_patches(state.data, patches)
+    if options is not None:
+        constrain_traces(state.data, data, patches, options, order)
+    return state.data
+
+
+def copy_traces(data: dict) -> dict:
+    return {trace: {"x": list(trace_data["x"]), "y": list(trace_data["y"])}
+            for trace, trace_data in data.items()}
+
+
+def _can_hold(values: np.ndarray, dtype) -> bool:
+    if is_bool_dtype(dtype):
+        return bool(np.isin(values, (0, 1)).all())
+    return bool((values == np.round(values)).all())
@@ -0,0 +1,44 @@
+import hashlib
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+
+
+def fingerprint(*objects) -> str:
+    """Return a short content hash of chart data.
+
+    Pandas objects and numeric arrays are hashed from their buffers, so the
+    cost is a single C-level pass over the data.
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    for obj in objects:
+        _update(hasher, obj)
+    return hasher.hexdigest()
+
+
+def _update(hasher, obj) -> None:
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        columns = list(obj.columns) if isinstance(obj, pd.DataFrame) else [obj.name]
+        hasher.update(repr((type(obj).__name__, columns, list(_dtypes(obj)))).encode())
+        hasher.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    elif isinstance(obj, Mapping):
+        hasher.update(b'{')
+        for key, value in obj.items():
+            hasher.update(repr(key).encode())
+            _update(hasher, value)
+        hasher.update(b'}')
+    elif isinstance(obj, (list, tuple, np.ndarray)):
+        array = np.asarray(obj)
+        hasher.update(array.dtype.str.encode())
+        hasher.update(repr(array.shape).encode())
+        if array.dtype.kind in 'biufcmM':
+            hasher.update(np.ascontiguousarray(array).tobytes())
+        else:
+            hasher.update(pd.util.hash_array(array.astype(object).ravel()).tobytes())
+    else:
+        hasher.update(repr(obj).encode())
+
+
+def _dtypes(obj):
+    return obj.dtypes if isinstance(obj, pd.DataFrame) else [obj.dtype]
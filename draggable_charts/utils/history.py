@@ -0,0 +1,138 @@
+from collections import deque
+from typing import Any, Hashable, List, Mapping, NamedTuple, Optional, Tuple
+
+from streamlit import session_state as _state
+
+# Estimated memory of one moved point in a delta, like in the frontend, so
+# both sides drop the same actions when the history is full.
+CELL_BYTES = 64
+
+
+class Delta(NamedTuple):
+    """One moved point of an edit: its values before and after the drag.
+
+    `trace` and `index` have the format of the patches of the chart, e.g. the
+    column and row positions for `line_chart`.
+    """
+    trace: Hashable
+    index: int
+    before: Tuple[Any, ...]
+    after: Tuple[Any, ...]
+
+
+class EditHistory:
+    """Undo/redo history of the edits of a chart, mirrored from the frontend.
+
+    entries : One list of `Delta` per edit, oldest first. Entries from `cursor`
+        on were undone and can be redone.
+    bytes : Estimated memory of the entries. The oldest ones are dropped when it
+        exceeds the `history_bytes` option.
+    """
+    __slots__ = ("revision", "max_bytes", "entries", "cursor", "bytes", "last_id", "commands", "last_command")
+
+    def __init__(self, revision: str, max_bytes: int, last_command: int = 0):
+        self.revision = revision
+        self.max_bytes = max_bytes
+        self.entries: deque = deque()
+        self.cursor = 0
+        self.bytes = 0
+        # Id of the last action received from the frontend.
+        self.last_id = 0
+        # Undo and redo commands not yet run by the frontend, as `(id, action)`.
+        self.commands: List[Tuple[int, str]] = []
+        self.last_command = last_command
+
+    @property
+    def can_undo(self) -> bool:
+        return self.cursor > 0
+
+    @property
+    def can_redo(self) -> bool:
+        return self.cursor < len(self.entries)
+
+    def apply(self, action: Mapping) -> None:
+        kind = action["action"]
+        if kind == "edit":
+            while len(self.entries) > self.cursor:
+                self.bytes -= len(self.entries.pop()) * CELL_BYTES
+            self.entries.append([Delta(trace, index, tuple(before), tuple(after))
+                                 for trace, index, before, after in action["cells"]])
+            self.bytes += len(action["cells"]) * CELL_BYTES
+            self.cursor += 1
+            while self.bytes > self.max_bytes:
+                self.bytes -= len(self.entries.popleft()) * CELL_BYTES
+                self.cursor -= 1
+        elif kind == "undo":
+            self.cursor = max(self.cursor - 1, 0)
+        elif kind == "redo":
+            self.cursor = min(self.cursor + 1, len(self.entries))
+
+    def queue(self, action: str) -> None:
+        self.last_command += 1
+        self.commands.append((self.last_command, action))
+
+
+def _store() -> dict:
+    if "_draggable_charts_history" not in _state:
+        _state._draggable_charts_history = {}
+    return _state._draggable_charts_history
+
+
+def history_kw(kw: dict, key: Hashable, options: Mapping) -> dict:
+    """Return the payload with the `history` argument: the last action received
+    and the pending commands. The cached payload is not modified."""
+    if key is None or not options["history_bytes"]:
+        return kw
+    history = _store().get(key)
+    if history is None:
+        return {**kw, "history": {"ack": 0, "commands": []}}
+    commands = history.commands if history.revision == kw["revision"] else []
+    return {**kw, "history": {"ack": history.last_id, "commands": [list(command) for command in commands]}}
+
+
+def record_history(key: Hashable, value: Any, revision: str, options: Mapping) -> None:
+    """Add the actions in a component value to the history of the chart with `key`."""
+    if key is None or not options["history_bytes"]:
+        return
+    if not isinstance(value, dict) or value.get("revision") != revision or "history" not in value:
+        return
+    store = _store()
+    history = store.get(key)
+    if history is None or history.revision != revision:
+        # Edits of other data can't be undone, but command ids keep increasing.
+        history = EditHistory(revision, options["history_bytes"], history.last_command if history else 0)
+        store[key] = history
+    for action in value["history"]["actions"]:
+        if action["id"] > history.last_id:
+            history.apply(action)
+            history.last_id = action["id"]
+    # Commands run by the frontend are not sent again.
+    history.commands = [command for command in history.commands if command[0] > value["history"]["command"]]
+
+
+def edit_history(key: Hashable) -> Optional[EditHistory]:
+    """Return the undo/redo history of the chart with `key`, or None if it has no edits.
+
+    Charts of a `chart_grid` have the key `(grid key, chart name)`.
+    """
+    return _state.get("_draggable_charts_history", {}).get(key)
+
+
+def undo(key: Hashable) -> None:
+    """Undo the last edit of the chart with `key`. It can be used as a callback.
+
+    The frontend undoes it on the next rerun and sends the reverted points,
+    so the returned data changes one rerun later.
+    """
+    _queue(key, "undo")
+
+
+def redo(key: Hashable) -> None:
+    """Redo the last undone edit of the chart with `key`, like `undo`."""
+    _queue(key, "redo")
+
+
+def _queue(key: Hashable, action: str) -> None:
+    history = edit_history(key)
+    if history is not None:
+        history.queue(action)
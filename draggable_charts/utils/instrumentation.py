@@ -0,0 +1,225 @@
+import json
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+_logger = logging.getLogger(__name__)
+
+# Functions called with a `WidgetEvent` after every widget call.
+_hooks: List[Callable[['WidgetEvent'], None]] = []
+_hooks_lock = threading.Lock()
+
+
+class WidgetEvent:
+    """Timing and size of one widget call, passed to every hook.
+
+    chart : The id of the chart, e.g. "line_chart".
+    key : The key of the widget.
+    revision : The fingerprint of the input data.
+    stages : Seconds spent per stage, in the order they ran. Stages of the payload
+        build ("validate", "transform", "control_points", ...) are only present
+        when the payload was not found in the cache.
+    seconds : Total seconds of the call.
+    cached : Whether the payload came from the cache.
+    traces, points : Number of traces and points sent to the chart.
+    payload_bytes : Size of the payload sent to the chart. It's computed on
+        first access, so hooks that don't read it don't pay for it.
+    """
+    __slots__ = ("chart", "key", "revision", "stages", "seconds", "cached", "traces", "points",
+                 "_kw", "_tables", "_payload_bytes")
+
+    def __init__(self, chart: str, key: Optional[str], revision: str, stages: Dict[str, float],
+                 seconds: float, kw: dict, tables: dict):
+        self.chart = chart
+        self.key = key
+        self.revision = revision
+        self.stages = stages
+        self.seconds = seconds
+        self.cached = "validate" not in stages
+        self.traces, self.points = count_points(kw, tables)
+        self._kw = kw
+        self._tables = tables
+        self._payload_bytes = None
+
+    @property
+    def payload_bytes(self) -> int:
+        if self._payload_bytes is None:
+            self._payload_bytes = payload_bytes(self._kw, self._tables)
+        return self._payload_bytes
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in
+                ("chart", "key", "revision", "stages", "seconds", "cached", "traces", "points", "payload_bytes")}
+
+    def __repr__(self) -> str:
+        return f"WidgetEvent(chart={self.chart!r}, key={self.key!r}, seconds={self.seconds:.4f}, cached={self.cached})"
+
+
+class Call:
+    """Stage timer of one widget call. Each `mark` closes the stage that ran since the previous one."""
+    __slots__ = ("spec", "key", "stages", "_start", "_last")
+
+    def __init__(self, spec, key: Optional[str]):
+        self.spec = spec
+        self.key = key
+        self.stages: Dict[str, float] = {}
+        self._start = self._last = time.perf_counter()
+
+    def mark(self, stage: str) -> None:
+        now = time.perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0.0) + now - self._last
+        self._last = now
+
+    def finish(self, revision: str, kw: dict, tables: dict = None) -> None:
+        event = WidgetEvent(self.spec.id, self.key, revision, self.stages,
+                            time.perf_counter() - self._start, kw, tables or {})
+        for hook in list(_hooks):
+            # A failing hook is logged, so it never changes the result of the widget.
+            try:
+                hook(event)
+            except Exception:
+                _logger.exception("Instrumentation hook %r failed for %s.", hook, self.spec.id)
+
+
+class _NullCall:
+    """Used when no hook is registered, so widget calls aren't timed at all."""
+    __slots__ = ()
+
+    def mark(self, stage: str) -> None:
+        pass
+
+    def finish(self, revision: str, kw: dict, tables: dict = None) -> None:
+        pass
+
+
+NULL_CALL = _NullCall()
+
+
+def start_call(spec, key: Optional[str] = None):
+    """Return the stage timer of a widget call, or a no-op one if there are no hooks."""
+    return Call(spec, key) if _hooks else NULL_CALL
+
+
+def add_hook(hook: Callable[[WidgetEvent], None]) -> Callable[[WidgetEvent], None]:
+    """Call `hook` with a `WidgetEvent` after every widget call. Can be used as a decorator."""
+    with _hooks_lock:
+        _hooks.append(hook)
+    return hook
+
+
+def remove_hook(hook: Callable[[WidgetEvent], None]) -> None:
+    with _hooks_lock:
+        if hook in _hooks:
+            _hooks.remove(hook)
+
+
+@contextmanager
+def instrument(hook: Callable[[WidgetEvent], None] = None):
+    """Register `hook`, by default a new `StageStats`, while the block runs."""
+    hook = hook if hook is not None else StageStats()
+    add_hook(hook)
+    try:
+        yield hook
+    finally:
+        remove_hook(hook)
+
+
+class StageStats:
+    """Hook that keeps the latest durations per chart and key, and summarizes them as percentiles.
+
+    Only the last `max_samples` calls of each widget are kept. The payload size
+    is only computed by `summary`, once per payload, so calls don't pay for it.
+    """
+
+    def __init__(self, max_samples: int = 1000):
+        self.max_samples = max_samples
+        self._samples: Dict[Tuple[str, Hashable], Dict[str, deque]] = {}
+        self._calls: Dict[Tuple[str, Hashable], int] = {}
+        self._cached: Dict[Tuple[str, Hashable], int] = {}
+        # Last event of each widget with a new payload, see `WidgetEvent.payload_bytes`.
+        self._payloads: Dict[Tuple[str, Hashable], WidgetEvent] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event: WidgetEvent) -> None:
+        widget = (event.chart, event.key)
+        with self._lock:
+            samples = self._samples.setdefault(widget, {})
+            for stage, seconds in (*event.stages.items(), ("total", event.seconds)):
+                if stage not in samples:
+                    samples[stage] = deque(maxlen=self.max_samples)
+                samples[stage].append(seconds)
+            self._calls[widget] = self._calls.get(widget, 0) + 1
+            self._cached[widget] = self._cached.get(widget, 0) + event.cached
+            previous = self._payloads.get(widget)
+            if previous is None or previous.revision != event.revision or not event.cached:
+                self._payloads[widget] = event
+
+    def summary(self, percentiles: Iterable[float] = (50, 90, 99)) -> Dict[Tuple[str, Hashable], dict]:
+        """Return, per `(chart, key)`, the number of calls, cache hits, last payload size
+        and the percentiles of the seconds of every stage and of the total."""
+        percentiles = list(percentiles)
+        with self._lock:
+            payloads = dict(self._payloads)
+            summary = {}
+            for widget, samples in self._samples.items():
+                summary[widget] = {
+                    "calls": self._calls[widget],
+                    "cached": self._cached[widget],
+                    "payload_bytes": None,
+                    "seconds": {
+                        stage: dict(zip((f"p{p:g}" for p in percentiles),
+                                        np.percentile(np.fromiter(values, float), percentiles).tolist()))
+                        for stage, values in samples.items()
+                    },
+                }
+        # Sizes are computed outside of the lock, as they serialize the payloads.
+        for widget, event in payloads.items():
+            summary[widget]["payload_bytes"] = event.payload_bytes
+        return summary
+
+    def clear(self) -> None:
+        with self._lock:
+            self._samples.clear()
+            self._calls.clear()
+            self._cached.clear()
+            self._payloads.clear()
+
+
+def count_points(kw: dict, tables: dict) -> Tuple[int, int]:
+    """Return the number of traces and points in a payload."""
+    if "charts" in kw:
+        # Payload of a `chart_grid`, with the payload of every chart.
+        counts = [count_points(cell["kw"], {cell["table"]: tables[cell["table"]]} if cell["table"] else {})
+                  for cell in kw["charts"]]
+        return sum(traces for traces, _ in counts), sum(points for _, points in counts)
+    data = kw.get("data", {})
+    if tables:
+        rows = sum(len(table) for table in tables.values())
+        return len(data), rows * len(data)
+    points = 0
+    for trace in data.values():
+        values = trace.get("x", trace.get("data", ()))
+        points += len(values)
+    return len(data), points
+
+
+def payload_bytes(kw: dict, tables: dict) -> int:
+    """Return the size of a payload, serialized like Streamlit sends it."""
+    size = len(json.dumps(kw, default=str).encode())
+    for table in tables.values():
+        size += _arrow_bytes(table)
+    return size
+
+
+def _arrow_bytes(frame) -> int:
+    import pyarrow as pa
+    table = pa.Table.from_pandas(frame)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().size
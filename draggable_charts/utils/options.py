@@ -1,9 +1,83 @@
-import inspect
-from typing import Literal
+import warnings
+from collections.abc import Mapping
+from itertools import cycle, islice
+from typing import TYPE_CHECKING, Any, Dict, Hashable, Iterable, Iterator
 
 import numpy as np
 
-DEFAULT_OPTIONS = {
+from .axes import AxisInfo, infer_axes
+
+if TYPE_CHECKING:
+    from .registry import ChartSpec
+
+
+class ChartOptions(Mapping):
+    """Immutable, hashable chart options.
+
+    Values are frozen when the options are built: lists become tuples and
+    dictionaries become `ChartOptions`, so the caller's dictionary is never
+    aliased or mutated, and the options can be part of a cache key.
+    """
+    __slots__ = ("_items", "_hash")
+
+    def __init__(self, options: Mapping = None, **updates):
+        items = dict(options or {}, **updates)
+        self._items = {key: _freeze(key, value) for key, value in items.items()}
+        self._hash = hash(frozenset(self._items.items()))
+
+    def __getitem__(self, key: Hashable) -> Any:
+        return self._items[key]
+
+    def __iter__(self) -> Iterator:
+        return iter(self._items)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, ChartOptions):
+            return self._hash == other._hash and self._items == other._items
+        return super().__eq__(other)
+
+    def __repr__(self) -> str:
+        return f"ChartOptions({self._items!r})"
+
+    def replace(self, **updates) -> 'ChartOptions':
+        return ChartOptions(self._items, **updates)
+
+    def to_dict(self) -> dict:
+        """Return a plain dictionary that can be sent to the frontend as JSON."""
+        return {key: value.to_dict() if isinstance(value, ChartOptions) else value
+                for key, value in self._items.items()}
+
+
+def _freeze(key: Hashable, value: Any) -> Hashable:
+    if isinstance(value, ChartOptions):
+        return value
+    if isinstance(value, Mapping):
+        return ChartOptions(value)
+    if isinstance(value, (list, tuple, set, frozenset, np.ndarray)):
+        return tuple(_freeze(key, item) for item in (value.tolist() if isinstance(value, np.ndarray) else value))
+    try:
+        hash(value)
+    except TypeError:
+        raise ValueError(
+            f"Option '{key}' has an unsupported value of type {type(value).__name__}.") from None
+    return value
+
+
+DEFAULT_OPTIONS = ChartOptions({
+    "title": None,
+    "x_label": None,
+    "y_label": None,
+    "legend": True,
+    "legend_position": "top",
+    "legend_align": "center",
+    "x_labels": None,
+    "y_labels": None,
     "x_grid": True,
     "y_grid": True,
     "tension": 0.3,
@@ -21,75 +95,63 @@ DEFAULT_OPTIONS = {
     "x_format": None,
     "y_format": ".2~s",
     "fill": [False],
+    "transport": "json",
+    "max_points": None,
+    "downsample": "lttb",
+    "edit_neighbourhood": 0,
+    "revalidate": True,
+    "return_points": "curve",
+    "curve_steps": 10,
+    "curve_tolerance": None,
+    "stream": False,
+    "stream_window": None,
+    "history_bytes": 2**20,
+    "batch": False,
+    "batch_delay": None,
+    "batch_size": None,
+    "constraints": {},
+    "visible_traces": None,
+})
+
+# Option lists that are cycled through to style each trace, by style name.
+STYLE_OPTIONS = {
+    "color": "colors",
+    "border_dash": "border_dash",
+    "point_radius": "point_radius",
+    "fill": "fill",
 }
 
 
-def set_options(data: dict, options: dict) -> dict:
-    caller_name = inspect.stack()[1].function
+def compile_options(options: Mapping, spec: 'ChartSpec') -> ChartOptions:
+    """Merge the user's options over the defaults of the chart into frozen options.
+
+    Keys without a default are kept, with a warning, so a misspelled option
+    doesn't go unnoticed.
+    """
     if not options:
-        options = DEFAULT_OPTIONS.copy()
-    options['x_type'] = _get_scale_type(data, 'x', caller_name)
-    options['y_type'] = _get_scale_type(data, 'y', caller_name)
-
-    options['tension'] = options.get('tension', DEFAULT_OPTIONS['tension'])
-    options['show_line'] = options.get('show_line', DEFAULT_OPTIONS['show_line'])
-    options['fixed_lines'] = options.get('fixed_lines', DEFAULT_OPTIONS['fixed_lines'])
-
-    options['colors'] = options.get('colors', DEFAULT_OPTIONS['colors'])
-    options['border_dash'] = options.get('border_dash', DEFAULT_OPTIONS['border_dash'])
-    options['point_radius'] = options.get('point_radius', DEFAULT_OPTIONS['point_radius'])
-    options['fill_gaps'] = options.get('fill_gaps', DEFAULT_OPTIONS['fill_gaps'])
-    options['labels'] = options.get('labels', DEFAULT_OPTIONS['labels'])
-
-    options['x_format'] = options.get('x_format', DEFAULT_OPTIONS['x_format'])
-    options['y_format'] = options.get('y_format', DEFAULT_OPTIONS['y_format'])
-
-    options['fill'] = options.get('fill', DEFAULT_OPTIONS['fill'])
-    
-    data = include_colors(data, options)
-    data = include_border_dash(data, options)
-    data = include_point_radius(data, options)
-    data = include_fill(data, options)
-    return data, options
-
-
-def include_colors(data: dict, options: dict) -> dict:
-    for i, trace_data in enumerate(data.values()):
-        trace_data['color'] = options['colors'][i % len(options['colors'])]
-    return data
-
-
-def include_border_dash(data: dict, options: dict) -> dict:
-    for i, trace_data in enumerate(data.values()):
-        trace_data['border_dash'] = options['border_dash'][i % len(options['border_dash'])]
-    return data
-
-
-def include_point_radius(data: dict, options: dict) -> dict:
-    for i, trace_data in enumerate(data.values()):
-        trace_data['point_radius'] = options['point_radius'][i % len(options['point_radius'])]
-    return data
-
-
-def include_fill(data: dict, options: dict) -> dict:
-    for i, trace_data in enumerate(data.values()):
-        trace_data['fill'] = options['fill'][i % len(options['fill'])]
-    return data
-
-
-def _get_scale_type(data: dict, axis: Literal['x', 'y'], caller: str) -> Literal['linear', 'category']:
-    if caller == 'line_chart':
-        for trace_data in data.values():
-            data = trace_data['data']
-            if axis == 'x':
-                if not all(val is None or isinstance(val, (int, float, np.number)) for val in data.keys()):
-                    return 'category'
-            else:
-                if not all(val is None or isinstance(val, (int, float, np.number)) for val in data.values()):
-                    return 'category'
-        return 'linear'
-
-    for trace_data in data.values():
-        if not all(isinstance(val, (int, float, np.number)) for val in trace_data[axis]):
-            return 'category'
-    return 'linear'
+        return spec.default_options
+    unknown = [key for key in options if key not in spec.default_options]
+    if unknown:
+        # Reported at the call of the widget, through its `prepare`.
+        warnings.warn(f"Unknown options {unknown}. Expected some of: {list(spec.default_options)}.", stacklevel=4)
+    return ChartOptions({**spec.default_options, **options})
+
+
+def with_axes(options: ChartOptions, data, axes: Dict[str, AxisInfo] = None) -> ChartOptions:
+    """Return the options with the `x_type` and `y_type` scales of the data."""
+    if axes is None:
+        axes = infer_axes(data)
+    return options.replace(x_type=axes['x'].scale_type, y_type=axes['y'].scale_type)
+
+
+def style_table(traces: Iterable[Hashable], options: Mapping) -> Dict[str, list]:
+    """Return the style of every trace as one table, sent next to the data.
+
+    Each style is a list aligned with `traces`, cycling through its option list.
+    Trace names are strings, like the keys of the data once sent as JSON.
+    """
+    traces = [str(trace) for trace in traces]
+    table = {"traces": traces}
+    for style, option in STYLE_OPTIONS.items():
+        table[style] = list(islice(cycle(options[option]), len(traces)))
+    return table
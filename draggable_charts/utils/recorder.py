@@ -0,0 +1,135 @@
+import os
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from . import component_func
+
+
+class RecordedCall(NamedTuple):
+    """One call to the component: what Python sent and what the component returned."""
+    id: str
+    key: Optional[str]
+    kw: dict
+    tables: dict
+    value: Any
+
+
+class ComponentRecorder:
+    """In-process stand-in for the declared component, for headless replays.
+
+    Every call is recorded with the exact `kw` payload and returns the next
+    scripted value of its widget key. Like a real component, a widget keeps
+    returning its last value until a new one is scripted. A scripted value can be
+    a callable, called with the `RecordedCall` without value, e.g. to return
+    patches for the revision just sent; see `drag`.
+
+    With `component`, values come from it instead, e.g. the real component in a
+    browser session, so its values can be saved and replayed later with `values`.
+    """
+
+    def __init__(self, script: Dict[str, Iterable] = None, component: Callable = None, record: bool = True):
+        self.component = component
+        self.record = record
+        self.calls: List[RecordedCall] = []
+        self._script: Dict[str, deque] = {}
+        self._last: Dict[str, Any] = {}
+        for key, values in (script or {}).items():
+            self.script(key, *values)
+
+    def script(self, key: str, *values) -> 'ComponentRecorder':
+        """Queue values returned by the widget with `key`, one per call."""
+        self._script.setdefault(key, deque()).extend(values)
+        return self
+
+    def __call__(self, id, kw, default=None, key=None, on_change=None, **tables):
+        if self.component is not None:
+            value = self.component(id=id, kw=kw, default=default, key=key, on_change=on_change, **tables)
+        else:
+            value = self._next_value(RecordedCall(id, key, kw, tables, None), default)
+        if self.record:
+            self.calls.append(RecordedCall(id, key, kw, tables, value))
+        return value
+
+    def _next_value(self, call: RecordedCall, default):
+        queue = self._script.get(call.key)
+        if queue:
+            value = queue.popleft()
+            self._last[call.key] = value(call) if callable(value) else value
+        return self._last.get(call.key, default)
+
+    def values(self, key: str) -> list:
+        """Return the values returned to the widget with `key`, in order."""
+        return [call.value for call in self.calls if call.key == key]
+
+    def clear(self) -> None:
+        self.calls.clear()
+        self._script.clear()
+        self._last.clear()
+
+
+def drag(*patches, **value) -> Callable[[RecordedCall], dict]:
+    """Scripted component value of a drag, sent back for the revision of the call.
+
+    Patches have the format of the chart, e.g. `[column, row, value]` for
+    `line_chart`, with positions, or `[trace, index, x, y]` for the others. Other keys of the
+    value, like the `history` of the undo/redo actions, are passed as keyword arguments.
+    """
+    def value_for(call: RecordedCall) -> dict:
+        return {**value, "revision": call.kw["revision"], "patches": [list(patch) for patch in patches]}
+    return value_for
+
+
+@contextmanager
+def recording(recorder: ComponentRecorder = None):
+    """Replace the component with `recorder`, by default a new `ComponentRecorder`, while the block runs."""
+    recorder = recorder if recorder is not None else ComponentRecorder()
+    previous = component_func._component_func
+    component_func._component_func = recorder
+    try:
+        yield recorder
+    finally:
+        component_func._component_func = previous
+
+
+class Replay(NamedTuple):
+    """Result of `replay`: the app, to inspect its elements and session state,
+    the recorder and the seconds and peak memory of every run."""
+    app: Any
+    recorder: ComponentRecorder
+    seconds: List[float]
+    peak_bytes: List[int]
+
+
+def replay(script_path: str, reruns: int = 1, recorder: ComponentRecorder = None,
+           trace_memory: bool = False, timeout: float = 30) -> Replay:
+    """Run a Streamlit script headlessly `reruns` times with a recorder as the component.
+
+    The script runs in one session with `streamlit.testing.v1.AppTest`, without a
+    server or a browser. Each rerun consumes the next scripted value of every
+    widget key. With `trace_memory`, the peak memory of each run is traced,
+    which slows the runs down. `on_change` callbacks are not called.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    # AppTest resolves relative paths from the caller's module, not the working directory.
+    app = AppTest.from_file(os.path.abspath(script_path), default_timeout=timeout)
+    seconds, peaks = [], []
+    with recording(recorder) as recorder:
+        for _ in range(reruns):
+            if trace_memory:
+                tracemalloc.start()
+            start = time.perf_counter()
+            try:
+                app.run()
+                seconds.append(time.perf_counter() - start)
+                if trace_memory:
+                    peaks.append(tracemalloc.get_traced_memory()[1])
+            finally:
+                if trace_memory:
+                    tracemalloc.stop()
+            if app.exception:
+                raise RuntimeError(f"The script raised an exception: {app.exception[0].message}")
+    return Replay(app, recorder, seconds, peaks)
@@ -0,0 +1,52 @@
+from typing import Any, Callable, Dict, Literal, Mapping, NamedTuple
+
+from .options import DEFAULT_OPTIONS
+
+DataKind = Literal['frame', 'traces', 'charts']
+
+
+class ChartSpec(NamedTuple):
+    """Static description of a chart type.
+
+    id : The name of the chart component in the frontend `componentsMap`.
+    data_kind : 'frame' for pandas input, 'traces' for `{trace: {"x": [...], "y": [...]}}`,
+        'charts' for a grid of other charts.
+    validator : Called with `(data, options, revision)`, raises `ValueError` on invalid input.
+        Chart validators return the `AxisInfo` of the data, see `infer_axes`, so it's scanned once.
+        `revision` is the data fingerprint, used to skip revalidation when `options['revalidate']` is False.
+    default_options : Options used for keys the user doesn't set.
+    """
+    id: str
+    data_kind: DataKind
+    validator: Callable[[Any, dict, str], Any]
+    default_options: Mapping[str, Any] = DEFAULT_OPTIONS
+
+
+class PreparedChart(NamedTuple):
+    """What a widget computes before calling the component: the compiled options,
+    the fingerprint of the data and the cached payload."""
+    options: Mapping[str, Any]
+    revision: str
+    payload: dict
+
+
+_CHARTS: Dict[str, ChartSpec] = {}
+
+
+def register_chart(spec: ChartSpec) -> ChartSpec:
+    # Registering the same id again replaces the spec, so modules can be reloaded.
+    _CHARTS[spec.id] = spec
+    return spec
+
+
+def get_chart(id: str) -> ChartSpec:
+    if id not in _CHARTS:
+        # Widget modules register their chart when they are first imported.
+        from .. import widgets
+        for name in widgets.__all__:
+            getattr(widgets, name)
+    try:
+        return _CHARTS[id]
+    except KeyError:
+        raise ValueError(
+            f"Unknown chart id '{id}'. Registered charts: {sorted(_CHARTS)}.") from None
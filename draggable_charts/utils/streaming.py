@@ -0,0 +1,120 @@
+from typing import Any, Hashable, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+from streamlit import session_state as _state
+
+from .edits import chart_value
+from .fingerprint import fingerprint
+
+
+class StreamState:
+    """Rows of a streamed chart shown by the frontend, kept across reruns.
+
+    Positions count the rows since the start of the stream, so they don't change
+    when rows are dropped from the head of the data or of the window.
+
+    base : Revision of the data the stream started from. Patches of the frontend refer to it.
+    signature : Columns, dtypes and options of the stream. Any change restarts it.
+    hashes : Hashes of the rows shown by the frontend, at most `window` rows.
+    end : Position after the last row sent.
+    resync : Last resync request of the frontend that restarted the stream.
+    meta : Parts of the payload computed when the stream starts, reused for appends.
+    """
+    __slots__ = ("base", "signature", "hashes", "end", "resync", "meta")
+
+    def __init__(self, base: str, signature: tuple, hashes: np.ndarray, end: int, resync: Any):
+        self.base = base
+        self.signature = signature
+        self.hashes = hashes
+        self.end = end
+        self.resync = resync
+        self.meta = {}
+
+
+class StreamUpdate(NamedTuple):
+    """Rows to send in one rerun: `data.iloc[first:]`, the first one at position `start`.
+
+    revision : Fingerprint of the whole data.
+    reset : Whether the stream restarts, with new `base` and positions.
+    offset : Position of the first row of the data.
+    """
+    base: str
+    revision: str
+    reset: bool
+    first: int
+    start: int
+    offset: int
+    state: StreamState
+
+
+def row_hashes(frame: pd.DataFrame) -> np.ndarray:
+    return pd.util.hash_pandas_object(frame, index=True).to_numpy()
+
+
+def stream_signature(frame: pd.DataFrame, options: Hashable) -> tuple:
+    return (tuple(frame.columns), tuple(map(str, frame.dtypes)), str(frame.index.dtype), options)
+
+
+def stream_update(key: Hashable, hashes: np.ndarray, signature: tuple, window: Optional[int]) -> StreamUpdate:
+    """Return the rows of the data that the frontend of the chart with `key` doesn't have.
+
+    The data continues the stream if it ends with the rows shown by the frontend
+    followed by new ones. Otherwise, or when the frontend asks for it, the stream
+    restarts with the last `window` rows.
+    """
+    if "_draggable_charts_streams" not in _state:
+        _state._draggable_charts_streams = {}
+    store = _state._draggable_charts_streams
+
+    rows = len(hashes)
+    shown = max(0, rows - window) if window else 0
+    revision = fingerprint(repr(signature), hashes)
+    resync = resync_request(key)
+    state = store.get(key)
+    if state is not None and state.signature == signature and resync in (None, state.resync):
+        first = _continuation(hashes, state.hashes, window)
+        if first is not None:
+            offset = state.end - first
+            # More new rows than the window replace all the rows of the frontend.
+            first = max(first, shown)
+            state.hashes = hashes[shown:].copy()
+            state.end = offset + rows
+            return StreamUpdate(state.base, revision, False, first, offset + first, offset, state)
+
+    state = StreamState(revision, signature, hashes[shown:].copy(), rows, resync)
+    store[key] = state
+    return StreamUpdate(revision, revision, True, shown, shown, 0, state)
+
+
+def _continuation(hashes: np.ndarray, shown: np.ndarray, window: Optional[int]) -> Optional[int]:
+    """Return the row after the `shown` rows in `hashes`, or None if they aren't there."""
+    count = len(shown)
+    if len(hashes) < count:
+        return None
+    if np.array_equal(hashes[:count], shown):
+        return count
+    if not window or count < window or count == 0:
+        # The frontend shows every row, so they must all still be there.
+        return None
+    # A full window can start anywhere, e.g. if the head of the data was dropped.
+    for start in np.flatnonzero(hashes[:len(hashes) - count + 1] == shown[0])[::-1]:
+        if np.array_equal(hashes[start:start + count], shown):
+            return int(start) + count
+    # Data trimmed to the window can start inside it. The chart drops the rows
+    # before, as it gets at least as many new rows.
+    if len(hashes) >= window:
+        for skip in np.flatnonzero(shown == hashes[0]):
+            if np.array_equal(hashes[:count - skip], shown[skip:]):
+                return count - int(skip)
+    return None
+
+
+def resync_request(key: Hashable) -> Any:
+    """Return the resync request in the current value of the chart, if any.
+
+    The frontend asks for the whole window when it gets rows that don't follow
+    the ones it has, e.g. after being mounted again in the middle of a stream.
+    """
+    value = chart_value(key)
+    return value.get("resync") if isinstance(value, dict) else None
@@ -0,0 +1,46 @@
+"""Columns of wide frames sent to the chart, for the `visible_traces` option.
+
+Only the visible columns are sent and drawn. The chart lists every column in
+a searchable legend, and asks for the ones the user turns on in its value,
+as `{"visible": [trace names]}`.
+"""
+from typing import Hashable, List, Mapping, Optional, Sequence
+
+from .edits import chart_value
+
+
+def visible_request(key: Hashable) -> Optional[list]:
+    """Return the trace names the chart asked for in its current value, if any."""
+    value = chart_value(key)
+    visible = value.get("visible") if isinstance(value, dict) else None
+    return visible if isinstance(visible, list) else None
+
+
+def visible_positions(names: Sequence[str], options: Mapping, key: Hashable) -> Optional[List[int]]:
+    """Return the sorted positions of the columns to send, or None to send all of them.
+
+    `names` are the trace names of every column. The traces requested by the
+    chart take precedence over the `visible_traces` option, which only sets
+    the ones shown first.
+    """
+    option = options["visible_traces"]
+    if option is None:
+        return None
+    if key is None:
+        raise ValueError("Option 'visible_traces' requires a key.")
+    positions = {name: i for i, name in enumerate(names)}
+    requested = visible_request(key)
+    if requested is not None:
+        # Traces that are gone, e.g. after the columns changed, are skipped.
+        return sorted({positions[name] for name in requested if name in positions})
+    if isinstance(option, int) and not isinstance(option, bool):
+        if option < 0:
+            raise ValueError(f"Option 'visible_traces' must be a number of columns or a list of names. Got: {option}.")
+        return list(range(min(option, len(names))))
+    if not isinstance(option, tuple):
+        raise ValueError(
+            f"Option 'visible_traces' must be a number of columns or a list of names. Got: {type(option).__name__}.")
+    unknown = [name for name in option if str(name) not in positions]
+    if unknown:
+        raise ValueError(f"Unknown traces {unknown} in option 'visible_traces'. Expected column names of the data.")
+    return sorted({positions[str(name)] for name in option})
@@ -1,4 +1,25 @@
-from .linechart import line_chart
-from .scatterchart import scatter_chart
-from .bezierchart import bezier_chart
-from .cubicbezierchart import cubic_bezier_chart
\ No newline at end of file
+import importlib
+
+# Each widget module is imported on first use, see the package `__init__`.
+_EXPORTS = {
+    "line_chart": ".linechart",
+    "scatter_chart": ".scatterchart",
+    "bezier_chart": ".bezierchart",
+    "cubic_bezier_chart": ".cubicbezierchart",
+    "chart_grid": ".chartgrid",
+    "GridChart": ".chartgrid",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
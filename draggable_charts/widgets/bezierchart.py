@@ -1,10 +1,21 @@
-from typing import Any, Callable
+from typing import Any, Callable, Hashable
 
-from bezier_interpolation import quadratic_interpolation
+from ..utils import ChartSpec, component, register, register_chart
+from ..utils.bezier import quadratic_control_points, curve_traces
+from ..utils.cache import cached_payload
+from ..utils.data_validation import trace_lists, validate_bezier_data
+from ..utils.edits import copy_traces, edit_traces, get_patches, trace_patches
+from ..utils.fingerprint import fingerprint
+from ..utils.history import history_kw, record_history
+from ..utils.instrumentation import NULL_CALL, start_call
+from ..utils.options import ChartOptions, compile_options, style_table, with_axes
+from ..utils.registry import PreparedChart
 
-from ..utils import component, get_func_name, register
-from ..utils.data_validation import validate_bezier_data
-from ..utils.options import set_options
+BEZIER_CHART = register_chart(ChartSpec(
+    id="bezier_chart",
+    data_kind="traces",
+    validator=validate_bezier_data,
+))
 
 
 def bezier_chart(
@@ -16,20 +27,74 @@ def bezier_chart(
     kwargs: dict[str, Any] = None,
     key: str = None
 ) -> dict:
-    register(key, on_change, args, kwargs)
-    validate_bezier_data(data, options)
+    call = start_call(BEZIER_CHART, key)
+    handler = register(key, on_change, args, kwargs)
+    prepared = prepare(data, options, t, call=call)
+    kw = history_kw(prepared.payload["kw"], key, prepared.options)
+    new_data = component(BEZIER_CHART, kw=kw, key=key, on_change=handler)
+    call.mark("component")
+    record_history(key, new_data, kw["revision"], prepared.options)
+    new_data = finish(data, new_data, prepared, key)
+    call.mark("postprocess")
+    call.finish(prepared.revision, prepared.payload["kw"])
+    return new_data
+
+
+def prepare(data: dict, options: dict, t: float = 0.5, call=NULL_CALL) -> PreparedChart:
+    options = compile_options(options, BEZIER_CHART)
+    call.mark("options")
+    revision = fingerprint(data, t)
+    call.mark("fingerprint")
+    payload = cached_payload(
+        BEZIER_CHART, revision, options, lambda: build_payload(data, options, t, revision, call))
+    call.mark("cache")
+    return PreparedChart(options, revision, payload)
+
+
+def finish(data: dict, new_data, prepared: PreparedChart, key: Hashable = None) -> dict:
+    options, revision, payload = prepared
+    store_key = key if key is not None else (BEZIER_CHART.id, revision)
+    # Patches update the edited control points, and the curve is sampled from them
+    # unless only the control points are requested.
+    patches = trace_patches(payload["kw"]["data"], get_patches(new_data, revision))
+    edited_data = edit_traces(payload["kw"]["data"], patches, revision, store_key, options, 2)
+    if edited_data is None:
+        return copy_traces(payload["default"])
+    control_data = {k: v for k, v in edited_data.items() if k not in options["fixed_lines"]}
+    if options["return_points"] == "control":
+        return control_data
+    return curve_traces(control_data, 2, options["curve_steps"], options["curve_tolerance"])
+
+
+def build_payload(data: dict, options: ChartOptions, t: float, revision: str, call=NULL_CALL) -> dict:
+    axes = BEZIER_CHART.validator(data, options, revision)
+    call.mark("validate")
+    options = with_axes(options, data, axes)
+    call.mark("options")
+    data = trace_lists(data)
+    call.mark("transform")
     data = add_control_points(data, options, t)
-    data, options = set_options(data, options)
+    call.mark("control_points")
     default_data = {k: v for k, v in data.items() if k not in options["fixed_lines"]}
-    return component(id=get_func_name(), kw=locals(), default=default_data, key=key)
+    if options["return_points"] == "curve":
+        default_data = curve_traces(default_data, 2, options["curve_steps"], options["curve_tolerance"])
+        call.mark("curve")
+    styles = style_table(data, options)
+    call.mark("options")
+    return {
+        "kw": {
+            "data": data,
+            "styles": styles,
+            "options": options.to_dict(),
+            "revision": revision,
+        },
+        "default": default_data,
+    }
 
 
-def add_control_points(data: dict, options: dict, t: float) -> dict:
-    for trace_name, trace_data in data.items():
-        if trace_name in options["fixed_lines"]:
-            continue
-        
-        points = list(zip(trace_data['x'], trace_data['y']))
-        new_points = quadratic_interpolation(points, t)
-        trace_data['x'], trace_data['y'] = zip(*new_points)
+def add_control_points(data: dict, options: ChartOptions, t: float) -> dict:
+    names = [name for name in data if name not in options["fixed_lines"]]
+    points = [(data[name]['x'], data[name]['y']) for name in names]
+    for name, (x, y) in zip(names, quadratic_control_points(points, t)):
+        data[name]['x'], data[name]['y'] = x.tolist(), y.tolist()
     return data
@@ -0,0 +1,149 @@
+import importlib
+from typing import Any, Callable, Dict, Hashable, Mapping, NamedTuple, Union
+
+from streamlit import session_state as _state
+
+from ..utils import ChartSpec, component, register, register_chart
+from ..utils.callback import _dispatch
+from ..utils.fingerprint import fingerprint
+from ..utils.history import history_kw, record_history
+from ..utils.instrumentation import start_call
+
+# Modules of the charts that can be shown in a grid, by chart id.
+_GRID_CHARTS = {
+    "line_chart": ".linechart",
+    "scatter_chart": ".scatterchart",
+    "bezier_chart": ".bezierchart",
+    "cubic_bezier_chart": ".cubicbezierchart",
+}
+
+
+class GridChart(NamedTuple):
+    """One chart of a `chart_grid`, with the arguments of its widget.
+
+    chart : The chart id, e.g. "scatter_chart".
+    data, options, on_change, args, kwargs : Like in the widget of the chart.
+    t : Parameter of `bezier_chart`.
+    """
+    chart: str
+    data: Any
+    options: dict = None
+    on_change: Callable = None
+    args: tuple = None
+    kwargs: dict = None
+    t: float = 0.5
+
+
+def validate_grid(charts: Mapping, options: dict = None, revision: str = None) -> None:
+    """Check the charts of a grid, as `GridChart` or dictionaries, and its `columns` option."""
+    if not isinstance(charts, Mapping) or not charts:
+        raise ValueError(f"Charts must be a non-empty dictionary. Got: {type(charts).__name__}.")
+    columns = (options or {}).get("columns", 2)
+    if isinstance(columns, bool) or not isinstance(columns, int) or columns < 1:
+        raise ValueError(f"Columns must be a positive integer. Got: {columns!r}.")
+    for name, cell in charts.items():
+        if isinstance(cell, Mapping) and not isinstance(cell, GridChart):
+            unknown = [field for field in cell if field not in GridChart._fields]
+            if unknown or "chart" not in cell or "data" not in cell:
+                raise ValueError(
+                    f"Chart {name!r} must have the fields 'chart' and 'data', and some of {list(GridChart._fields)}. "
+                    f"Got: {list(cell)}.")
+            chart = cell["chart"]
+        elif isinstance(cell, GridChart):
+            chart = cell.chart
+        else:
+            raise ValueError(
+                f"Chart {name!r} must be a GridChart or a dictionary of its fields. Got: {type(cell).__name__}.")
+        if chart not in _GRID_CHARTS:
+            raise ValueError(f"Unknown chart '{chart}' for {name!r}. Expected one of: {sorted(_GRID_CHARTS)}.")
+
+
+CHART_GRID = register_chart(ChartSpec(
+    id="chart_grid",
+    data_kind="charts",
+    validator=validate_grid,
+))
+
+
+def chart_grid(
+    charts: Dict[Hashable, Union[GridChart, dict]],
+    columns: int = 2,
+    key: str = None
+) -> Dict[Hashable, Any]:
+    """
+    Displays several draggable charts in a grid, inside a single component.
+
+    Parameters
+    ----------
+    charts : dict[Hashable, GridChart | dict]
+        The charts to display by name, in order. Each one is a `GridChart`, or a dictionary with its fields.
+    columns : int, optional
+        The number of charts per row.
+    key : str, optional
+        An optional string to use as the unique key for the grid. It's required if any chart has `on_change`.
+
+    Returns
+    -------
+    dict
+        The data of every chart after user interaction by name, in the format returned by its widget.
+        Use `changed_cells((key, name))` to get the cells edited by the user in one chart.
+    """
+    call = start_call(CHART_GRID, key)
+    CHART_GRID.validator(charts, {"columns": columns})
+    charts = {name: cell if isinstance(cell, GridChart) else GridChart(**cell) for name, cell in charts.items()}
+    # The callback of each chart is registered with its key, and called by the grid's handler.
+    callbacks = {str(name): _cell_key(key, name) for name, cell in charts.items() if cell.on_change is not None}
+    handler = register(key, _route_callbacks if callbacks else None, (key, callbacks), None)
+
+    modules, prepared, cells, tables = {}, {}, [], {}
+    for index, (name, cell) in enumerate(charts.items()):
+        modules[name] = importlib.import_module(_GRID_CHARTS[cell.chart], __package__)
+        if key is not None:
+            # The edits, history and stream of each chart are kept while it's in the grid.
+            register(_cell_key(key, name), cell.on_change, cell.args, cell.kwargs)
+        params = {}
+        if cell.chart == "bezier_chart":
+            params["t"] = cell.t
+        elif cell.chart == "line_chart":
+            # Streamed line charts keep their state by key.
+            params["key"] = _cell_key(key, name)
+        prepared[name] = modules[name].prepare(cell.data, cell.options, call=call, **params)
+        # Arrow tables of line charts are sent next to the payload, one per chart.
+        table = None
+        if prepared[name].payload.get("tables"):
+            table = f"table_{index}"
+            tables[table] = prepared[name].payload["tables"]["table"]
+        cell_kw = history_kw(prepared[name].payload["kw"], _cell_key(key, name), prepared[name].options)
+        cells.append({"name": str(name), "id": cell.chart, "kw": cell_kw, "table": table})
+    kw = {"charts": cells, "columns": columns}
+
+    values = component(CHART_GRID, kw=kw, key=key, on_change=handler, **tables) or {}
+    call.mark("component")
+    for name, sent in zip(charts, cells):
+        record_history(_cell_key(key, name), values.get(str(name)), sent["kw"]["revision"], prepared[name].options)
+    results = {
+        name: modules[name].finish(cell.data, values.get(str(name)), prepared[name], _cell_key(key, name))
+        for name, cell in charts.items()
+    }
+    call.mark("postprocess")
+    call.finish(fingerprint(*(p.revision for p in prepared.values())), kw, tables)
+    return results
+
+
+def _cell_key(key: str, name: Hashable) -> Union[tuple, None]:
+    return (key, name) if key is not None else None
+
+
+def _route_callbacks(key: str, callbacks: Dict[str, tuple]) -> None:
+    """Call the `on_change` of the charts of a grid whose value changed.
+
+    `callbacks` has the keys of the charts with `on_change` by name.
+    """
+    values = _state.get(key) or {}
+    if "_draggable_charts_grid_values" not in _state:
+        _state._draggable_charts_grid_values = {}
+    previous = _state._draggable_charts_grid_values.get(key, {})
+    _state._draggable_charts_grid_values[key] = dict(values)
+    for name, cell_key in callbacks.items():
+        if values.get(name) != previous.get(name):
+            _dispatch(cell_key)
@@ -1,11 +1,27 @@
-from typing import Any, Callable, Dict, Union
+from typing import Any, Callable, Dict, Hashable, Sequence, Union
 
 import numpy as np
 import pandas as pd
 
-from ..utils import component, get_func_name, register
+from ..utils import ChartSpec, component, register, register_chart
+from ..utils.cache import cached_payload
+from ..utils.constraints import frame_corrections
 from ..utils.data_validation import validate_line_data
-from ..utils.options import set_options
+from ..utils.downsampling import downsample_frame, downsampling_key, expand_frame_patches
+from ..utils.edits import apply_frame_patches, get_edit_state, get_patches
+from ..utils.fingerprint import fingerprint
+from ..utils.history import history_kw, record_history
+from ..utils.instrumentation import NULL_CALL, start_call
+from ..utils.options import ChartOptions, compile_options, style_table, with_axes
+from ..utils.registry import PreparedChart
+from ..utils.streaming import StreamUpdate, row_hashes, stream_signature, stream_update
+from ..utils.visibility import visible_positions
+
+LINE_CHART = register_chart(ChartSpec(
+    id="line_chart",
+    data_kind="frame",
+    validator=validate_line_data,
+))
 
 
 def line_chart(
@@ -38,46 +54,210 @@ def line_chart(
     Returns
     -------
     pd.DataFrame
-        The data of the chart after user interaction. The format is the same as the input format.
+        The data of the chart after user interaction. The format is the same as the input format, with the same index,
+        columns and dtypes. Use `changed_cells(key)` to get the cells edited by the user.
 
     Raises
     ------
     ValueError
         If the data is not a pandas Series, DataFrame, or a dictionary, or if the DataFrame does not have only numeric columns.
     """
-    register(key, on_change, args, kwargs)
-    validate_line_data(data)
-    dict_data = transform_data(data)
-    dict_data, options = set_options(dict_data, options)
-    new_data = component(
-        id=get_func_name(),
-        kw={"data": dict_data, "options": options},
-        default=data,
-        key=key
-    )
-    new_df = postprocess_data(data, new_data)
+    call = start_call(LINE_CHART, key)
+    handler = register(key, on_change, args, kwargs)
+    prepared = prepare(data, options, call, key)
+    payload = prepared.payload
+    kw = history_kw(payload["kw"], key, prepared.options)
+    new_data = component(LINE_CHART, kw=kw, key=key, on_change=handler, **payload["tables"])
+    call.mark("component")
+    record_history(key, new_data, kw["revision"], prepared.options)
+    new_df = finish(data, new_data, prepared, key)
+    call.mark("postprocess")
+    call.finish(prepared.revision, payload["kw"], payload["tables"])
     return new_df
 
 
-def transform_data(data) -> dict:
+def prepare(data, options: Dict[str, Any], call=NULL_CALL, key: Hashable = None) -> PreparedChart:
+    options = compile_options(options, LINE_CHART)
+    call.mark("options")
+    if options["stream"]:
+        return prepare_stream(data, options, key, call)
+    revision = fingerprint(data, downsampling_key(options))
+    call.mark("fingerprint")
+    visible = None
+    if options["visible_traces"] is not None and isinstance(data, (pd.Series, pd.DataFrame)):
+        # Invalid data is reported by the validator when the payload is built.
+        visible = visible_positions([str(name) for name in transform_frame(data).columns], options, key)
+    payload = cached_payload(
+        LINE_CHART, revision, options, lambda: build_payload(data, options, revision, call, visible),
+        None if visible is None else tuple(visible))
+    call.mark("cache")
+    return PreparedChart(options, revision, payload)
+
+
+def finish(data, new_data, prepared: PreparedChart, key: Hashable = None) -> Union[pd.DataFrame, pd.Series]:
+    if prepared.payload.get("stream") is not None:
+        return postprocess_stream(data, new_data, prepared.payload["stream"], key, prepared.options)
+    return postprocess_data(data, new_data, prepared.revision, key, prepared.payload)
+
+
+def build_payload(data, options: ChartOptions, revision: str, call=NULL_CALL, visible: list = None) -> dict:
+    """Payload with every column, or only the columns at the `visible` positions.
+    Columns keep their position in the data, so patches always refer to it."""
+    axes = LINE_CHART.validator(data, options, revision)
+    call.mark("validate")
+    options = with_axes(options, data, axes)
+    call.mark("options")
+    rows = None
+    if options["max_points"]:
+        # Rows are sampled from every column, so they don't change with `visible`.
+        rows = cached_payload(
+            LINE_CHART, revision, None,
+            lambda: downsample_frame(transform_frame(data), options["max_points"], options["downsample"]), "rows")
+        data = data.iloc[rows]
+        call.mark("downsample")
+    frame = transform_frame(data)
+    names = [str(name) for name in frame.columns]
+    positions = range(len(names))
+    if visible is not None:
+        frame, positions = frame.iloc[:, visible], visible
+    tables = {}
+    if options["transport"] == "arrow":
+        dict_data = {str(name): {"column": position, "field": i}
+                     for i, (name, position) in enumerate(zip(frame.columns, positions))}
+        # A copy, so the cached payload doesn't keep the caller's frame alive or
+        # change with it.
+        tables["table"] = frame.copy()
+    else:
+        dict_data = transform_data(frame if visible is not None else data, positions)
+    call.mark("transform")
+    # Styles cycle through every column, so colors don't change with `visible`.
+    styles = style_table(names, options)
+    call.mark("options")
+    kw = {
+        "data": dict_data,
+        "styles": styles,
+        "options": options.to_dict(),
+        "revision": revision,
+    }
+    if visible is not None:
+        kw["wide"] = {"traces": names, "visible": [names[i] for i in visible]}
+    return {
+        "kw": kw,
+        "tables": tables,
+        "rows": rows,
+        "options": options,
+    }
+
+
+def prepare_stream(data, options: ChartOptions, key: Hashable, call=NULL_CALL) -> PreparedChart:
+    """Payload with the rows appended since the previous rerun, or with the last
+    `stream_window` rows when the stream restarts. It's never cached."""
+    if key is None:
+        raise ValueError("Option 'stream' requires a key.")
+    if options["max_points"]:
+        raise ValueError("Option 'stream' can't be used with 'max_points'. Use 'stream_window' to bound the rows.")
+    if options["visible_traces"] is not None:
+        raise ValueError("Option 'stream' can't be used with 'visible_traces'.")
+    if not isinstance(data, (pd.Series, pd.DataFrame)):
+        LINE_CHART.validator(data, options)
+    frame = transform_frame(data)
+    window = options["stream_window"]
+    update = stream_update(key, row_hashes(frame), stream_signature(frame, options), window)
+    call.mark("fingerprint")
+    rows = data.iloc[update.first:]
+    LINE_CHART.validator(rows, options)
+    call.mark("validate")
+    meta = update.state.meta
+    if update.reset:
+        meta["options"] = with_axes(options, data)
+        meta["styles"] = style_table(frame.columns, options)
+        call.mark("options")
+    tables = {}
+    if options["transport"] == "arrow":
+        tables["table"] = transform_frame(rows)
+        dict_data = {str(name): {"column": i, "field": i} for i, name in enumerate(frame.columns)}
+    else:
+        dict_data = transform_data(rows)
+    call.mark("transform")
+    payload = {
+        "kw": {
+            "data": dict_data,
+            "styles": meta["styles"],
+            "options": meta["options"].to_dict(),
+            "revision": update.base,
+            "stream": {"start": update.start, "reset": update.reset, "window": window},
+        },
+        "tables": tables,
+        "rows": None,
+        "options": meta["options"],
+        "stream": update,
+    }
+    return PreparedChart(options, update.revision, payload)
+
+
+def transform_data(data, positions: Sequence[int] = None) -> dict:
     if isinstance(data, pd.Series):
-        if not data.name:
-            data.name = "data"
-        dict_data = {data.name: data.replace({np.nan: None}).to_dict()}
+        dict_data = {data.name or "data": data.replace({np.nan: None}).to_dict()}
     elif isinstance(data, pd.DataFrame):
         dict_data = data.replace({np.nan: None}).to_dict()
-    dict_data = {key: {"data": val} for key, val in dict_data.items()}
+    if positions is None:
+        positions = range(len(dict_data))
+    dict_data = {key: {"data": val, "column": position} for position, (key, val) in zip(positions, dict_data.items())}
     return dict_data
 
 
-def postprocess_data(data, new_data) -> pd.DataFrame:
-    if not isinstance(new_data, pd.Series) and "data" in new_data[list(new_data.keys())[0]]:
-        new_data = {key: val["data"] for key, val in new_data.items()}
-    if isinstance(data, pd.Series) and isinstance(new_data, pd.Series):
-        return pd.Series(new_data)
-    elif isinstance(data, pd.Series):
-        new_series = pd.Series(new_data[data.name])
-        new_series.name = data.name
-        return new_series
-    elif isinstance(data, pd.DataFrame):
-        return pd.DataFrame(new_data)
+def transform_frame(data) -> pd.DataFrame:
+    if isinstance(data, pd.Series):
+        return data.to_frame(name=data.name or "data")
+    return data
+
+
+def postprocess_data(
+    data,
+    new_data,
+    revision: str,
+    key: Hashable = None,
+    payload: dict = None
+) -> Union[pd.DataFrame, pd.Series]:
+    patches = get_patches(new_data, revision)
+    # Copies, so changes of the caller to the result don't reach its data or the edits.
+    if not patches:
+        return data.copy()
+    store_key = key if key is not None else (LINE_CHART.id, revision)
+    if payload is not None and payload["rows"] is not None:
+        # Positions in the downsampled frame are mapped back to the full data.
+        patches = expand_frame_patches(
+            data, patches, payload["rows"], payload["options"]["edit_neighbourhood"])
+    state = get_edit_state(store_key, revision, data.copy)
+    state.data, state.changed = apply_frame_patches(state.data, patches)
+    if payload is not None:
+        state.data = constrain_frame(state.data, patches, payload["options"])
+    return state.data.copy()
+
+
+def postprocess_stream(
+    data,
+    new_data,
+    update: StreamUpdate,
+    key: Hashable,
+    options: ChartOptions = None
+) -> Union[pd.DataFrame, pd.Series]:
+    patches = get_patches(new_data, update.base)
+    # Patches have stream positions. Rows dropped from the data are skipped.
+    patches = [[column, position - update.offset, value] for column, position, value in patches
+               if 0 <= position - update.offset < len(data)]
+    if not patches:
+        return data.copy()
+    state = get_edit_state(key, update.revision, data.copy)
+    state.data, state.changed = apply_frame_patches(state.data, patches)
+    if options is not None:
+        state.data = constrain_frame(state.data, patches, options)
+    return state.data.copy()
+
+
+def constrain_frame(data, patches: list, options: ChartOptions) -> Union[pd.DataFrame, pd.Series]:
+    """Make the edited cells follow the `constraints` option, like the frontend does."""
+    corrections = frame_corrections(data, patches, options)
+    if corrections:
+        data, _ = apply_frame_patches(data, corrections)
+    return data
@@ -1,8 +1,22 @@
-from typing import Any, Callable
+from typing import Any, Callable, Hashable
+
+from ..utils import ChartSpec, component, register, register_chart
+from ..utils.cache import cached_payload
+from ..utils.data_validation import trace_lists, validate_scatter_data
+from ..utils.downsampling import downsample_traces, downsampling_key, expand_trace_patches, select_traces
+from ..utils.edits import edit_traces, get_patches, trace_patches
+from ..utils.fingerprint import fingerprint
+from ..utils.history import history_kw, record_history
+from ..utils.instrumentation import NULL_CALL, start_call
+from ..utils.options import ChartOptions, compile_options, style_table, with_axes
+from ..utils.registry import PreparedChart
+
+SCATTER_CHART = register_chart(ChartSpec(
+    id="scatter_chart",
+    data_kind="traces",
+    validator=validate_scatter_data,
+))
 
-from ..utils import component, get_func_name, register
-from ..utils.options import set_options
-from ..utils.data_validation import validate_scatter_data
 
 def scatter_chart(
     data: dict,
@@ -12,7 +26,61 @@ def scatter_chart(
     kwargs: dict[str, Any] = None,
     key: str = None
 ) -> dict:
-    register(key, on_change, args, kwargs)
-    data, options = set_options(data, options)
-    validate_scatter_data(data, options)
-    return component(id=get_func_name(), kw=locals(), default=data, key=key)
+    call = start_call(SCATTER_CHART, key)
+    handler = register(key, on_change, args, kwargs)
+    prepared = prepare(data, options, call)
+    kw = history_kw(prepared.payload["kw"], key, prepared.options)
+    new_data = component(SCATTER_CHART, kw=kw, key=key, on_change=handler)
+    call.mark("component")
+    record_history(key, new_data, kw["revision"], prepared.options)
+    edited_data = finish(data, new_data, prepared, key)
+    call.mark("postprocess")
+    call.finish(prepared.revision, prepared.payload["kw"])
+    return edited_data
+
+
+def prepare(data: dict, options: dict, call=NULL_CALL) -> PreparedChart:
+    options = compile_options(options, SCATTER_CHART)
+    call.mark("options")
+    revision = fingerprint(data, downsampling_key(options))
+    call.mark("fingerprint")
+    payload = cached_payload(
+        SCATTER_CHART, revision, options, lambda: build_payload(data, options, revision, call))
+    call.mark("cache")
+    return PreparedChart(options, revision, payload)
+
+
+def finish(data: dict, new_data, prepared: PreparedChart, key: Hashable = None) -> dict:
+    options, revision, payload = prepared
+    store_key = key if key is not None else (SCATTER_CHART.id, revision)
+    patches = trace_patches(data, get_patches(new_data, revision))
+    if payload["rows"] is not None:
+        patches = expand_trace_patches(data, patches, payload["rows"], options["edit_neighbourhood"])
+    edited_data = edit_traces(data, patches, revision, store_key, options)
+    return data if edited_data is None else edited_data
+
+
+def build_payload(data: dict, options: ChartOptions, revision: str, call=NULL_CALL) -> dict:
+    axes = SCATTER_CHART.validator(data, options, revision)
+    call.mark("validate")
+    # Axes are inferred before NaN becomes None in the lists.
+    options = with_axes(options, data, axes)
+    call.mark("options")
+    data = trace_lists(data)
+    call.mark("transform")
+    rows = None
+    if options["max_points"]:
+        rows = downsample_traces(data, options["max_points"], options["downsample"])
+        data = select_traces(data, rows)
+        call.mark("downsample")
+    styles = style_table(data, options)
+    call.mark("options")
+    return {
+        "kw": {
+            "data": data,
+            "styles": styles,
+            "options": options.to_dict(),
+            "revision": revision,
+        },
+        "rows": rows,
+    }
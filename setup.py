@@ -17,14 +17,15 @@ setuptools.setup(
     packages=setuptools.find_packages(),
     include_package_data=True,
     classifiers=[],
-    python_requires=">=3.7",
+    python_requires=">=3.8",
     install_requires=[
-        "streamlit >= 0.63",
-        "bezier-interpolation >= 0.0.2",
+        # `on_change` of components.
+        "streamlit >= 1.36",
     ],
     extras_require={
         "devel": [
             "wheel",
+            "bezier-interpolation >= 0.0.2",
             "pytest==7.4.0",
             "playwright==1.39.0",
             "requests==2.31.0",
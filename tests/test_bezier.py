@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from draggable_charts.utils.bezier import cubic_control_points, quadratic_control_points, sample_curve
+
+bezier_interpolation = pytest.importorskip("bezier_interpolation")
+
+
+def make_traces(lengths, seed=0):
+    rng = np.random.default_rng(seed)
+    traces = []
+    for n in lengths:
+        x = np.cumsum(rng.uniform(0.1, 5, n))
+        traces.append((x, rng.normal(size=n)))
+    return traces
+
+
+def reference(interpolate, trace, *args):
+    points = interpolate(list(zip(*trace)), *args)
+    if not len(points):
+        return np.empty(0), np.empty(0)
+    x, y = zip(*points)
+    return np.array(x), np.array(y)
+
+
+@pytest.mark.parametrize("t", [0.5, 0.2, 0.8])
+def test_quadratic_matches_reference(t):
+    traces = make_traces([1, 2, 3, 4, 7, 50, 300])
+    for trace, (x, y) in zip(traces, quadratic_control_points(traces, t)):
+        expected_x, expected_y = reference(bezier_interpolation.quadratic_interpolation, trace, t)
+        np.testing.assert_allclose(x, expected_x)
+        np.testing.assert_allclose(y, expected_y, rtol=1e-7, atol=1e-9)
+
+
+def test_cubic_matches_reference():
+    traces = make_traces([1, 2, 3, 4, 7, 50, 300])
+    for trace, (x, y) in zip(traces, cubic_control_points(traces)):
+        expected_x, expected_y = reference(bezier_interpolation.cubic_interpolation, trace)
+        np.testing.assert_allclose(x, expected_x, rtol=1e-9, atol=1e-9)
+        np.testing.assert_allclose(y, expected_y, rtol=1e-9, atol=1e-9)
+
+
+def test_output_lengths_and_dtype():
+    traces = make_traces([1, 5])
+    quadratic = quadratic_control_points(traces, dtype=np.float32)
+    cubic = cubic_control_points(traces, dtype=np.float32)
+    assert [len(x) for x, _ in quadratic] == [1, 9]
+    assert [len(x) for x, _ in cubic] == [1, 13]
+    assert all(x.dtype == np.float32 and y.dtype == np.float32 for x, y in quadratic + cubic)
+
+
+def bezier_point(controls, t):
+    while len(controls) > 1:
+        controls = [(1 - t) * a + t * b for a, b in zip(controls[:-1], controls[1:])]
+    return controls[0]
+
+
+def distance_to_polyline(points, polyline):
+    start, end = polyline[:-1], polyline[1:]
+    chord = end - start
+    t = np.clip(np.einsum("mnd,nd->mn", points[:, None] - start, chord) / np.einsum("nd,nd->n", chord, chord), 0, 1)
+    nearest = start + t[..., None] * chord
+    return np.linalg.norm(points[:, None] - nearest, axis=-1).min(axis=1)
+
+
+@pytest.mark.parametrize("order, control_points", [(2, quadratic_control_points), (3, cubic_control_points)])
+def test_curve_steps_match_de_casteljau(order, control_points):
+    traces = control_points(make_traces([1, 2, 5]))
+    curves = sample_curve(traces, order, steps=4)
+    assert [len(x) for x, _ in curves] == [1, 5, 17]
+    x, y = curves[2]
+    controls = np.stack(traces[2], axis=1)
+    expected = [bezier_point(list(controls[i:i + order + 1]), t)
+                for i in range(0, len(controls) - 1, order) for t in np.arange(4) / 4] + [controls[-1]]
+    np.testing.assert_allclose(np.stack([x, y], axis=1), expected)
+
+
+@pytest.mark.parametrize("order, control_points", [(2, quadratic_control_points), (3, cubic_control_points)])
+def test_curve_tolerance_bounds_the_error(order, control_points):
+    traces = control_points(make_traces([40]))
+    x, y = sample_curve(traces, order, tolerance=1e-3)[0]
+    dense_x, dense_y = sample_curve(traces, order, steps=200)[0]
+    error = distance_to_polyline(np.stack([dense_x, dense_y], axis=1), np.stack([x, y], axis=1))
+    assert error.max() <= 1e-3
+    assert len(x) < len(dense_x)
+    # Straight segments are not split.
+    line = control_points([(np.arange(4.0), np.arange(4.0))])
+    assert len(sample_curve(line, order, tolerance=1e-3)[0][0]) == len(line[0][0]) // order + 1
+
+
+def test_no_traces():
+    assert quadratic_control_points([]) == []
+    assert cubic_control_points([]) == []
+    assert sample_curve([], 3) == []
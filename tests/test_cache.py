@@ -0,0 +1,75 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from draggable_charts import line_chart
+from draggable_charts.utils.cache import PayloadCache, estimate_size, payload_cache
+from draggable_charts.utils.recorder import recording
+
+
+def payload(size):
+    return np.zeros(size, dtype=np.uint8)
+
+
+def test_hits_and_misses():
+    cache = PayloadCache()
+    builds = []
+    for key in ["a", "b", "a", "a"]:
+        cache.get_or_build(key, lambda: builds.append(1) or payload(8))
+    assert len(builds) == 2
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (2, 2, 2)
+    assert stats["bytes"] == 2 * estimate_size(payload(8))
+
+
+def test_least_recently_used_entry_is_evicted():
+    size = estimate_size(payload(100))
+    cache = PayloadCache(max_bytes=2 * size)
+    cache.put("a", payload(100))
+    cache.put("b", payload(100))
+    cache.get_or_build("a", lambda: None)
+    cache.put("c", payload(100))
+    assert isinstance(cache.get_or_build("a", lambda: "rebuilt"), np.ndarray)
+    assert cache.get_or_build("b", lambda: "rebuilt") == "rebuilt"
+    assert cache.stats()["evictions"] >= 1
+    assert cache.stats()["bytes"] <= cache.max_bytes
+
+
+def test_payload_larger_than_the_cache_is_not_kept():
+    cache = PayloadCache(max_bytes=10)
+    cache.put("a", payload(1000))
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["bytes"] == 0
+
+
+def test_concurrent_access():
+    cache = PayloadCache(max_bytes=20 * estimate_size(payload(10)))
+    barrier = threading.Barrier(8)
+
+    def work(seed):
+        barrier.wait()
+        for i in range(200):
+            key = (seed * i) % 30
+            assert cache.get_or_build(key, lambda: payload(10)).size == 10
+
+    threads = [threading.Thread(target=work, args=(seed,)) for seed in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = cache.stats()
+    assert stats["hits"] + stats["misses"] == 8 * 200
+    assert stats["entries"] <= 20
+    assert stats["bytes"] == stats["entries"] * estimate_size(payload(10))
+
+
+def test_arrow_payload_does_not_keep_the_callers_frame():
+    payload_cache.clear()
+    data = pd.DataFrame({"a": [0.0, 1.0, 2.0]})
+    with recording() as recorder:
+        line_chart(data, {"transport": "arrow"})
+    table = recorder.calls[-1].tables["table"]
+    assert table is not data
+    data.iloc[0, 0] = 9.0
+    assert table["a"].tolist() == [0.0, 1.0, 2.0]
@@ -0,0 +1,221 @@
+import weakref
+
+import pytest
+
+from draggable_charts.utils.recorder import drag, recording
+
+pytest.importorskip("streamlit.testing.v1")
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+# Line charts whose data changes on every run, and a keyed chart named like a chart id.
+CHANGING_DATA = """
+import pandas as pd
+import streamlit as st
+from draggable_charts import line_chart
+
+st.session_state.runs = st.session_state.get("runs", 0) + 1
+line_chart(pd.DataFrame({"a": [0.0, 1.0, float(st.session_state.runs)]}))
+line_chart(pd.DataFrame({"a": [0.0, 1.0, 2.0]}), key="line_chart")
+"""
+
+
+def edit_store(app):
+    return app.session_state["_draggable_charts_edits"]
+
+
+def test_state_of_charts_without_key_is_evicted():
+    with recording() as recorder:
+        recorder.script(None, *[drag([0, 0, 5.0])] * 20)
+        recorder.script("line_chart", drag([0, 1, 7.0]))
+        app = AppTest.from_string(CHANGING_DATA)
+        for _ in range(20):
+            app.run()
+            assert not app.exception
+    store = edit_store(app)
+    # The keyed chart, and the chart without key in this run and the previous one.
+    assert len(store) <= 3
+    assert "line_chart" in store
+    assert store["line_chart"].data["a"].tolist() == [0.0, 7.0, 2.0]
+
+
+# Chart "two" is hidden with `hide`. With `fragment`, the run is marked as a
+# fragment run that only renders chart "one", as AppTest always reruns the
+# whole script. With `dispatch`, the callback of chart "one" is called.
+CHARTS = """
+import gc
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from draggable_charts import line_chart
+from draggable_charts.utils.callback import _dispatch
+
+class Saver:
+    def save(self):
+        st.session_state.saved = st.session_state.get("saved", 0) + 1
+
+if st.session_state.get("dispatch"):
+    gc.collect()
+    _dispatch("one")
+ctx = get_script_run_ctx()
+if st.session_state.get("fragment"):
+    ctx.fragment_ids_this_run = ["fragment"]
+try:
+    saver = st.session_state.setdefault("saver", Saver()) if st.session_state.get("keep") else Saver()
+    line_chart(pd.DataFrame({"a": [0.0, 1.0, 2.0]}), on_change=saver.save, key="one")
+    if not st.session_state.get("hide") and not st.session_state.get("fragment"):
+        line_chart(pd.DataFrame({"b": [0.0, 1.0, 2.0]}), key="two")
+        line_chart(pd.DataFrame({"c": [0.0, 1.0, 2.0]}))
+finally:
+    ctx.fragment_ids_this_run = None
+"""
+
+
+def charts_app(recorder):
+    recorder.script("one", drag([0, 0, 1.0]))
+    recorder.script("two", drag([0, 0, 2.0]))
+    recorder.script(None, *[drag([0, 0, 3.0])] * 10)
+    app = AppTest.from_string(CHARTS)
+    app.run()
+    return app
+
+
+def registry(app):
+    return app.session_state["_draggable_charts_callbacks"]
+
+
+def test_chart_state_is_evicted_after_it_stops_rendering():
+    with recording() as recorder:
+        app = charts_app(recorder)
+        assert {"one", "two"} <= set(edit_store(app))
+        app.session_state["hide"] = True
+        app.run()
+        # Charts not rendered in a run are evicted at the start of the next one.
+        app.run()
+    assert not app.exception
+    assert set(edit_store(app)) == {"one"}
+    assert set(registry(app).entries) == {"one"}
+
+
+def test_chart_state_is_kept_during_fragment_runs():
+    with recording() as recorder:
+        app = charts_app(recorder)
+        app.session_state["fragment"] = True
+        app.run()
+        app.run()
+    assert not app.exception
+    assert {"one", "two"} <= set(edit_store(app))
+    assert len(edit_store(app)) == 3
+
+
+def test_user_key_named_like_a_chart_id_keeps_other_states():
+    script = """
+import pandas as pd
+import streamlit as st
+from draggable_charts import line_chart
+
+line_chart(pd.DataFrame({"a": [0.0, 1.0, 2.0]}))
+if not st.session_state.get("hide"):
+    line_chart(pd.DataFrame({"b": [0.0, 1.0, 2.0]}), key="line_chart")
+"""
+    with recording() as recorder:
+        recorder.script(None, *[drag([0, 0, 3.0])] * 10)
+        recorder.script("line_chart", drag([0, 0, 2.0]))
+        app = AppTest.from_string(script)
+        app.run()
+        app.session_state["hide"] = True
+        app.run()
+        app.run()
+    assert not app.exception
+    [(name, _)] = edit_store(app)
+    assert name == "line_chart"
+
+
+def test_callbacks_of_bound_methods():
+    with recording() as recorder:
+        app = charts_app(recorder)
+        app.session_state["keep"] = True
+        app.run()
+        app.session_state["dispatch"] = True
+        app.run()
+        assert app.session_state["saved"] == 1
+        # The object of the callback is collected once it's not kept, and the callback is skipped.
+        app.session_state["keep"] = False
+        app.run()
+        app.run()
+    assert not app.exception
+    assert app.session_state["saved"] == 2
+    assert isinstance(registry(app).entries["one"].callback, weakref.WeakMethod)
+
+
+# With `value`, the grid value is set and its handler called, like Streamlit
+# does before a run after a drag in the grid.
+GRID = """
+import streamlit as st
+from draggable_charts import GridChart, chart_grid
+from draggable_charts.utils.callback import _dispatch
+
+def count(name):
+    st.session_state.calls = st.session_state.get("calls", []) + [name]
+
+if "value" in st.session_state:
+    st.session_state.grid = st.session_state.pop("value")
+    _dispatch("grid")
+chart_grid({
+    name: GridChart("scatter_chart", {"t": {"x": [0, 1], "y": [0.0, 1.0]}}, on_change=count, args=(name,))
+    for name in ("a", "b")
+}, key="grid")
+"""
+
+
+def test_grid_calls_on_change_of_the_changed_chart():
+    first = {"revision": "r", "patches": [["t", 0, 0, 5.0]]}
+    second = {"revision": "r", "patches": [["t", 1, 1, 2.0]]}
+    with recording():
+        app = AppTest.from_string(GRID)
+        app.run()
+        for value, calls in [
+            ({"a": first}, ["a"]),
+            ({"a": first}, ["a"]),
+            ({"a": first, "b": second}, ["a", "b"]),
+            ({"a": second, "b": second}, ["a", "b", "a"]),
+        ]:
+            app.session_state["value"] = value
+            app.run()
+            assert not app.exception
+            assert app.session_state["calls"] == calls
+
+
+def test_grid_holds_bound_methods_weakly():
+    script = """
+import gc
+import streamlit as st
+from draggable_charts import GridChart, chart_grid
+from draggable_charts.utils.callback import _dispatch
+
+class Saver:
+    def save(self):
+        st.session_state.saved = st.session_state.get("saved", 0) + 1
+
+if "value" in st.session_state:
+    st.session_state.grid = st.session_state.pop("value")
+    gc.collect()
+    _dispatch("grid")
+saver = st.session_state.setdefault("saver", Saver()) if st.session_state.get("keep") else Saver()
+chart_grid({"a": GridChart("scatter_chart", {"t": {"x": [0, 1], "y": [0.0, 1.0]}}, on_change=saver.save)}, key="grid")
+"""
+    with recording():
+        app = AppTest.from_string(script)
+        app.session_state["keep"] = True
+        app.run()
+        app.session_state["value"] = {"a": {"revision": "r", "patches": [["t", 0, 0, 5.0]]}}
+        app.run()
+        assert app.session_state["saved"] == 1
+        # The object of the callback is collected once it's not kept, and the callback is skipped.
+        app.session_state["keep"] = False
+        app.run()
+        app.run()
+        app.session_state["value"] = {"a": {"revision": "r", "patches": [["t", 0, 0, 6.0]]}}
+        app.run()
+    assert not app.exception
+    assert app.session_state["saved"] == 1
+    assert isinstance(registry(app).entries[("grid", "a")].callback, weakref.WeakMethod)
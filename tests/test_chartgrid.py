@@ -0,0 +1,29 @@
+import pytest
+
+from draggable_charts import GridChart, chart_grid
+from draggable_charts.utils.recorder import recording
+
+CELL = {"chart": "scatter_chart", "data": {"t": {"x": [0, 1], "y": [0.0, 1.0]}}}
+
+
+@pytest.mark.parametrize("charts, columns, match", [
+    ({}, 2, "non-empty dictionary"),
+    ({"a": [CELL]}, 2, "Chart 'a' must be a GridChart or a dictionary of its fields. Got: list"),
+    ({"a": {**CELL, "colour": "red"}}, 2, r"Chart 'a' must have the fields .* Got: \['chart', 'data', 'colour'\]"),
+    ({"a": {"chart": "scatter_chart"}}, 2, "Chart 'a' must have the fields"),
+    ({"a": {**CELL, "chart": "pie_chart"}}, 2, "Unknown chart 'pie_chart' for 'a'"),
+    ({"a": GridChart("pie_chart", None)}, 2, "Unknown chart 'pie_chart' for 'a'"),
+    ({"a": CELL}, 0, "Columns must be a positive integer. Got: 0"),
+    ({"a": CELL}, 1.5, "Columns must be a positive integer. Got: 1.5"),
+    ({"a": CELL}, True, "Columns must be a positive integer. Got: True"),
+])
+def test_invalid_grid(charts, columns, match):
+    with recording(), pytest.raises(ValueError, match=match):
+        chart_grid(charts, columns, key="grid")
+
+
+def test_grid_of_dictionaries_and_grid_charts():
+    with recording() as recorder:
+        result = chart_grid({"a": CELL, "b": GridChart(**CELL)}, columns=1, key="grid")
+    assert list(result) == ["a", "b"]
+    assert [cell["name"] for cell in recorder.calls[-1].kw["charts"]] == ["a", "b"]
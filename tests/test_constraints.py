@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from draggable_charts import bezier_chart, cubic_bezier_chart
+from draggable_charts.utils.constraints import constrain, constrain_traces, frame_corrections, validate_constraints
+from draggable_charts.utils.recorder import drag, recording
+
+
+@pytest.mark.parametrize("value, previous, following, rule, expected", [
+    (5.0, None, None, {"min": 0, "max": 4}, 4),
+    (-1.0, None, None, {"min": 0, "max": 4}, 0),
+    (1.6, 1.2, 1.8, {"step": 1, "monotone": "increasing"}, 1.8),
+    (3.7, 1.0, 2.2, {"step": 1, "monotone": "increasing"}, 2),
+    (0.2, 1.2, None, {"step": 1, "monotone": "increasing"}, 2),
+    (3.0, 2.0, 1.0, {"monotone": "decreasing"}, 2),
+    (1.3, None, None, {"min": 0.5, "step": 0.5}, 1.5),
+])
+def test_constrain(value, previous, following, rule, expected):
+    assert constrain(value, previous, following, rule) == pytest.approx(expected)
+
+
+def test_frame_corrections_follow_previous_rows():
+    data = pd.DataFrame({"a": [0.0, 5.0, 1.0, 3.0], "b": [9.0, 9.0, 9.0, 9.0]})
+    options = {"constraints": {"a": {"monotone": "increasing", "max": 4}}}
+    patches = [[0, 1, 5.0], [0, 2, 1.0], [1, 0, 9.0]]
+    assert frame_corrections(data, patches, options) == [[0, 1, 1.0]]
+
+
+def test_constrain_traces_restores_locked_x():
+    original = {"a": {"x": [0.0, 1.0], "y": [0.0, 1.0]}}
+    data = {"a": {"x": [0.0, 1.5], "y": [0.0, 2.5]}}
+    constrain_traces(data, original, [["a", 1, 1.5, 2.5]], {"constraints": {"a": {"lock_x": True, "max": 2}}})
+    assert data == {"a": {"x": [0.0, 1.0], "y": [0.0, 2.0]}}
+
+
+@pytest.mark.parametrize("constraints, match", [
+    ({"a": {"min": 2}}, "below"),
+    ({"a": {"monotone": "decreasing"}}, "must be decreasing"),
+    ({"a": {"step": 0}}, "positive"),
+    ({"a": {"snap": 1}}, "Unknown constraints"),
+    ({"c": {"min": 0}}, "unknown trace"),
+])
+def test_validate_constraints(constraints, match):
+    with pytest.raises(ValueError, match=match):
+        validate_constraints({"constraints": constraints}, {"a": np.array([1.0, 2.0]), "b": [0, 0]})
+
+
+def drag_knot(widget, data, order, index, dy):
+    """Drag the point of the curve at `index` by `dy`, with its control points for cubic curves."""
+    options = {"constraints": {"a": {"monotone": "increasing"}}, "return_points": "control"}
+    with recording() as recorder:
+        widget(data, options=options, key="curve")
+        sent = recorder.calls[-1].kw["data"]["a"]
+        moved = [index - 1, index, index + 1] if order == 3 else [index]
+        recorder.script("curve", drag(*[["a", i, sent["x"][i], sent["y"][i] + dy] for i in moved]))
+        return sent, widget(data, options=options, key="curve")["a"]
+
+
+@pytest.mark.parametrize("dy, expected", [(0.05, 0.05), (0.4, 0.1)])
+def test_cubic_drag_moves_control_points_with_their_point(dy, expected):
+    sent, result = drag_knot(cubic_bezier_chart, {"a": {"x": [0, 1, 2, 3, 4], "y": [0, 0.1, 0.2, 3, 3.1]}}, 3, 3, dy)
+    # The point stays below the next point of the curve, 0.2, and its control points keep their offset.
+    assert result["y"][2:5] == pytest.approx([y + expected for y in sent["y"][2:5]])
+    assert result["y"][:2] + result["y"][5:] == pytest.approx(sent["y"][:2] + sent["y"][5:])
+
+
+def test_quadratic_drag_is_bounded_by_the_points_of_the_curve():
+    sent, result = drag_knot(bezier_chart, {"a": {"x": [0, 1, 2], "y": [0, 0.1, 0.2]}}, 2, 2, 0.4)
+    assert result["y"][2] == pytest.approx(0.2)
+    assert result["y"][:2] + result["y"][3:] == pytest.approx(sent["y"][:2] + sent["y"][3:])
+
+
+def test_bezier_control_points_are_not_constrained():
+    data = {"a": {"x": [0, 1, 2], "y": [0, 0.1, 0.2]}}
+    options = {"constraints": {"a": {"monotone": "increasing", "max": 1}}, "return_points": "control"}
+    with recording() as recorder:
+        bezier_chart(data, options=options, key="curve")
+        sent = recorder.calls[-1].kw["data"]["a"]
+        recorder.script("curve", drag(["a", 1, sent["x"][1], 5.0]))
+        assert bezier_chart(data, options=options, key="curve")["a"]["y"][1] == 5.0
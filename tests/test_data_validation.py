@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from draggable_charts.utils import data_validation
+from draggable_charts.utils.axes import infer_axes
+from draggable_charts.utils.data_validation import check_traces, validate_line_data, validate_scatter_data
+
+
+@pytest.mark.parametrize("data, match", [
+    ([1, 2], "Data must be a dictionary. Got: list"),
+    ({"a": [1, 2]}, r"Each trace must be a dictionary with 'x' and 'y' keys. Got in trace 'a': \[1, 2\]"),
+    ({"a": {"x": [1], "y": 1}}, "'y' of trace 'a' must be a list, tuple, NumPy array or pandas Series. Got: int"),
+    ({"a": {"x": np.zeros((2, 2)), "y": [1, 2]}}, r"'x' of trace 'a' must be one-dimensional. Got shape: \(2, 2\)"),
+    ({"a": {"x": [0, 1, 2], "y": [0.0, np.inf, 1.0]}}, "'y' of trace 'a' contains infinite values. First one at position 1"),
+    ({"a": {"x": [0, 1, 2], "y": [0, 1]}}, "must have the same length. Got: x of length 3, y of length 2"),
+])
+def test_check_traces_errors(data, match):
+    with pytest.raises(ValueError, match=match):
+        check_traces(data)
+
+
+def test_error_messages_summarize_long_values():
+    with pytest.raises(ValueError) as error:
+        check_traces({"a": list(range(10_000))})
+    assert len(str(error.value)) < 200
+    assert "..." in str(error.value)
+
+
+def test_check_traces_facts():
+    check = check_traces({
+        "a": {"x": ["a", "b"], "y": [1.0, np.nan]},
+        "b": {"x": pd.Series([1, 2]), "y": (3, 4)},
+    })
+    assert (check.numeric_x, check.numeric_y, check.has_nan) == (False, True, True)
+
+
+def test_categorical_values_need_labels():
+    with pytest.raises(ValueError, match="categorical data in X"):
+        validate_scatter_data({"a": {"x": ["a", "b"], "y": [1, 2]}}, {})
+    validate_scatter_data({"a": {"x": ["a", "b"], "y": [1, 2]}}, {"x_labels": ["a", "b"]})
+
+
+def test_non_numeric_columns():
+    data = pd.DataFrame({"a": [1.0, 2.0], "b": ["x", "y"]})
+    with pytest.raises(ValueError, match=r"1 non-numeric columns: \['b'\]"):
+        validate_line_data(data)
+
+
+@pytest.mark.parametrize("validator, data", [
+    (validate_scatter_data, {"a": {"x": [0, 1], "y": [0.0, np.nan]}}),
+    (validate_scatter_data, {"a": {"x": ["a", "b"], "y": [0.0, 1.0]}, "b": {"x": [0, 1], "y": ["c", "d"]}}),
+    (validate_line_data, pd.DataFrame({"a": [1.0, 2.0]}, index=["x", "y"])),
+    (validate_line_data, pd.Series(["a", "b"])),
+])
+def test_validators_return_the_axes(validator, data):
+    options = {"x_labels": ["a", "b"], "y_labels": ["c", "d"]}
+    assert validator(data, options) == infer_axes(data)
+    # The axes are kept with the revisions that passed.
+    options["revalidate"] = False
+    validator(data, options, repr(data))
+    assert validator(data, options, repr(data)) == infer_axes(data)
+
+
+def test_revalidation_is_skipped_for_a_revision_already_checked(monkeypatch):
+    data = {"a": {"x": [0, 1], "y": [0.0, 1.0]}}
+    options = {"revalidate": False}
+    validate_scatter_data(data, options, "revision")
+    # Data of a revision that passed isn't checked again, e.g. when only the options change.
+    monkeypatch.setattr(data_validation, "_is_numeric", lambda *args, **kwargs: pytest.fail("checked again"))
+    validate_scatter_data(data, options, "revision")
+    with pytest.raises(pytest.fail.Exception):
+        validate_scatter_data(data, options, "other revision")
+    with pytest.raises(pytest.fail.Exception):
+        validate_scatter_data(data, {"revalidate": True}, "revision")
+
+
+def test_checked_revisions_are_bounded(monkeypatch):
+    monkeypatch.setattr(data_validation, "_MAX_CHECKED", 2)
+    data = {"a": {"x": [0, 1], "y": [0.0, 1.0]}}
+    for revision in ["r1", "r2", "r3"]:
+        check_traces(data, ("traces", revision))
+    assert data_validation._was_checked(("traces", "r1")) is None
+    assert data_validation._was_checked(("traces", "r3")) is not None
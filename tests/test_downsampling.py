@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from draggable_charts import line_chart
+from draggable_charts.utils.downsampling import downsample, expand_frame_patches, lttb, min_max, neighbourhood
+from draggable_charts.utils.recorder import drag, recording
+
+# A flat trace with a peak and a dip, which any sampling must keep.
+Y = np.zeros(100)
+Y[37], Y[71] = 10.0, -5.0
+
+
+def test_lttb_keeps_endpoints_and_extremes():
+    assert lttb(np.arange(100.0), Y, 10).tolist() == [0, 1, 13, 36, 37, 50, 71, 74, 86, 99]
+
+
+def reference_lttb(x, y, threshold):
+    """Largest-Triangle-Three-Buckets as published by Steinarsson, point by point."""
+    n = len(y)
+    every = (n - 2) / (threshold - 2)
+    selected, a = [0], 0
+    for i in range(threshold - 2):
+        avg_start = int((i + 1) * every) + 1
+        avg_end = min(int((i + 2) * every) + 1, n)
+        avg_x = sum(x[avg_start:avg_end]) / (avg_end - avg_start)
+        avg_y = sum(y[avg_start:avg_end]) / (avg_end - avg_start)
+        start, end = int(i * every) + 1, int((i + 1) * every) + 1
+        areas = [abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a])) for j in range(start, end)]
+        a = start + areas.index(max(areas))
+        selected.append(a)
+    return selected + [n - 1]
+
+
+@pytest.mark.parametrize("n, threshold", [(10, 4), (20, 5), (101, 7), (1000, 33)])
+def test_lttb_matches_reference(n, threshold):
+    rng = np.random.default_rng(n)
+    x, y = np.sort(rng.uniform(0, 100, n)), rng.normal(size=n).cumsum()
+    # A last point far from the others shows if it's counted in the average of the last bucket.
+    y[-1] = 100.0
+    assert lttb(x, y, threshold).tolist() == reference_lttb(x.tolist(), y.tolist(), threshold)
+
+
+def test_min_max_keeps_endpoints_and_extremes():
+    assert min_max(Y, 10).tolist() == [0, 1, 26, 37, 51, 71, 76, 99]
+
+
+@pytest.mark.parametrize("method", ["lttb", "min_max"])
+@pytest.mark.parametrize("max_points", [2, 3, 7, 50])
+def test_downsample_keeps_endpoints(method, max_points):
+    rows = downsample(np.arange(100), Y, max_points, method)
+    assert rows[0] == 0 and rows[-1] == 99
+    assert len(rows) <= max_points
+    assert np.all(np.diff(rows) > 0)
+
+
+def test_downsample_keeps_short_traces():
+    assert downsample(np.arange(5), Y[:5], 10).tolist() == [0, 1, 2, 3, 4]
+
+
+def test_downsample_rejects_unknown_method():
+    with pytest.raises(ValueError, match="Unknown downsampling method"):
+        downsample(np.arange(100), Y, 10, "mean")
+
+
+@pytest.mark.parametrize("extent, expected", [
+    (0, [37]),
+    (2, [35, 36, 37, 38, 39]),
+    ("bucket", [37, 38, 39, 40, 41, 42, 43]),
+])
+def test_neighbourhood(extent, expected):
+    rows = np.array([0, 36, 37, 50, 99])
+    assert neighbourhood(rows, 2, 100, extent).tolist() == expected
+
+
+def test_expand_frame_patches_shift_neighbours():
+    data = pd.DataFrame({"a": [0.0, 1.0, 2.0, 3.0, 4.0], "b": [0.0] * 5})
+    rows = np.array([0, 2, 4])
+    patches = expand_frame_patches(data, [[0, 1, 5.0]], rows, 1)
+    assert patches == [[0, 1, 4.0], [0, 2, 5.0], [0, 3, 6.0]]
+
+
+@pytest.mark.parametrize("options, changed", [
+    ({"max_points": 10}, {71: 0.0}),
+    ({"max_points": 10, "edit_neighbourhood": 1}, {70: 5.0, 71: 0.0, 72: 5.0}),
+    ({"max_points": 10, "downsample": "min_max"}, {71: 0.0}),
+])
+def test_drag_of_downsampled_point_edits_its_row(options, changed):
+    data = pd.DataFrame({"a": Y})
+    with recording() as recorder:
+        line_chart(data, options, key="chart")
+        sent = list(recorder.calls[-1].kw["data"]["a"]["data"])
+        recorder.script("chart", drag([0, sent.index(71), 0.0]))
+        result = line_chart(data, options, key="chart")
+    expected = Y.copy()
+    for row, value in changed.items():
+        expected[row] = value
+    assert result["a"].tolist() == expected.tolist()
@@ -0,0 +1,40 @@
+import pandas as pd
+import pytest
+
+from draggable_charts import cubic_bezier_chart, line_chart, scatter_chart
+from draggable_charts.utils.recorder import drag, recording
+
+
+@pytest.mark.parametrize("options", [{}, {"max_points": 3}])
+def test_scatter_drag_of_trace_with_int_name(options):
+    data = {1: {"x": [0, 1, 2, 3, 4], "y": [0.0, 1.0, 2.0, 3.0, 4.0]}}
+    with recording() as recorder:
+        recorder.script("chart", None, drag(["1", 0, 0, 9.0]))
+        scatter_chart(data, options, key="chart")
+        result = scatter_chart(data, options, key="chart")
+    assert list(result) == [1]
+    assert result[1]["y"][0] == 9.0
+
+
+def test_bezier_drag_of_trace_with_int_name():
+    data = {1: {"x": [0, 1, 2], "y": [0.0, 1.0, 2.0]}}
+    options = {"return_points": "control"}
+    with recording() as recorder:
+        recorder.script("chart", None, drag(["1", 0, 0, 9.0]))
+        cubic_bezier_chart(data, options, key="chart")
+        result = cubic_bezier_chart(data, options, key="chart")
+    assert result[1]["y"][0] == 9.0
+
+
+@pytest.mark.parametrize("options", [{}, {"stream": True}])
+def test_line_chart_result_is_a_copy(options):
+    data = pd.DataFrame({"a": [0.0, 1.0, 2.0]})
+    with recording() as recorder:
+        recorder.script("copy", None, drag([0, 1, 5.0]), drag([0, 1, 5.0]))
+        for _ in range(2):
+            result = line_chart(data, options, key="copy")
+            result.iloc[0, 0] = 9.0
+            assert data["a"].tolist() == [0.0, 1.0, 2.0]
+        # The edits kept for the next reruns don't change either.
+        assert line_chart(data, options, key="copy")["a"].tolist() == [0.0, 5.0, 2.0]
+    assert data["a"].tolist() == [0.0, 1.0, 2.0]
@@ -0,0 +1,102 @@
+import pandas as pd
+import pytest
+
+from draggable_charts import edit_history, line_chart, redo, undo
+from draggable_charts.utils.history import CELL_BYTES, Delta, EditHistory
+from draggable_charts.utils.recorder import drag, recording
+
+
+def edit(id, *cells):
+    return {"id": id, "action": "edit", "cells": [[0, row, [0.0], [after]] for row, after in cells]}
+
+
+def test_undo_redo_move_the_cursor():
+    history = EditHistory("r", 2**20)
+    history.apply(edit(1, (0, 1.0)))
+    history.apply(edit(2, (1, 2.0), (2, 3.0)))
+    assert history.entries[1] == [Delta(0, 1, (0.0,), (2.0,)), Delta(0, 2, (0.0,), (3.0,))]
+    history.apply({"id": 3, "action": "undo"})
+    assert history.cursor == 1 and history.can_undo and history.can_redo
+    history.apply({"id": 4, "action": "redo"})
+    history.apply({"id": 5, "action": "redo"})
+    assert history.cursor == 2 and not history.can_redo
+
+
+def test_edit_drops_undone_entries():
+    history = EditHistory("r", 2**20)
+    history.apply(edit(1, (0, 1.0)))
+    history.apply(edit(2, (1, 2.0), (2, 3.0)))
+    history.apply({"id": 3, "action": "undo"})
+    history.apply(edit(4, (3, 4.0)))
+    assert [len(entry) for entry in history.entries] == [1, 1]
+    assert history.bytes == 2 * CELL_BYTES and not history.can_redo
+
+
+def test_oldest_edits_are_dropped_over_the_budget():
+    history = EditHistory("r", 3 * CELL_BYTES)
+    history.apply(edit(1, (0, 1.0), (1, 1.0)))
+    history.apply(edit(2, (2, 1.0)))
+    assert len(history.entries) == 2 and history.bytes == 3 * CELL_BYTES
+    history.apply(edit(3, (3, 1.0)))
+    assert [entry[0].index for entry in history.entries] == [2, 3]
+    assert history.cursor == 2 and history.bytes == 2 * CELL_BYTES
+
+
+DATA = pd.DataFrame({"a": [0.0, 1.0, 2.0]})
+
+
+def actions(*actions, command=0):
+    return {"actions": list(actions), "command": command}
+
+
+def test_commands_are_queued_until_the_frontend_runs_them():
+    with recording() as recorder:
+        recorder.script(
+            "queue",
+            drag([0, 0, 5.0], history=actions(edit(1, (0, 5.0)))),
+            drag([0, 0, 5.0], history=actions(edit(1, (0, 5.0)))),
+            drag(history=actions(edit(1, (0, 5.0)), {"id": 2, "action": "undo"}, command=1)),
+        )
+        # The payload is sent before the value of the run is recorded.
+        line_chart(DATA, key="queue")
+        assert recorder.calls[-1].kw["history"] == {"ack": 0, "commands": []}
+        undo("queue")
+        line_chart(DATA, key="queue")
+        assert recorder.calls[-1].kw["history"] == {"ack": 1, "commands": [[1, "undo"]]}
+        # The frontend ran the command and sent the undo with the reverted point.
+        line_chart(DATA, key="queue")
+        assert recorder.calls[-1].kw["history"] == {"ack": 1, "commands": [[1, "undo"]]}
+        assert edit_history("queue").cursor == 0
+        line_chart(DATA, key="queue")
+        assert recorder.calls[-1].kw["history"] == {"ack": 2, "commands": []}
+        redo("queue")
+        assert edit_history("queue").commands == [(2, "redo")]
+
+
+def test_new_data_starts_a_new_history():
+    other = pd.DataFrame({"a": [9.0, 1.0, 2.0]})
+    with recording() as recorder:
+        recorder.script(
+            "prices",
+            drag([0, 0, 5.0], history=actions(edit(1, (0, 5.0)))),
+            drag([0, 1, 4.0], history=actions(edit(1, (1, 4.0)))),
+        )
+        line_chart(DATA, key="prices")
+        undo("prices")
+        line_chart(other, key="prices")
+        # Commands of the previous data aren't sent to the chart of the new data.
+        assert recorder.calls[-1].kw["history"]["commands"] == []
+    history = edit_history("prices")
+    assert history.revision == recorder.calls[-1].kw["revision"]
+    assert [entry[0].index for entry in history.entries] == [1]
+    # Command ids keep increasing, so the chart never skips a new one as already run.
+    undo("prices")
+    assert history.commands == [(2, "undo")]
+
+
+@pytest.mark.parametrize("options", [{"history_bytes": 0}, {}])
+def test_history_requires_key_and_budget(options):
+    with recording() as recorder:
+        recorder.script(None, drag([0, 0, 5.0], history=actions(edit(1, (0, 5.0)))))
+        line_chart(DATA, options)
+        assert "history" not in recorder.calls[-1].kw
@@ -0,0 +1,37 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+# Modules that make `import draggable_charts` slow, loaded on first use instead.
+# A wall-clock budget would depend on the machine.
+HEAVY_MODULES = ["numpy", "pandas", "pyarrow", "streamlit", "bezier_interpolation"]
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def run_python(code: str) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=ROOT)
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def test_import_is_lazy():
+    result = run_python(
+        "import json, sys\n"
+        "import draggable_charts\n"
+        f"print(json.dumps({{'loaded': [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))\n"
+    )
+    assert result["loaded"] == []
+
+
+def test_widgets_load_on_first_use():
+    result = run_python(
+        "import json, sys\n"
+        "import draggable_charts\n"
+        "widget = draggable_charts.scatter_chart\n"
+        "from draggable_charts.utils import component_func\n"
+        "print(json.dumps({'name': widget.__name__, 'pandas': 'pandas' in sys.modules,\n"
+        "                  'declared': component_func._component_func is not None}))\n"
+    )
+    assert result == {"name": "scatter_chart", "pandas": True, "declared": False}
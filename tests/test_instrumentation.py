@@ -0,0 +1,57 @@
+import pandas as pd
+
+from draggable_charts import line_chart
+from draggable_charts.utils import instrumentation
+from draggable_charts.utils.instrumentation import NULL_CALL, StageStats, add_hook, instrument, remove_hook, start_call
+from draggable_charts.utils.recorder import recording
+from draggable_charts.widgets.linechart import LINE_CHART
+
+
+def test_hooks_get_an_event_per_call():
+    events = []
+    hook = add_hook(events.append)
+    try:
+        assert start_call(LINE_CHART, "chart") is not NULL_CALL
+        with recording():
+            line_chart(pd.DataFrame({"a": [0.0, 1.0]}), key="chart")
+    finally:
+        remove_hook(hook)
+    [event] = events
+    assert (event.chart, event.key, event.traces, event.points) == ("line_chart", "chart", 1, 2)
+    assert event.seconds >= sum(event.stages.values()) - 1e-9
+    # Without hooks, calls aren't timed.
+    assert start_call(LINE_CHART, "chart") is NULL_CALL
+    remove_hook(hook)
+
+
+def test_stage_stats_only_measure_payloads_in_summary(monkeypatch):
+    sizes = []
+    original = instrumentation.payload_bytes
+    monkeypatch.setattr(instrumentation, "payload_bytes", lambda kw, tables: sizes.append(1) or original(kw, tables))
+    data = pd.DataFrame({"a": [0.0, 1.0, 2.0]})
+    with instrument(StageStats()) as stats, recording():
+        for _ in range(3):
+            line_chart(data, {"y_format": ".3~s"}, key="chart")
+            line_chart(data, key="chart")
+    assert sizes == []
+    summary = stats.summary()[("line_chart", "chart")]
+    assert summary["calls"] == 6
+    assert summary["payload_bytes"] > 0
+    assert "total" in summary["seconds"]
+    assert len(sizes) == 1
+    stats.summary()
+    assert len(sizes) == 1
+
+
+def test_failing_hook_is_logged(caplog):
+    events = []
+
+    def fail(event):
+        raise RuntimeError("broken hook")
+
+    with instrument(fail), instrument(events.append), recording():
+        result = line_chart(pd.DataFrame({"a": [0.0, 1.0]}), key="chart")
+    assert result["a"].tolist() == [0.0, 1.0]
+    # Hooks after the failing one still get the event.
+    assert len(events) == 1
+    assert "broken hook" in caplog.text
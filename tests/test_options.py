@@ -0,0 +1,60 @@
+import json
+
+import numpy as np
+import pytest
+
+from draggable_charts.utils.options import DEFAULT_OPTIONS, ChartOptions, compile_options
+from draggable_charts.utils.registry import get_chart
+
+
+def test_options_are_frozen():
+    colors = ["#000000"]
+    options = ChartOptions({"colors": colors, "labels": {"a": "A"}, "point_radius": np.array([1, 2])})
+    colors.append("#FFFFFF")
+    assert options["colors"] == ("#000000",)
+    assert isinstance(options["labels"], ChartOptions)
+    assert options["point_radius"] == (1, 2)
+    with pytest.raises(TypeError):
+        options["colors"] = []
+    with pytest.raises(TypeError):
+        options["labels"]["a"] = "B"
+
+
+def test_options_reject_unhashable_values():
+    with pytest.raises(ValueError, match="Option 'title'"):
+        ChartOptions({"title": bytearray(b"Prices")})
+
+
+def test_equal_options_have_equal_hashes():
+    first = ChartOptions({"colors": ["#000000"], "labels": {"a": "A"}})
+    second = ChartOptions({"labels": {"a": "A"}, "colors": ("#000000",)})
+    assert first == second and hash(first) == hash(second)
+    assert first != first.replace(labels={})
+    assert {first: 1}[second] == 1
+
+
+def test_replace_returns_new_options():
+    options = ChartOptions({"tension": 0.3})
+    replaced = options.replace(tension=0.5, x_type="linear")
+    assert options["tension"] == 0.3 and "x_type" not in options
+    assert replaced == ChartOptions({"tension": 0.5, "x_type": "linear"})
+
+
+def test_to_dict_round_trip():
+    plain = json.loads(json.dumps(DEFAULT_OPTIONS.to_dict()))
+    assert isinstance(plain["labels"], dict)
+    assert ChartOptions(plain) == DEFAULT_OPTIONS
+
+
+def test_compile_options_merges_defaults():
+    spec = get_chart("line_chart")
+    assert compile_options(None, spec) is spec.default_options
+    options = compile_options({"tension": 0, "title": "Prices"}, spec)
+    assert options["tension"] == 0 and options["title"] == "Prices"
+    assert options["y_format"] == DEFAULT_OPTIONS["y_format"]
+
+
+def test_compile_options_warns_of_unknown_keys():
+    with pytest.warns(UserWarning, match=r"Unknown options \['tenison'\]"):
+        options = compile_options({"tenison": 0}, get_chart("line_chart"))
+    assert options["tenison"] == 0
@@ -0,0 +1,24 @@
+import pytest
+
+from draggable_charts.utils.recorder import ComponentRecorder, drag, replay
+
+pytest.importorskip("streamlit.testing.v1")
+
+APP = """
+import pandas as pd
+import streamlit as st
+from draggable_charts import line_chart
+
+data = line_chart(pd.DataFrame({"a": [0.0, 1.0, 2.0]}), key="chart")
+st.write(data["a"].tolist())
+"""
+
+
+def test_replay_with_relative_path(tmp_path, monkeypatch):
+    (tmp_path / "app.py").write_text(APP)
+    monkeypatch.chdir(tmp_path)
+    recorder = ComponentRecorder({"chart": [None, drag([0, 2, 5.0])]})
+    result = replay("app.py", reruns=2, recorder=recorder)
+    assert len(result.seconds) == 2
+    assert [call.key for call in result.recorder.calls] == ["chart", "chart"]
+    assert result.app.session_state["_draggable_charts_edits"]["chart"].data["a"].tolist() == [0.0, 1.0, 5.0]
@@ -0,0 +1,50 @@
+import pandas as pd
+import pytest
+import streamlit as st
+
+from draggable_charts import line_chart
+from draggable_charts.utils.recorder import recording
+
+
+@pytest.fixture
+def stream():
+    """Call a streamed line chart with a frame of `values`, and return what it sent."""
+    with recording() as recorder:
+        def send(values, key="stream", window=None, value=None, start=0):
+            if value is not None:
+                # The value of the chart, as Streamlit sets it before the run.
+                st.session_state[key] = value
+            data = pd.DataFrame({"a": values}, index=range(start, start + len(values)))
+            line_chart(data, {"stream": True, "stream_window": window}, key=key)
+            kw = recorder.calls[-1].kw
+            return kw["stream"], [row for row in kw["data"]["a"]["data"].values()]
+        yield send
+
+
+def test_appended_rows_are_sent_alone(stream):
+    assert stream([0.0, 1.0]) == ({"start": 0, "reset": True, "window": None}, [0.0, 1.0])
+    assert stream([0.0, 1.0, 2.0, 3.0]) == ({"start": 2, "reset": False, "window": None}, [2.0, 3.0])
+    assert stream([0.0, 1.0, 2.0, 3.0]) == ({"start": 4, "reset": False, "window": None}, [])
+
+
+def test_changed_rows_restart_the_stream(stream):
+    stream([0.0, 1.0, 2.0])
+    # An earlier row changes while rows are appended: the chart gets every row again.
+    assert stream([0.0, 9.0, 2.0, 3.0]) == ({"start": 0, "reset": True, "window": None}, [0.0, 9.0, 2.0, 3.0])
+
+
+def test_window_follows_dropped_head(stream):
+    stream([0.0, 1.0, 2.0], window=2)
+    # The head of the data is dropped, and the chart only gets the new rows.
+    assert stream([1.0, 2.0, 3.0], window=2, start=1) == ({"start": 3, "reset": False, "window": 2}, [3.0])
+    # The data is trimmed to the window.
+    assert stream([3.0, 4.0], window=2, start=3) == ({"start": 4, "reset": False, "window": 2}, [4.0])
+    assert stream([9.0, 4.0, 5.0], window=2, start=3) == ({"start": 1, "reset": True, "window": 2}, [4.0, 5.0])
+
+
+def test_resync_request_restarts_the_stream(stream):
+    stream([0.0, 1.0])
+    assert stream([0.0, 1.0, 2.0], value={"resync": "first"})[0]["reset"]
+    # The same request is only served once.
+    assert not stream([0.0, 1.0, 2.0, 3.0])[0]["reset"]
+    assert stream([0.0, 1.0, 2.0, 3.0], value={"resync": "second"})[0]["reset"]
@@ -0,0 +1,27 @@
+import pytest
+
+from draggable_charts.utils.options import ChartOptions
+from draggable_charts.utils.visibility import visible_positions
+
+NAMES = ["a", "b", "c", "d"]
+
+
+@pytest.mark.parametrize("option, expected", [
+    (None, None),
+    (2, [0, 1]),
+    (10, [0, 1, 2, 3]),
+    (["d", "b"], [1, 3]),
+    ([], []),
+])
+def test_visible_positions(option, expected):
+    assert visible_positions(NAMES, ChartOptions(visible_traces=option), "chart") == expected
+
+
+@pytest.mark.parametrize("option, key, match", [
+    (2, None, "requires a key"),
+    (["a", "e"], "chart", "Unknown traces"),
+    (-1, "chart", "number of columns"),
+])
+def test_visible_positions_errors(option, key, match):
+    with pytest.raises(ValueError, match=match):
+        visible_positions(NAMES, ChartOptions(visible_traces=option), key)